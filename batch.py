@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Batch mode: many add/addhours/delete/edit operations in one transaction.
+
+Each non-blank line holds one operation, either written like the CLI
+command that does the same thing
+
+    add -d 2025-08-04 -s 09:00 -e 17:00 --desc "Client work"
+    addhours -d 2025-08-05 -dur "5h 30m" --desc Review
+    delete -i 12
+    edit -i 3 -s 10:00 --desc "Release prep"
+
+or as a JSON object with the operation in "op" and the long option names
+as keys:
+
+    {"op": "add", "date": "2025-08-04", "start": "09:00", "end": "17:00", "description": "Client work"}
+
+Lines starting with # are comments. delete and edit take the index shown
+by `list` (as it was before the batch) or a database id with --id; edit
+keeps every field it is not given. All lines are checked before anything
+is written and then applied in one transaction, so a batch either takes
+effect completely or not at all. Added and edited entries follow an
+overlap policy (database.OVERLAP_POLICIES), rejecting overlaps by default.
+"""
+
+import codecs
+import json
+import shlex
+from datetime import datetime
+from typing import Dict, IO, Iterable, Iterator, List, Tuple
+from database import DatabaseManager, OverlapError
+from time_entry import TimeEntry
+
+# Option spellings accepted in line syntax, the same as the CLI commands'
+OPTIONS = {
+    '-d': 'date', '--date': 'date',
+    '-s': 'start', '--start': 'start',
+    '-e': 'end', '--end': 'end',
+    '-dur': 'duration', '--duration': 'duration',
+    '--desc': 'description', '--description': 'description',
+    '-i': 'index', '--index': 'index',
+    '--id': 'id',
+}
+
+# Bytes read at a time by iter_json_records()
+JSON_CHUNK_SIZE = 64 * 1024
+
+# Longest single value iter_json_records() accepts, in characters
+JSON_MAX_VALUE_SIZE = 64 * 1024
+
+# Required and optional fields of each operation
+FIELDS = {
+    'add': (('date', 'start', 'end'), ('description',)),
+    'addhours': (('date', 'duration'), ('start', 'description')),
+    'delete': ((), ('index', 'id')),
+    'edit': ((), ('index', 'id', 'date', 'start', 'end', 'description')),
+}
+
+class BatchError(ValueError):
+    """A batch was rejected; errors holds (line, message) pairs"""
+
+    def __init__(self, errors: List[Tuple[int, str]]):
+        super().__init__('; '.join(f"line {line}: {message}" for line, message in errors))
+        self.errors = errors
+
+class Operation:
+    """One validated operation, ready to apply"""
+
+    def __init__(self, line: int, op: str, entry: TimeEntry = None, entry_id: int = None,
+                 fields: Dict[str, str] = None):
+        self.line = line
+        self.op = op
+        self.entry = entry
+        self.entry_id = entry_id
+        # delete and edit fields, until prepare() resolves them against the database
+        self.fields = fields
+
+def parse_line(text: str) -> Tuple[str, Dict[str, str]]:
+    """(operation, fields) of one line in CLI or JSON syntax; raises ValueError"""
+    text = text.strip()
+    if text.startswith('{'):
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON ({e.msg})")
+        if not isinstance(record, dict):
+            raise ValueError("expected a JSON object")
+        op = record.pop('op', None)
+        fields = {key: value if isinstance(value, str) else json.dumps(value)
+                  for key, value in record.items() if value is not None}
+    else:
+        words = shlex.split(text)
+        if not words:
+            raise ValueError("empty operation")
+        op, args, fields = words[0], words[1:], {}
+        if op not in FIELDS:
+            raise ValueError(f"unknown operation {op!r} (expected one of {', '.join(FIELDS)})")
+        while args:
+            option = args.pop(0)
+            option, _, value = option.partition('=')
+            if option not in OPTIONS:
+                raise ValueError(f"unknown option {option}")
+            if not value:
+                if not args:
+                    raise ValueError(f"option {option} needs a value")
+                value = args.pop(0)
+            fields[OPTIONS[option]] = value
+
+    if op not in FIELDS:
+        raise ValueError(f"unknown operation {op!r} (expected one of {', '.join(FIELDS)})")
+    required, optional = FIELDS[op]
+    unknown = set(fields) - set(required) - set(optional)
+    if unknown:
+        raise ValueError(f"{op} does not take {', '.join(sorted(unknown))}")
+    missing = [name for name in required if name not in fields]
+    if missing:
+        raise ValueError(f"{op} needs {', '.join(missing)}")
+    return op, fields
+
+def iter_json_records(stream: IO[bytes], chunk_size: int = JSON_CHUNK_SIZE,
+                      max_value_size: int = JSON_MAX_VALUE_SIZE) -> Iterator:
+    """Values of a JSON array, or of newline-delimited JSON, read incrementally.
+    
+    Only one chunk and the value being decoded are held in memory, so
+    arrays of any length can be read. Raises ValueError for malformed JSON,
+    after yielding every value before it: as soon as a line of
+    newline-delimited JSON fails to decode, or once a value being decoded
+    grows past max_value_size characters.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+    text, pos, consumed, eof = '', 0, 0, False
+
+    def more() -> bool:
+        nonlocal text, pos, consumed, eof
+        if eof:
+            return False
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        consumed += pos
+        text = text[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+        return not eof or bool(text)
+
+    def next_char() -> str:
+        """First non-whitespace character from pos on, or '' at the end"""
+        nonlocal pos
+        while True:
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+            if pos < len(text):
+                return text[pos]
+            if not more():
+                return ''
+
+    def invalid(message: str):
+        return ValueError(f"invalid JSON at character {consumed + pos}: {message}")
+
+    array = next_char() == '['
+    if array:
+        pos += 1
+    first = True
+    while True:
+        char = next_char()
+        if array:
+            if char == ']':
+                pos += 1
+                if next_char():
+                    raise invalid("unexpected data after the array")
+                return
+            if not char:
+                raise invalid("unterminated array")
+            if not first:
+                if char != ',':
+                    raise invalid("expected ',' or ']'")
+                pos += 1
+                next_char()
+        elif not char:
+            return
+        while True:
+            try:
+                value, end = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as e:
+                # A whole line of newline-delimited JSON is as good as it gets
+                if not array and text.find('\n', pos) != -1:
+                    raise invalid(e.msg)
+                if len(text) - pos > max_value_size:
+                    raise invalid(f"value longer than {max_value_size} characters")
+                # Most likely the value continues in the next chunk
+                if more():
+                    continue
+                raise invalid(e.msg)
+            # A value at the end of the chunk, or a number followed by
+            # characters of numbers, may go on in the next chunk
+            partial = end == len(text) or (isinstance(value, (int, float)) and text[end] in '0123456789.eE+-')
+            if not partial or len(text) - pos > max_value_size or not more():
+                break
+        pos = end
+        first = False
+        yield value
+
+def _parse_date(value: str, allow_future: bool = True):
+    try:
+        date_obj = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"invalid date {value!r}, use YYYY-MM-DD")
+    if not allow_future and date_obj > datetime.now().date():
+        raise ValueError("cannot add work sessions for future dates")
+    return date_obj
+
+def _target_id(db, fields: Dict[str, str]) -> int:
+    """Database id of the entry a delete or edit refers to"""
+    if ('index' in fields) == ('id' in fields):
+        raise ValueError("give either an index (-i) or an id (--id)")
+    try:
+        number = int(fields.get('index', fields.get('id')))
+    except ValueError:
+        raise ValueError("index and id must be whole numbers")
+    if 'index' in fields:
+        entry_id = db.resolve_index(number)
+        if entry_id is None:
+            raise ValueError(f"no entry with index {number}")
+        return entry_id
+    if db.get_entry_by_id(number) is None:
+        raise ValueError(f"no entry with id {number}")
+    return number
+
+def read_operations(lines: Iterable[str]) -> Tuple[List[Operation], List[Tuple[int, str]]]:
+    """Parse every line without touching the database; returns (operations, errors)"""
+    operations, errors = [], []
+    for line, text in enumerate(lines, 1):
+        if not text.strip() or text.lstrip().startswith('#'):
+            continue
+        try:
+            op, fields = parse_line(text)
+            if op == 'add':
+                entry = DatabaseManager.manual_entry(_parse_date(fields['date'], allow_future=False),
+                                                     fields['start'], fields['end'], fields.get('description', ''))
+                operations.append(Operation(line, op, entry))
+            elif op == 'addhours':
+                entry = DatabaseManager.duration_entry(_parse_date(fields['date'], allow_future=False),
+                                                       fields['duration'], fields.get('start', '09:00'),
+                                                       fields.get('description', ''))
+                operations.append(Operation(line, op, entry))
+            else:
+                if 'date' in fields:
+                    _parse_date(fields['date'])
+                operations.append(Operation(line, op, fields=fields))
+        except ValueError as e:
+            errors.append((line, str(e)))
+    return operations, errors
+
+def prepare(db, operations: List[Operation], errors: List[Tuple[int, str]] = ()) -> List[Operation]:
+    """Resolve the entries deletes and edits refer to; raises BatchError listing all problems"""
+    errors = list(errors)
+    targeted = {}
+    for operation in operations:
+        if operation.fields is None:
+            continue
+        fields = operation.fields
+        try:
+            entry_id = _target_id(db, fields)
+            if entry_id in targeted:
+                raise ValueError(f"entry {entry_id} is already changed by line {targeted[entry_id]}")
+            targeted[entry_id] = operation.line
+            operation.entry_id = entry_id
+            if operation.op == 'edit':
+                _, current = db.get_entry_by_id(entry_id)
+                date_obj = _parse_date(fields['date']) if 'date' in fields else current.start_time.date()
+                operation.entry = db.manual_entry(date_obj,
+                                                  fields.get('start', current.start_time.strftime('%H:%M')),
+                                                  fields.get('end', current.end_time.strftime('%H:%M')),
+                                                  fields.get('description', current.description))
+        except ValueError as e:
+            errors.append((operation.line, str(e)))
+    if errors:
+        raise BatchError(sorted(errors))
+    return operations
+
+def apply(db, operations: Iterable[Operation], overlap: str = 'reject') -> Dict[str, int]:
+    """Apply validated operations; returns the number applied per operation"""
+    counts = dict.fromkeys(FIELDS, 0)
+    for operation in operations:
+        try:
+            if operation.op in ('add', 'addhours'):
+                db.add_completed_entry(operation.entry, overlap)
+            elif operation.op == 'delete':
+                if not db.delete_entry_by_id(operation.entry_id):
+                    raise BatchError([(operation.line, f"entry {operation.entry_id} no longer exists")])
+            else:
+                entry = operation.entry
+                if not db.update_entry_by_id(operation.entry_id, entry.start_time, entry.end_time,
+                                             entry.description, overlap):
+                    raise BatchError([(operation.line, f"entry {operation.entry_id} no longer exists")])
+        except OverlapError as e:
+            raise BatchError([(operation.line, str(e))])
+        counts[operation.op] += 1
+    return counts
+
+def run_batch(db, source: IO, dry_run: bool = False, overlap: str = 'reject') -> Dict[str, int]:
+    """Validate and apply all operations in source in one transaction.
+
+    The whole source is read and parsed before the write lock is taken, so
+    a slow pipe never blocks other writers. Indexes are then resolved in
+    the same write transaction that applies the batch, so they refer to
+    exactly the entries it changes. Raises BatchError, with nothing
+    written, if any line is invalid or cannot be applied.
+    """
+    operations, errors = read_operations(source)
+    with db.connections.transaction():
+        operations = prepare(db, operations, errors)
+        if dry_run:
+            counts = dict.fromkeys(FIELDS, 0)
+            for operation in operations:
+                counts[operation.op] += 1
+            return counts
+        return apply(db, operations, overlap)
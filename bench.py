@@ -0,0 +1,694 @@
+#!/usr/bin/env python3
+
+"""
+Timesheet Benchmarks
+====================
+
+Benchmarks for the database layer, the web views and PDF reports. Every
+run works on a throwaway database in a temporary directory, so your real
+timesheet.db is never touched. The scale suite times every public
+TimesheetManager method, the main web routes and PDF generation; it is
+also available as `timesheet bench`.
+
+    python3 bench.py scale --entries 1000 --entries 100000 --json before.json
+    python3 bench.py reads --entries 5000 --repeat 200
+    python3 bench.py inserts --entries 10000 --entries 1000000
+    python3 bench.py entries --entries 100000
+    python3 bench.py aggregates --entries 1000000
+    python3 bench.py startup --entries 100000 --repeat 20
+    python3 bench.py daemon --entries 100000 --repeat 20
+    python3 bench.py writes --entries 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time as _time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+DESCRIPTIONS = [
+    "Code review", "Sprint planning", "Bug fixing", "Client meeting",
+    "Invoice migration", "Documentation", "Deployment", "Refactoring",
+    "Customer support", "Research", "",
+]
+
+def synthetic_rows(count: int, seed: int = 42, end: datetime = None) -> Iterator[Tuple[str, str, str]]:
+    """Yield (start_time, end_time, description) rows going back in time from end"""
+    rng = random.Random(seed)
+    day = (end or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    produced = 0
+    while produced < count:
+        day -= timedelta(days=1)
+        if day.weekday() >= 5:
+            continue
+        cursor = day + timedelta(hours=8, minutes=rng.randrange(0, 90, 5))
+        for _ in range(rng.randint(1, 4)):
+            if produced >= count:
+                break
+            length = timedelta(minutes=rng.randrange(15, 240, 5))
+            yield (cursor.isoformat(), (cursor + length).isoformat(), rng.choice(DESCRIPTIONS))
+            cursor += length + timedelta(minutes=rng.randrange(0, 60, 5))
+            produced += 1
+
+def populate(db_path: str, count: int, seed: int = 42):
+    """Fill a new database with synthetic completed entries.
+    
+    Rows are written in the original table layout and DatabaseManager then
+    upgrades the file, so any schema migrations are part of the setup.
+    """
+    from database import DatabaseManager
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute('''
+            CREATE TABLE time_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                start_time TEXT NOT NULL,
+                end_time TEXT,
+                description TEXT DEFAULT '',
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.executemany(
+            'INSERT INTO time_entries (start_time, end_time, description) VALUES (?, ?, ?)',
+            synthetic_rows(count, seed)
+        )
+    conn.close()
+    DatabaseManager(db_path)
+
+def populate_year(db_path: str, count: int, year: int, seed: int = 42):
+    """Fill a new database with count completed entries spread evenly over one year"""
+    from database import DatabaseManager
+    from time_entry import EPOCH, to_epoch
+    DatabaseManager(db_path).close()
+    rng = random.Random(seed)
+    first = to_epoch(datetime(year, 1, 1))
+    span = to_epoch(datetime(year + 1, 1, 1)) - first
+
+    def rows():
+        for i in range(count):
+            start = first + i * span // count
+            end = start + rng.randrange(15, 240, 5) * 60
+            yield ((EPOCH + timedelta(seconds=start)).isoformat(), (EPOCH + timedelta(seconds=end)).isoformat(),
+                   rng.choice(DESCRIPTIONS), start, end)
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany('''
+            INSERT INTO time_entries (start_time, end_time, description, start_ts, end_ts)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows())
+    conn.close()
+
+def synthetic_entries(count: int, seed: int = 42):
+    """Yield synthetic TimeEntry objects"""
+    from time_entry import TimeEntry
+    for start, end, description in synthetic_rows(count, seed):
+        yield TimeEntry(datetime.fromisoformat(start), datetime.fromisoformat(end), description)
+
+def time_call(fn: Callable, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = _time.perf_counter()
+        fn()
+        samples.append((_time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def time_each(calls: Iterable[Callable]) -> float:
+    """Median wall time in milliseconds of calls that must each run once"""
+    samples = []
+    for fn in calls:
+        started = _time.perf_counter()
+        fn()
+        samples.append((_time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def last_month() -> date:
+    """A day in the month before this one, which synthetic_rows always fills"""
+    return datetime.now().date().replace(day=1) - timedelta(days=1)
+
+def bench_reads(db_path: str, repeat: int = 100) -> Dict[str, float]:
+    """Time the main DatabaseManager read methods"""
+    from database import DatabaseManager
+    db = DatabaseManager(db_path)
+    now = datetime.now()
+    last_month = (now.replace(day=1) - timedelta(days=1))
+
+    def dashboard():
+        # Mirrors the DatabaseManager calls made by web_app.index
+        db.get_current_session()
+        db.get_current_session_duration()
+        db.get_entries_for_month(now.year, now.month)
+        db.get_total_hours_for_month(now.year, now.month)
+        db.get_all_entries(limit=10)
+        db.get_stats()
+
+    cases = {
+        'get_current_session': db.get_current_session,
+        'get_all_entries(limit=20)': lambda: db.get_all_entries(limit=20),
+        'get_entries_for_month': lambda: db.get_entries_for_month(last_month.year, last_month.month),
+        'get_entries_for_date': lambda: db.get_entries_for_date(last_month.date()),
+        'get_total_hours_for_month': lambda: db.get_total_hours_for_month(last_month.year, last_month.month),
+        'get_daily_summary_for_month': lambda: db.get_daily_summary_for_month(last_month.year, last_month.month),
+        'get_stats': db.get_stats,
+        'search_entries': lambda: db.search_entries('invoice migration'),
+        'search_entries (one month)': lambda: db.search_entries('code review', last_month.replace(day=1), now.replace(day=1)),
+        'dashboard (web_app.index)': dashboard,
+    }
+    return {name: time_call(fn, repeat) for name, fn in cases.items()}
+
+def bench_inserts(directory: str, count: int, loop_limit: int = 10000) -> Dict[str, float]:
+    """Entries/second for one-at-a-time inserts versus add_completed_entries"""
+    from database import DatabaseManager
+    results = {}
+
+    if count <= loop_limit:
+        db = DatabaseManager(os.path.join(directory, f'loop_{count}.db'))
+        started = _time.perf_counter()
+        for entry in synthetic_entries(count):
+            db.add_completed_entry(entry)
+        results['add_completed_entry loop'] = count / (_time.perf_counter() - started)
+        db.close()
+
+    db = DatabaseManager(os.path.join(directory, f'bulk_{count}.db'))
+    started = _time.perf_counter()
+    db.add_completed_entries(synthetic_entries(count))
+    results['add_completed_entries'] = count / (_time.perf_counter() - started)
+    db.close()
+    return results
+
+class LegacyTimeEntry:
+    """The dict-backed entry class used before time_entry.TimeEntry, for comparison"""
+    
+    def __init__(self, start_time, end_time=None, description=""):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.description = description
+    
+    def duration_hours(self) -> float:
+        if not self.end_time:
+            return 0
+        return int((self.end_time - self.start_time).total_seconds() / 60) / 60
+
+def bench_entries(db_path: str, repeat: int = 5) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Time and memory to load every entry as LegacyTimeEntry versus TimeEntry"""
+    from database import DatabaseManager, entry_columns
+    db = DatabaseManager(db_path)
+    conn = db.connections.connection()
+    
+    def legacy():
+        # What DatabaseManager did per row before the row factory
+        return [
+            LegacyTimeEntry(datetime.fromisoformat(start), datetime.fromisoformat(end) if end else None, description)
+            for start, end, description in conn.execute('SELECT start_time, end_time, description FROM time_entries')
+        ]
+    
+    def current():
+        return db._query_entries(f'SELECT {entry_columns()} FROM time_entries').fetchall()
+    
+    times, memory = {}, {}
+    for name, load in (('legacy class', legacy), ('TimeEntry row factory', current)):
+        times[f'{name}: load'] = time_call(load, repeat)
+        entries = load()
+        times[f'{name}: load + sum(duration_hours)'] = time_call(lambda: sum(e.duration_hours() for e in load()), repeat)
+        del entries
+        
+        tracemalloc.start()
+        entries = load()
+        memory[f'{name}: after load'] = tracemalloc.get_traced_memory()[0] / len(entries)
+        for entry in entries:
+            entry.start_time, entry.end_time
+        memory[f'{name}: after reading times'] = tracemalloc.get_traced_memory()[0] / len(entries)
+        tracemalloc.stop()
+        del entries
+    db.close()
+    return times, memory
+
+def entry_aggregates(entries) -> Tuple:
+    """Totals per day, week, weekday and description from TimeEntry objects"""
+    total, by_day, by_description = 0, {}, {}
+    for entry in entries:
+        minutes = entry.duration_minutes()
+        day = entry.start_time.date()
+        total += minutes
+        by_day[day] = by_day.get(day, 0) + minutes
+        by_description[entry.description] = by_description.get(entry.description, 0) + minutes
+    by_week, by_weekday = {}, [0] * 7
+    for day, minutes in by_day.items():
+        monday = day - timedelta(days=day.weekday())
+        by_week[monday] = by_week.get(monday, 0) + minutes
+        by_weekday[day.weekday()] += minutes
+    return total, by_day, by_week, by_weekday, by_description
+
+def batch_aggregates(batch) -> Tuple:
+    """The same totals from an EntryBatch"""
+    return batch.total_minutes(), batch.by_day(), batch.by_week(), batch.by_weekday(), batch.by_description()
+
+def bench_aggregates(db_path: str, year: int, repeat: int = 3) -> Dict[str, float]:
+    """Time a year's report aggregates from TimeEntry objects versus EntryBatch columns"""
+    import entry_batch
+    from database import DatabaseManager
+    db = DatabaseManager(db_path)
+    start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    numpy = entry_batch.numpy
+
+    results = {}
+    entries = list(db.iter_entries(start, end))
+    results['TimeEntry loop: aggregate'] = time_call(lambda: entry_aggregates(entries), repeat)
+    results['TimeEntry loop: load + aggregate'] = time_call(
+        lambda: entry_aggregates(db.iter_entries(start, end)), repeat)
+    del entries
+
+    variants = [('EntryBatch (array)', None)]
+    if numpy is not None:
+        variants.append(('EntryBatch (numpy)', numpy))
+    for name, module in variants:
+        entry_batch.numpy = module
+        try:
+            batch = db.get_entry_batch(start, end)
+            results[f'{name}: aggregate'] = time_call(lambda: batch_aggregates(batch), repeat)
+            results[f'{name}: load + aggregate'] = time_call(
+                lambda: batch_aggregates(db.get_entry_batch(start, end)), repeat)
+            del batch
+        finally:
+            entry_batch.numpy = numpy
+    db.close()
+    return results
+
+def bench_startup(directory: str, repeat: int = 10) -> Dict[str, float]:
+    """Startup latency of `cli.py status` on directory/timesheet.db"""
+    from timesheet_sqlite import TimesheetManager
+    cli_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cli.py')
+    db_path = os.path.join(directory, 'timesheet.db')
+
+    def status():
+        subprocess.run([sys.executable, cli_path, 'status'], cwd=directory, check=True, stdout=subprocess.DEVNULL)
+
+    def interpreter():
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+
+    results = {
+        'python -c pass': time_call(interpreter, repeat),
+        'cli.py status': time_call(status, repeat),
+        'TimesheetManager() (warm, in process)': time_call(lambda: TimesheetManager(db_path), repeat * 10),
+    }
+    TimesheetManager(db_path).db.close()
+    return results
+
+def bench_daemon(directory: str, repeat: int = 10) -> Dict[str, float]:
+    """Round trip of CLI commands in directory, in-process and through `cli.py daemon`"""
+    cli_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cli.py')
+
+    def command(*args):
+        return lambda: subprocess.run([sys.executable, cli_path, *args], cwd=directory,
+                                      check=True, stdout=subprocess.DEVNULL)
+
+    def measure(label: str) -> Dict[str, float]:
+        start, stop = command('start', '-d', 'bench'), command('stop')
+        starts, stops = [], []
+        for _ in range(repeat):
+            for fn, times in ((start, starts), (stop, stops)):
+                started = _time.perf_counter()
+                fn()
+                times.append((_time.perf_counter() - started) * 1000)
+        return {
+            f'start ({label})': statistics.median(starts),
+            f'stop ({label})': statistics.median(stops),
+            f'status ({label})': time_call(command('status'), repeat),
+            f'list ({label})': time_call(command('list'), repeat),
+        }
+
+    results = measure('in-process')
+    socket_file = os.path.join(directory, 'timesheet.db.sock')
+    daemon = subprocess.Popen([sys.executable, cli_path, 'daemon'], cwd=directory, stdout=subprocess.DEVNULL)
+    try:
+        while not os.path.exists(socket_file):
+            if daemon.poll() is not None:
+                raise RuntimeError('daemon exited before listening')
+            _time.sleep(0.01)
+        results.update(measure('daemon'))
+    finally:
+        daemon.terminate()
+        daemon.wait()
+    return results
+
+def bench_methods(db_path: str, repeat: int = 20) -> Dict[str, float]:
+    """Time the public TimesheetManager read and write methods.
+    
+    Writes use entries of their own that are deleted again, so the database
+    keeps its size and every size of a run is measured on the same data.
+    """
+    from time_entry import TimeEntry
+    from timesheet_sqlite import TimesheetManager
+    manager = TimesheetManager(db_path)
+    day = last_month()
+    year, month = day.year, day.month
+    total = manager.count_entries()
+    some_id = manager.resolve_index(total // 2)
+    workday = TimeEntry(datetime(day.year, day.month, day.day, 9), datetime(day.year, day.month, day.day, 17))
+
+    reads = {
+        'current_session': lambda: manager.current_session,
+        'count_entries': manager.count_entries,
+        'entries[-20:] (list)': lambda: manager.entries[-20:],
+        'resolve_index (middle)': lambda: manager.resolve_index(total // 2),
+        'get_entry_by_id': lambda: manager.get_entry_by_id(some_id),
+        'get_recent_entries': manager.get_recent_entries,
+        'get_entries_page': manager.get_entries_page,
+        'get_entries_for_date': lambda: manager.get_entries_for_date(day),
+        'get_entries_for_month': lambda: manager.get_entries_for_month(year, month),
+        'get_entry_batch_for_month': lambda: manager.get_entry_batch_for_month(year, month),
+        'get_total_hours_for_month': lambda: manager.get_total_hours_for_month(year, month),
+        'get_daily_summary_for_month': lambda: manager.get_daily_summary_for_month(year, month),
+        'get_daily_details_for_month': lambda: manager.get_daily_details_for_month(year, month),
+        'get_stats': manager.get_stats,
+        'search_entries': lambda: manager.search_entries('invoice migration'),
+        'find_overlaps': lambda: manager.find_overlaps(workday),
+    }
+    results = {name: time_call(fn, repeat) for name, fn in reads.items()}
+
+    # Written entries get a description of their own, so they never duplicate
+    # synthetic ones and are easy to find again; distinct start minutes keep
+    # them from duplicating each other. They overlap each other and the
+    # synthetic entries, so they are written with the 'warn' policy, which
+    # skips the check; find_overlaps above times what 'reject' adds
+    starts = [f"{i // 60:02d}:{i % 60:02d}" for i in range(min(repeat, 1000))]
+    results['add_manual_entry'] = time_each(
+        lambda start=start: manager.add_manual_entry(day, start, '23:59', 'bench write', overlap='warn') for start in starts)
+    results['add_duration_entry'] = time_each(
+        lambda start=start: manager.add_duration_entry(day, '15m', start, 'bench write', overlap='warn') for start in starts)
+    ids = [row[0] for row in manager.db.connections.connection().execute(
+        "SELECT id FROM time_entries WHERE description = 'bench write'")]
+    results['update_entry_by_id'] = time_each(
+        lambda entry_id=entry_id, i=i: manager.update_entry_by_id(
+            entry_id, datetime(day.year, day.month, 1) + timedelta(minutes=i), datetime(day.year, day.month, 1, 23, 59),
+            'bench write', overlap='warn')
+        for i, entry_id in enumerate(ids))
+    results['delete_entry_by_id'] = time_each(
+        lambda entry_id=entry_id: manager.delete_entry_by_id(entry_id) for entry_id in ids)
+    results['start_session + stop_session'] = time_call(
+        lambda: (manager.start_session('bench write'), manager.stop_session()), repeat)
+
+    # Leave the data set as it was for the next measurement
+    for (entry_id,) in manager.db.connections.connection().execute(
+            "SELECT id FROM time_entries WHERE description = 'bench write'").fetchall():
+        manager.delete_entry_by_id(entry_id)
+    manager.db.close()
+    return results
+
+def load_web_app(db_path: str):
+    """web_app pointed at db_path, or None without Flask"""
+    try:
+        import flask  # noqa: F401
+    except ImportError:
+        return None
+    # web_app opens timesheet.db in the working directory when it is imported
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(os.path.abspath(db_path)))
+    try:
+        import web_app
+    finally:
+        os.chdir(cwd)
+    from timesheet_sqlite import TimesheetManager
+    web_app.timesheet_manager = TimesheetManager(db_path)
+    return web_app
+
+# Entries per request of the bulk endpoint benchmark
+BULK_ITEMS = 1000
+
+def bench_web(db_path: str, repeat: int = 20) -> Dict[str, float]:
+    """Time the main Flask routes through the test client"""
+    web_app = load_web_app(db_path)
+    if web_app is None:
+        return {}
+    manager = web_app.timesheet_manager
+    client = web_app.app.test_client()
+    day = last_month()
+    some_id = manager.resolve_index(manager.count_entries() // 2)
+
+    def get(url):
+        def fn():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return fn
+
+    pages = {
+        'GET /': '/',
+        'GET /entries': '/entries',
+        'GET /reports': f'/reports?year={day.year}&month={day.month}',
+        'GET /calendar': f'/calendar?year={day.year}&month={day.month}',
+        'GET /api/stats': '/api/stats',
+        'GET /api/session/status': '/api/session/status',
+        'GET /api/search': '/api/search?q=code+review',
+        'GET /api/day-details': f'/api/day-details/{day.isoformat()}',
+        'GET /api/entry/<id>': f'/api/entry/{some_id}',
+    }
+    results = {name: time_call(get(url), repeat) for name, url in pages.items()}
+
+    def add(i):
+        response = client.post('/api/entry/add', json={
+            'date': day.isoformat(), 'start_time': f"{i // 60:02d}:{i % 60:02d}", 'end_time': '23:59',
+            'description': 'bench web', 'overlap': 'warn'})
+        if response.status_code != 200:
+            raise RuntimeError(f"POST /api/entry/add returned {response.status_code}")
+    results['POST /api/entry/add'] = time_each(lambda i=i: add(i) for i in range(min(repeat, 1000)))
+    ids = [row[0] for row in manager.db.connections.connection().execute(
+        "SELECT id FROM time_entries WHERE description = 'bench web'")]
+    results['DELETE /api/entry/<id>/delete'] = time_each(
+        lambda entry_id=entry_id: client.delete(f'/api/entry/{entry_id}/delete') for entry_id in ids)
+
+    # Back-to-back one-minute sessions, overlapping only the day's existing entries
+    bulk = json.dumps([{'date': day.isoformat(), 'start_time': f"{i // 60 % 24:02d}:{i % 60:02d}",
+                        'duration': '1m', 'description': f'bench bulk {i}'} for i in range(BULK_ITEMS)])
+
+    def bulk_add():
+        started = _time.perf_counter()
+        response = client.post('/api/entries/bulk?overlap=warn', data=bulk, content_type='application/json')
+        elapsed = (_time.perf_counter() - started) * 1000
+        if response.status_code != 200 or response.get_json()['added'] != BULK_ITEMS:
+            raise RuntimeError(f"POST /api/entries/bulk returned {response.status_code}")
+        with manager.db.connections.transaction() as conn:
+            conn.execute("DELETE FROM time_entries WHERE description LIKE 'bench bulk %'")
+        manager.db.connections.month_cache.clear()
+        return elapsed
+    results[f'POST /api/entries/bulk ({BULK_ITEMS} entries)'] = statistics.median(
+        bulk_add() for _ in range(min(repeat, 5)))
+    manager.db.close()
+    return results
+
+def bench_web_writes(db_path: str, clients: int = 8, writes: int = 50) -> Tuple[Dict[str, float], ...]:
+    """Concurrent POST /api/entry/add and DELETE requests, with and without the write queue.
+    
+    clients threads each add writes entries and then delete them. Returns
+    (request latencies in ms, writes per second, writes per commit of the queue).
+    """
+    import threading
+    from write_queue import WriteQueue
+    web_app = load_web_app(db_path)
+    if web_app is None:
+        return {}, {}, {}
+    manager = web_app.timesheet_manager
+    day = last_month()
+    latencies, throughput, batches = {}, {}, {}
+    errors = []
+
+    def client_writes(client_number: int, times: list, go: threading.Event):
+        try:
+            requests(client_number, times, go)
+        except Exception as e:
+            errors.append(e)
+
+    def requests(client_number: int, times: list, go: threading.Event):
+        client = web_app.app.test_client()
+        go.wait()
+        ids = []
+        for i in range(writes):
+            started = _time.perf_counter()
+            response = client.post('/api/entry/add', json={
+                'date': day.isoformat(), 'start_time': f"{i % 24:02d}:{client_number % 60:02d}",
+                'duration': '30m', 'description': f'bench writes {client_number} {i}', 'overlap': 'warn'})
+            times.append((_time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"POST /api/entry/add returned {response.status_code}")
+        for row in manager.db.connections.connection().execute(
+                "SELECT id FROM time_entries WHERE description LIKE ?", (f'bench writes {client_number} %',)):
+            ids.append(row[0])
+        manager.db.connections.release()
+        for entry_id in ids:
+            started = _time.perf_counter()
+            if client.delete(f'/api/entry/{entry_id}/delete').status_code != 200:
+                raise RuntimeError(f"DELETE /api/entry/{entry_id}/delete failed")
+            times.append((_time.perf_counter() - started) * 1000)
+
+    for label in ('direct', 'write queue'):
+        queue = web_app.write_queue = WriteQueue(manager.db.connections) if label == 'write queue' else None
+        go = threading.Event()
+        times = [[] for _ in range(clients)]
+        threads = [threading.Thread(target=client_writes, args=(n, times[n], go)) for n in range(clients)]
+        for thread in threads:
+            thread.start()
+        started = _time.perf_counter()
+        go.set()
+        for thread in threads:
+            thread.join()
+        elapsed = _time.perf_counter() - started
+        if queue is not None:
+            queue.close()
+            web_app.write_queue = None
+        if errors:
+            raise errors[0]
+        merged = sorted(t for client_times in times for t in client_times)
+        label = f"{label}, {clients} client{'s' if clients > 1 else ''}"
+        latencies[f'p50 ({label})'] = merged[len(merged) // 2]
+        latencies[f'p99 ({label})'] = merged[min(len(merged) - 1, len(merged) * 99 // 100)]
+        throughput[f'writes ({label})'] = len(merged) / elapsed
+        if queue is not None:
+            batches[label] = queue.stats()['average_batch']
+    manager.db.close()
+    return latencies, throughput, batches
+
+def bench_pdf(db_path: str, directory: str, repeat: int = 5) -> Dict[str, float]:
+    """Time PDFGenerator on last month's entries"""
+    try:
+        from pdf_generator import PDFGenerator
+    except ImportError:
+        return {}
+    from timesheet_sqlite import TimesheetManager
+    manager = TimesheetManager(db_path)
+    day = last_month()
+    output = os.path.join(directory, 'bench_report.pdf')
+    results = {
+        'generate_monthly_report': time_call(
+            lambda: PDFGenerator().generate_monthly_report(manager, day.year, day.month, output), repeat),
+    }
+    manager.db.close()
+    return results
+
+def print_results(title: str, results: Dict[str, float], unit: str = 'ms'):
+    print(f"\n{title}")
+    width = max(len(name) for name in results)
+    for name, value in results.items():
+        print(f"  {name:<{width}}  {value:12.3f} {unit}")
+
+SUITES = ('scale', 'reads', 'inserts', 'entries', 'aggregates', 'startup', 'daemon', 'writes')
+
+# Database sizes of a full scale run
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+def environment() -> Dict:
+    """What a result was measured on, so runs of different versions can be compared"""
+    import platform
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+    }
+
+def run_suite(suite: str, entries: int, directory: str, repeat: int) -> Dict:
+    """Run one suite on a fresh database of the given size and print its results"""
+    if suite == 'scale':
+        db_path = os.path.join(directory, 'bench.db')
+        populate(db_path, entries)
+        results = {
+            'methods': bench_methods(db_path, repeat),
+            'web': bench_web(db_path, repeat),
+            'pdf': bench_pdf(db_path, directory, min(repeat, 5)),
+        }
+        print_results(f"TimesheetManager methods ({entries} entries, median of {repeat} calls)", results['methods'])
+        if results['web']:
+            print_results(f"Web routes ({entries} entries, median of {repeat} requests)", results['web'])
+        if results['pdf']:
+            print_results(f"PDF report ({entries} entries, median of {min(repeat, 5)} runs)", results['pdf'])
+        return results
+    if suite == 'reads':
+        db_path = os.path.join(directory, 'bench.db')
+        populate(db_path, entries)
+        results = bench_reads(db_path, repeat)
+        print_results(f"Read methods ({entries} entries, median of {repeat} calls)", results)
+        return results
+    if suite == 'entries':
+        db_path = os.path.join(directory, 'bench.db')
+        populate(db_path, entries)
+        times, memory = bench_entries(db_path, min(repeat, 10))
+        print_results(f"Entry construction ({entries} entries)", times)
+        print_results(f"Memory per entry ({entries} entries)", memory, 'bytes')
+        return {'ms': times, 'bytes_per_entry': memory}
+    if suite == 'aggregates':
+        db_path = os.path.join(directory, 'bench.db')
+        year = datetime.now().year - 1
+        populate_year(db_path, entries, year)
+        results = bench_aggregates(db_path, year, min(repeat, 5))
+        print_results(f"Year aggregates ({entries} entries in {year})", results)
+        return results
+    if suite == 'startup':
+        populate(os.path.join(directory, 'timesheet.db'), entries)
+        results = bench_startup(directory, min(repeat, 20))
+        print_results(f"Startup ({entries} entries, median of {min(repeat, 20)} runs)", results)
+        return results
+    if suite == 'daemon':
+        populate(os.path.join(directory, 'timesheet.db'), entries)
+        results = bench_daemon(directory, min(repeat, 20))
+        print_results(f"CLI round trip ({entries} entries, median of {min(repeat, 20)} runs)", results)
+        return results
+    if suite == 'writes':
+        db_path = os.path.join(directory, 'bench.db')
+        populate(db_path, entries)
+        latencies, throughput, batches = {}, {}, {}
+        for clients in (1, 8):
+            ms, per_second, per_commit = bench_web_writes(db_path, clients, min(repeat, 100))
+            latencies.update(ms)
+            throughput.update(per_second)
+            batches.update(per_commit)
+        if latencies:
+            print_results(f"Web write latency ({entries} entries, {min(repeat, 100)} adds and deletes per client)",
+                          latencies)
+            print_results("Web write throughput", throughput, 'writes/s')
+            print_results("Writes per commit", batches, 'writes')
+        return {'ms': latencies, 'writes_per_second': throughput, 'writes_per_commit': batches}
+    if suite == 'inserts':
+        results = bench_inserts(directory, entries)
+        print_results(f"Inserts ({entries} entries)", results, 'entries/s')
+        return results
+    raise ValueError(f"unknown suite {suite!r}")
+
+def run(suite: str, sizes: Iterable[int], repeat: int, json_file: str = None) -> Dict:
+    """Run a suite once per database size, each in its own temporary directory"""
+    results = {}
+    for entries in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            results[entries] = run_suite(suite, entries, tmp, repeat)
+
+    report = {'suite': suite, 'environment': environment(), 'results': results}
+    if json_file:
+        with open(json_file, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Timesheet benchmarks')
+    parser.add_argument('suite', choices=SUITES)
+    parser.add_argument('--entries', type=int, action='append', help='Synthetic entries to generate (repeatable)')
+    parser.add_argument('--repeat', type=int, default=100, help='Calls per measurement')
+    parser.add_argument('--json', dest='json_file', help='Also write results to this JSON file')
+    args = parser.parse_args()
+    run(args.suite, args.entries or [5000], args.repeat, args.json_file)
+
+if __name__ == '__main__':
+    main()
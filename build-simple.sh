@@ -23,6 +23,8 @@ mkdir -p "$BUILD_DIR/DEBIAN"
 cp timesheet.py "$BUILD_DIR/usr/lib/python3/dist-packages/timesheet_tracker/"
 cp pdf_generator.py "$BUILD_DIR/usr/lib/python3/dist-packages/timesheet_tracker/"
 cp __init__.py "$BUILD_DIR/usr/lib/python3/dist-packages/timesheet_tracker/"
+cp cli_*.py daemon.py session_state.py batch.py profiler.py write_queue.py "$BUILD_DIR/usr/lib/python3/dist-packages/timesheet_tracker/"
+cp time_entry.py database.py timesheet_sqlite.py entry_batch.py importer.py bench.py "$BUILD_DIR/usr/lib/python3/dist-packages/timesheet_tracker/"
 
 # Create CLI wrapper
 cat > "$BUILD_DIR/usr/bin/timesheet-tracker" << 'EOF'
@@ -30,9 +32,9 @@ cat > "$BUILD_DIR/usr/bin/timesheet-tracker" << 'EOF'
 import sys
 import os
 sys.path.insert(0, '/usr/lib/python3/dist-packages/timesheet_tracker')
-from cli import cli
+from cli import main
 if __name__ == '__main__':
-    cli()
+    main()
 EOF
 
 # Copy CLI module with proper imports
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+The bench command. It lives apart from the other data commands, so that
+they do not load the benchmark module.
+"""
+
+import click
+from bench import DEFAULT_SIZES, SUITES, run
+
+@click.command()
+@click.option('--suite', '-s', type=click.Choice(SUITES), default='scale', show_default=True,
+              help='What to measure; scale covers the TimesheetManager methods, web routes and PDF reports')
+@click.option('--entries', '-n', type=int, multiple=True,
+              help='Synthetic entries per database, repeatable (default: 1000, 100000 and 1000000)')
+@click.option('--repeat', '-r', type=int, default=20, show_default=True, help='Calls per measurement')
+@click.option('--json', 'json_file', type=click.Path(dir_okay=False), help='Also save the results as JSON')
+def bench(suite, entries, repeat, json_file):
+    """Benchmark on throwaway databases filled with synthetic entries
+    
+    Your own timesheet.db is never touched. Save results with --json to
+    compare versions; the file records the commit, Python and SQLite used.
+    """
+    sizes = entries or DEFAULT_SIZES
+    click.echo(f"⏱️  Running the {suite} benchmarks on {', '.join(f'{size:,}' for size in sizes)} entries")
+    run(suite, sizes, repeat, json_file)
+    if json_file:
+        click.echo(f"\n✅ Results saved to {json_file}")
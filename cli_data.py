@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Data maintenance commands: JSON migration, import/export, derived-table
+rebuilds and database info.
+"""
+
+import click
+from datetime import timedelta
+import os
+import sys
+from timesheet_sqlite import TimesheetManager
+
+@click.command()
+@click.argument('json_file', default='timesheet_data.json', type=click.Path(dir_okay=False))
+def migrate(json_file):
+    """Migrate existing JSON data (timesheet_data.json) to SQLite database"""
+    if not os.path.exists(json_file):
+        click.echo(f"❌ No JSON data found at {json_file}")
+        return
+    
+    manager = TimesheetManager()
+    if not manager.migrate_from_json(json_file):
+        click.echo("❌ Migration failed")
+        return
+    click.echo("✅ Migration complete! Your data is now stored in SQLite database.")
+    click.echo("   Database file: timesheet.db")
+    
+    # Show stats
+    stats = manager.get_stats()
+    click.echo(f"   Total entries: {stats['total_entries']}")
+    click.echo(f"   Total hours: {stats['total_hours']}")
+
+@click.command(name='import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--format', '-f', 'input_format', type=click.Choice(['csv', 'jsonl']), help='Input format (default: from file extension)')
+@click.option('--chunk-size', default=5000, show_default=True, help='Entries committed per chunk')
+def import_entries(source, input_format, chunk_size):
+    """Import work sessions from a CSV or JSONL file (- for stdin)
+    
+    Each record needs start_time and end_time (ISO format) and may have a
+    description. Entries that already exist are skipped, so an import can
+    safely be re-run.
+    """
+    from importer import READERS, detect_format, import_entries as run_import
+    
+    input_format = input_format or detect_format(source.name)
+    if not input_format:
+        click.echo("❌ Cannot tell the input format from the file name. Use --format csv or --format jsonl")
+        return
+    
+    manager = TimesheetManager()
+    last_report = [0.0]
+    
+    def report_progress(stats):
+        if stats.elapsed - last_report[0] >= 1:
+            last_report[0] = stats.elapsed
+            click.echo(f"   ... {stats.read:,} read, {stats.added:,} added ({stats.rate:,.0f} entries/s)")
+    
+    click.echo(f"📥 Importing {input_format.upper()} from {source.name}")
+    try:
+        stats = run_import(manager.db, READERS[input_format](source), chunk_size, report_progress)
+    except ValueError as e:
+        click.echo(f"❌ Import stopped: {e}")
+        click.echo("   Entries committed before the error were kept; re-running the import skips them.")
+        sys.exit(1)
+    
+    click.echo(f"✅ Import complete in {stats.elapsed:.2f}s ({stats.rate:,.0f} entries/s)")
+    click.echo(f"   Read: {stats.read:,}")
+    click.echo(f"   Added: {stats.added:,}")
+    click.echo(f"   Skipped duplicates: {stats.skipped:,}")
+
+@click.command()
+@click.argument('target', type=click.File('w', encoding='utf-8', lazy=False), default='-')
+@click.option('--format', '-f', 'output_format', type=click.Choice(['csv', 'jsonl']), help='Output format (default: from file extension, else csv)')
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), help='First day to export (YYYY-MM-DD)')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day to export (YYYY-MM-DD)')
+def export(target, output_format, start, end):
+    """Export completed work sessions to a CSV or JSONL file (- for stdout)
+    
+    Entries are streamed from the database, so exports of any size run in
+    constant memory. The output can be read back with the import command.
+    """
+    from importer import WRITERS, detect_format
+    
+    output_format = output_format or detect_format(target.name) or 'csv'
+    manager = TimesheetManager()
+    entries = manager.iter_entries(
+        start.date() if start else None,
+        end.date() + timedelta(days=1) if end else None
+    )
+    count = WRITERS[output_format](entries, target)
+    # Report on stderr so stdout exports stay clean
+    click.echo(f"✅ Exported {count:,} entries to {target.name}", err=True)
+
+@click.command()
+def rebuild():
+    """Rebuild derived tables (daily totals, search index, overlap bound) from the time entries"""
+    manager = TimesheetManager()
+    days = manager.rebuild_daily_totals()
+    click.echo(f"✅ Daily totals rebuilt for {days} days")
+    longest = manager.rebuild_span_bound()
+    click.echo(f"✅ Overlap checks bounded by the longest entry ({longest / 3600:.2f}h)")
+    if manager.rebuild_search_index():
+        click.echo("✅ Search index rebuilt")
+    else:
+        click.echo("⚠️  SQLite was built without FTS5; search falls back to slower LIKE scans")
+
+@click.command()
+def dbinfo():
+    """Show database location and effective connection settings"""
+    manager = TimesheetManager()
+    settings = manager.db.get_connection_settings()
+    
+    click.echo(f"\n🗄️  Database: {os.path.abspath(manager.data_file)}")
+    click.echo(f"   Journal mode: {settings['journal_mode']}")
+    click.echo(f"   Synchronous: {settings['synchronous']}")
+    click.echo(f"   Cache size: {settings['cache_size']}")
+    click.echo(f"   Mmap size: {settings['mmap_size']}")
+    click.echo(f"   Busy timeout: {settings['busy_timeout']} ms")
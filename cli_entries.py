@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Commands that add, list, edit, delete, search and summarize work sessions.
+"""
+
+import click
+import sys
+from datetime import datetime, date, time, timedelta
+import calendar
+from database import DatabaseManager, OverlapError, OVERLAP_POLICIES
+from timesheet_sqlite import TimesheetManager
+from time_entry import TimeEntry, parse_duration
+
+OVERLAP_HELP = ('What to do if the session overlaps existing ones: refuse it, '
+                'save it anyway (warn), or merge them into one session')
+
+@click.command()
+@click.option('--month', '-m', type=int, help='Month (1-12)')
+@click.option('--year', '-y', type=int, help='Year')
+@click.option('--limit', '-l', default=20, help='Maximum number of entries to show')
+def list(month, year, limit):
+    """List work sessions"""
+    manager = TimesheetManager()
+    
+    if month and year:
+        month_name = calendar.month_name[month]
+        click.echo(f"\n📋 Work sessions for {month_name} {year}:")
+        total_hours = manager.get_total_hours_for_month(year, month)
+        click.echo(f"   Total hours: {total_hours:.2f}")
+        
+        # Stream the month instead of loading it, with sequential numbering
+        count = 0
+        for count, entry in enumerate(manager.iter_entries_for_month(year, month), 1):
+            if count == 1:
+                click.echo()
+            _echo_entry(count, entry)
+        
+        if not count:
+            click.echo("   No work sessions found")
+        return
+    
+    # Only the shown rows are read, however many entries there are
+    all_entries = manager.entries
+    total = len(all_entries)
+    entries = all_entries[-limit:]
+    click.echo(f"\n📋 Recent work sessions (last {len(entries)}):")
+    
+    if not entries:
+        click.echo("   No work sessions found")
+        return
+    
+    click.echo()
+    
+    # For recent view, show absolute indices for deletion
+    start_index = total - len(entries)
+    for i, entry in enumerate(entries):
+        _echo_entry(start_index + i + 1, entry)
+    
+    if total > limit:
+        click.echo(f"\n   (Showing last {len(entries)} of {total} total entries)")
+        click.echo(f"   Use 'delete' command with the index numbers shown above")
+
+def _echo_entry(index, entry):
+    start_date = entry.start_time.strftime('%Y-%m-%d')
+    start_time = entry.start_time.strftime('%H:%M')
+    end_time = entry.end_time.strftime('%H:%M') if entry.end_time else 'N/A'
+    duration = f"{entry.duration_hours():.2f}h"
+    
+    click.echo(f"{index:2d}. {start_date} {start_time} - {end_time} ({duration})")
+    if entry.description:
+        click.echo(f"     📝 {entry.description}")
+
+def _overlap_check(manager, overlap, build, *args):
+    """(entry, entries it overlaps) for a session saved with the warn or merge policy"""
+    if overlap == 'reject':
+        return None, []
+    try:
+        entry = build(*args)
+    except ValueError:
+        return None, []
+    return entry, manager.find_overlaps(entry)
+
+def _echo_overlaps(heading, overlaps):
+    click.echo(heading)
+    for other in overlaps:
+        click.echo(f"   {other.start_time.strftime('%Y-%m-%d %H:%M')} - {other.end_time.strftime('%H:%M')}"
+                   f"  {other.description}")
+
+def _echo_rejected(error):
+    _echo_overlaps(f"❌ Not saved, the session overlaps {len(error.overlaps)} existing one(s):", error.overlaps)
+    click.echo("   Use --overlap warn to save it anyway or --overlap merge to combine them")
+
+def _echo_saved_overlaps(manager, overlap, entry, overlaps):
+    if not overlaps:
+        return
+    if overlap == 'merge':
+        # Merging can reach past the sessions it overlapped at first
+        _echo_overlaps("🔀 Merged with the sessions it overlapped into:", manager.find_overlaps(entry))
+    else:
+        _echo_overlaps(f"⚠️  Overlaps {len(overlaps)} existing session(s):", overlaps)
+
+@click.command()
+@click.option('--date', '-d', required=True, help='Date in YYYY-MM-DD format')
+@click.option('--start', '-s', required=True, help='Start time in HH:MM format')
+@click.option('--end', '-e', required=True, help='End time in HH:MM format')
+@click.option('--description', '--desc', default='', help='Description of the work session')
+@click.option('--overlap', type=click.Choice(OVERLAP_POLICIES), default='reject', show_default=True, help=OVERLAP_HELP)
+def add(date, start, end, description, overlap):
+    """Add work session for a specific date"""
+    manager = TimesheetManager()
+    
+    try:
+        # Parse the date
+        date_obj = datetime.strptime(date, '%Y-%m-%d').date()
+        
+        # Validate that the date is not in the future
+        if date_obj > datetime.now().date():
+            click.echo("❌ Cannot add work session for future dates")
+            return
+        
+        # Add the manual entry
+        entry, overlaps = _overlap_check(manager, overlap, DatabaseManager.manual_entry, date_obj, start, end, description)
+        try:
+            added = manager.add_manual_entry(date_obj, start, end, description, overlap)
+        except OverlapError as e:
+            _echo_rejected(e)
+            return
+        if added:
+            duration_hours = 0
+            # Calculate duration for display
+            try:
+                start_hour, start_min = map(int, start.split(':'))
+                end_hour, end_min = map(int, end.split(':'))
+                start_minutes = start_hour * 60 + start_min
+                end_minutes = end_hour * 60 + end_min
+                
+                # Handle next day case
+                if end_minutes <= start_minutes:
+                    end_minutes += 24 * 60
+                
+                duration_minutes = end_minutes - start_minutes
+                duration_hours = duration_minutes / 60
+            except:
+                pass
+            
+            click.echo(f"✅ Work session added for {date}")
+            click.echo(f"   Time: {start} - {end} ({duration_hours:.2f} hours)")
+            if description:
+                click.echo(f"   Description: {description}")
+            _echo_saved_overlaps(manager, overlap, entry, overlaps)
+        else:
+            click.echo("❌ Invalid time format. Use HH:MM format (e.g., 09:30)")
+            
+    except ValueError:
+        click.echo("❌ Invalid date format. Use YYYY-MM-DD format (e.g., 2025-08-26)")
+
+@click.command()
+@click.option('--date', '-d', required=True, help='Date in YYYY-MM-DD format')
+@click.option('--duration', '-dur', required=True, help='Duration like "5h 30m", "2h", or "45m"')
+@click.option('--start', '-s', default='09:00', help='Start time in HH:MM format (default: 09:00)')
+@click.option('--description', '--desc', default='', help='Description of the work session')
+@click.option('--overlap', type=click.Choice(OVERLAP_POLICIES), default='reject', show_default=True, help=OVERLAP_HELP)
+def addhours(date, duration, start, description, overlap):
+    """Add work session using duration (e.g., 5h 30m)"""
+    manager = TimesheetManager()
+    
+    try:
+        # Parse the date
+        date_obj = datetime.strptime(date, '%Y-%m-%d').date()
+        
+        # Validate that the date is not in the future
+        if date_obj > datetime.now().date():
+            click.echo("❌ Cannot add work session for future dates")
+            return
+        
+        # Add the duration entry
+        entry, overlaps = _overlap_check(manager, overlap, DatabaseManager.duration_entry, date_obj, duration, start, description)
+        try:
+            added = manager.add_duration_entry(date_obj, duration, start, description, overlap)
+        except OverlapError as e:
+            _echo_rejected(e)
+            return
+        if added:
+            # Parse duration for display
+            hours, minutes = parse_duration(duration)
+            total_hours = hours + minutes / 60
+            
+            # Calculate end time for display
+            start_hour, start_min = map(int, start.split(':'))
+            start_dt = datetime.combine(date_obj, time(start_hour, start_min))
+            end_dt = start_dt + timedelta(hours=hours, minutes=minutes)
+            end_time = end_dt.strftime('%H:%M')
+            
+            click.echo(f"✅ Work session added for {date}")
+            click.echo(f"   Duration: {duration} ({total_hours:.2f} hours)")
+            click.echo(f"   Time: {start} - {end_time}")
+            if description:
+                click.echo(f"   Description: {description}")
+            _echo_saved_overlaps(manager, overlap, entry, overlaps)
+        else:
+            click.echo("❌ Invalid duration format. Use formats like '5h 30m', '2h', or '45m'")
+            
+    except ValueError:
+        click.echo("❌ Invalid date format. Use YYYY-MM-DD format (e.g., 2025-08-26)")
+
+@click.command()
+@click.option('--index', '-i', type=int, help='Index of the entry to delete (see with "list" command)')
+@click.option('--confirm', '-y', is_flag=True, help='Skip confirmation prompt')
+def delete(index, confirm):
+    """Delete a work session by index"""
+    manager = TimesheetManager()
+    entries = manager.entries
+    
+    if not entries:
+        click.echo("❌ No work sessions to delete")
+        return
+    
+    # If no index provided, show list and ask for index
+    if index is None:
+        click.echo("\n📋 Current work sessions:")
+        entries_with_index = manager.get_entries_with_index()
+        
+        # Show entries in chronological order with absolute indices
+        for idx, entry in entries_with_index:
+            start_date = entry.start_time.strftime('%Y-%m-%d')
+            start_time = entry.start_time.strftime('%H:%M')
+            end_time = entry.end_time.strftime('%H:%M') if entry.end_time else 'N/A'
+            duration = f"{entry.duration_hours():.2f}h"
+            
+            click.echo(f"{idx:2d}. {start_date} {start_time} - {end_time} ({duration})")
+            if entry.description:
+                click.echo(f"     📝 {entry.description}")
+        
+        click.echo(f"\nTotal entries: {len(entries_with_index)}")
+        try:
+            index = click.prompt("Enter the index to delete", type=int)
+        except click.Abort:
+            click.echo("Cancelled")
+            return
+    
+    # Resolve the index to one row, which is then deleted by id
+    entry_id = manager.resolve_index(index)
+    if entry_id is None:
+        click.echo(f"❌ Invalid index. Must be between 1 and {len(entries)}")
+        return
+    
+    # Get the entry to delete for confirmation
+    entry_to_delete = manager.get_entry_by_id(entry_id)
+    start_date = entry_to_delete.start_time.strftime('%Y-%m-%d')
+    start_time = entry_to_delete.start_time.strftime('%H:%M')
+    end_time = entry_to_delete.end_time.strftime('%H:%M') if entry_to_delete.end_time else 'N/A'
+    duration = f"{entry_to_delete.duration_hours():.2f}h"
+    
+    click.echo(f"\n🗑️  Entry to delete:")
+    click.echo(f"   {index}. {start_date} {start_time} - {end_time} ({duration})")
+    if entry_to_delete.description:
+        click.echo(f"      📝 {entry_to_delete.description}")
+    
+    # Confirmation
+    if not confirm:
+        if not click.confirm("\nAre you sure you want to delete this entry?"):
+            click.echo("Cancelled")
+            return
+    
+    # Delete the entry
+    if manager.delete_entry_by_id(entry_id):
+        click.echo("✅ Work session deleted successfully")
+    else:
+        click.echo("❌ Failed to delete work session")
+
+@click.command()
+@click.option('--index', '-i', type=int, help='Index of the entry to edit (see with "list" command)')
+@click.option('--overlap', type=click.Choice(OVERLAP_POLICIES), default='reject', show_default=True, help=OVERLAP_HELP)
+def edit(index, overlap):
+    """Edit an existing work session"""
+    manager = TimesheetManager()
+    
+    if not manager.entries:
+        click.echo("❌ No work sessions to edit")
+        return
+    
+    # If no index provided, show list and ask for index
+    if index is None:
+        click.echo("\n📋 Current work sessions:")
+        entries_with_index = manager.get_entries_with_index()
+        
+        # Show entries in chronological order with absolute indices
+        for idx, entry in entries_with_index:
+            start_date = entry.start_time.strftime('%Y-%m-%d')
+            start_time = entry.start_time.strftime('%H:%M')
+            end_time = entry.end_time.strftime('%H:%M') if entry.end_time else 'N/A'
+            duration = f"{entry.duration_hours():.2f}h"
+            
+            click.echo(f"{idx:2d}. {start_date} {start_time} - {end_time} ({duration})")
+            if entry.description:
+                click.echo(f"     📝 {entry.description}")
+        
+        click.echo(f"\nTotal entries: {len(entries_with_index)}")
+        try:
+            index = click.prompt("Enter the index to edit", type=int)
+        except click.Abort:
+            click.echo("Cancelled")
+            return
+    
+    # Validate index
+    entry_id = manager.resolve_index(index)
+    if entry_id is None:
+        click.echo(f"❌ Invalid index. Must be between 1 and {len(manager.entries)}")
+        return
+    
+    # Get the entry to edit
+    entry_to_edit = manager.get_entry_by_id(entry_id)
+    
+    click.echo(f"\n✏️  Editing entry:")
+    click.echo(f"   Date: {entry_to_edit.start_time.strftime('%Y-%m-%d')}")
+    click.echo(f"   Time: {entry_to_edit.start_time.strftime('%H:%M')} - {entry_to_edit.end_time.strftime('%H:%M')}")
+    click.echo(f"   Duration: {entry_to_edit.duration_hours():.2f}h")
+    click.echo(f"   Description: {entry_to_edit.description}")
+    
+    click.echo("\nEnter new values (press Enter to keep current value):")
+    
+    # Get new values
+    new_date_str = click.prompt("Date (YYYY-MM-DD)", default=entry_to_edit.start_time.strftime('%Y-%m-%d'))
+    new_start_str = click.prompt("Start time (HH:MM)", default=entry_to_edit.start_time.strftime('%H:%M'))
+    new_end_str = click.prompt("End time (HH:MM)", default=entry_to_edit.end_time.strftime('%H:%M'))
+    new_description = click.prompt("Description", default=entry_to_edit.description)
+    
+    try:
+        # Parse new values
+        new_date = datetime.strptime(new_date_str, '%Y-%m-%d').date()
+        start_hour, start_min = map(int, new_start_str.split(':'))
+        end_hour, end_min = map(int, new_end_str.split(':'))
+        
+        new_start_time = datetime.combine(new_date, time(start_hour, start_min))
+        new_end_time = datetime.combine(new_date, time(end_hour, end_min))
+        
+        # Handle next day case
+        if new_end_time <= new_start_time:
+            new_end_time += timedelta(days=1)
+        
+        # Update the entry
+        entry, overlaps = _overlap_check(manager, overlap, TimeEntry, new_start_time, new_end_time, new_description)
+        overlaps = [other for other in overlaps if other.id != entry_id]
+        try:
+            updated = manager.update_entry_by_id(entry_id, new_start_time, new_end_time, new_description, overlap)
+        except OverlapError as e:
+            _echo_rejected(e)
+            return
+        if updated:
+            new_duration = (new_end_time - new_start_time).total_seconds() / 3600
+            click.echo(f"\n✅ Entry updated successfully:")
+            click.echo(f"   Date: {new_date}")
+            click.echo(f"   Time: {new_start_str} - {new_end_str}")
+            click.echo(f"   Duration: {new_duration:.2f}h")
+            click.echo(f"   Description: {new_description}")
+            _echo_saved_overlaps(manager, overlap, entry, overlaps)
+        else:
+            click.echo("❌ Failed to update entry")
+            
+    except (ValueError, IndexError) as e:
+        click.echo(f"❌ Invalid input: {str(e)}")
+
+@click.command()
+@click.option('--limit', '-l', default=20, help='Maximum number of pairs to show')
+def overlaps(limit):
+    """Report every pair of overlapping work sessions
+    
+    Both sessions of a pair count fully towards the totals, so overlaps
+    inflate them. All sessions are checked in a single pass in start order.
+    """
+    manager = TimesheetManager()
+    shown, count, seconds = [], 0, 0
+    for pair in manager.db.iter_overlapping_pairs():
+        if len(shown) < limit:
+            shown.append(pair)
+        count += 1
+        seconds += pair[2]
+    
+    if not count:
+        click.echo("✅ No overlapping work sessions")
+        return
+    
+    click.echo(f"\n⚠️  {count} overlapping pair(s), {seconds / 3600:.2f} hours of overlap:")
+    entries = manager.db.get_entries_by_ids({entry_id for pair in shown for entry_id in pair[:2]})
+    for first_id, second_id, overlap_seconds in shown:
+        click.echo()
+        for entry_id in (first_id, second_id):
+            entry = entries[entry_id]
+            click.echo(f"   id {entry_id}: {entry.start_time.strftime('%Y-%m-%d %H:%M')} - "
+                       f"{entry.end_time.strftime('%Y-%m-%d %H:%M')} ({entry.duration_hours():.2f}h)  {entry.description}")
+        click.echo(f"   overlap: {overlap_seconds / 3600:.2f}h")
+    if count > limit:
+        click.echo(f"\n   (Showing the first {limit}; use --limit to see more)")
+
+@click.command()
+@click.argument('source', type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--dry-run', is_flag=True, help='Only check the operations, change nothing')
+@click.option('--overlap', type=click.Choice(OVERLAP_POLICIES), default='reject', show_default=True,
+              help='What to do with added or edited sessions that overlap others')
+def batch(source, dry_run, overlap):
+    """Apply add/addhours/delete/edit operations from a file (- or nothing for stdin)
+    
+    One operation per line, in CLI syntax (add -d 2025-08-04 -s 09:00 -e 17:00)
+    or as a JSON object ({"op": "delete", "index": 3}). Every line is checked
+    first and all of them are applied in one transaction: if any line is
+    invalid, nothing is changed. Indexes are those shown by list before the batch.
+    """
+    from batch import BatchError, run_batch
+    
+    manager = TimesheetManager()
+    try:
+        counts = run_batch(manager.db, source, dry_run=dry_run, overlap=overlap)
+    except BatchError as e:
+        click.echo(f"❌ Batch rejected, nothing was changed ({len(e.errors)} error(s)):")
+        for line, message in e.errors:
+            click.echo(f"   line {line}: {message}")
+        sys.exit(1)
+    
+    total = sum(counts.values())
+    done = ', '.join(f"{count} {op}" for op, count in counts.items() if count) or 'nothing to do'
+    if dry_run:
+        click.echo(f"✅ All {total} operations are valid ({done}); nothing was changed")
+    else:
+        click.echo(f"✅ Applied {total} operations in one transaction ({done})")
+
+@click.command()
+@click.option('--year', '-y', type=int, help='Summarize a whole year instead of the current month')
+def summary(year):
+    """Show summary of the current month, or of a whole year"""
+    manager = TimesheetManager()
+    now = datetime.now()
+    
+    if year:
+        batch = manager.get_entry_batch(date(year, 1, 1), date(year + 1, 1, 1))
+        title = str(year)
+    else:
+        batch = manager.get_entry_batch_for_month(now.year, now.month)
+        title = f"{calendar.month_name[now.month]} {now.year}"
+    total_hours = batch.total_hours()
+    daily_hours = batch.by_day()
+    
+    click.echo(f"\n📊 Summary for {title}:")
+    click.echo(f"   Total hours worked: {total_hours:.2f}")
+    click.echo(f"   Total work sessions: {len(batch)}")
+    click.echo(f"   Days worked: {len(daily_hours)}")
+    
+    if daily_hours:
+        avg_hours = total_hours / len(daily_hours)
+        click.echo(f"   Average hours/day: {avg_hours:.2f}")
+        weekdays = ", ".join(f"{calendar.day_abbr[weekday]} {hours:.1f}"
+                             for weekday, hours in batch.by_weekday().items() if hours)
+        click.echo(f"   Hours by weekday: {weekdays}")
+    
+    if year and daily_hours:
+        monthly_hours = [0.0] * 12
+        for day, hours in daily_hours.items():
+            monthly_hours[day.month - 1] += hours
+        click.echo("\n   Hours by month:")
+        for month, hours in enumerate(monthly_hours, 1):
+            if hours:
+                click.echo(f"     {calendar.month_name[month]:<10} {hours:8.2f}")
+    
+    # Show current session if active
+    if manager.current_session:
+        duration = manager.get_current_session_duration()
+        hours = duration / 60
+        click.echo(f"\n🟢 Current session: {hours:.2f} hours ({duration} minutes)")
+
+@click.command()
+@click.argument('query', nargs=-1, required=True)
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), help='First day to search (YYYY-MM-DD)')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day to search (YYYY-MM-DD)')
+@click.option('--limit', '-l', default=20, help='Maximum number of matches to show')
+def search(query, start, end, limit):
+    """Search work session descriptions
+    
+    Every word must appear in the description; words match regardless of
+    case and word form (e.g. "migrate" finds "migration").
+    """
+    query = ' '.join(query)
+    manager = TimesheetManager()
+    page = manager.search_entries_page(
+        query,
+        start.date() if start else None,
+        end.date() + timedelta(days=1) if end else None,
+        limit
+    )
+    matches = page['entries']
+    
+    click.echo(f"\n🔍 Work sessions matching \"{query}\":")
+    if not matches:
+        click.echo("   No work sessions found")
+        return
+    
+    click.echo()
+    for i, (_, entry) in enumerate(matches, 1):
+        _echo_entry(i, entry)
+    
+    total_hours = sum(entry.duration_hours() for _, entry in matches)
+    click.echo(f"\n   {len(matches)} matches, {total_hours:.2f} hours")
+    if len(matches) == limit:
+        click.echo(f"   (Showing the best {limit}; use --limit or --from/--to to see more)")
+    if page['truncated']:
+        click.echo("   (Only the most recently added matches were ranked; use --from/--to to search older ones)")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+The click command group behind cli.py.
+
+Subcommands live in the cli_*.py modules and are imported only when they
+run, so `status`, `start` and `stop` load click and the database layer
+but never reportlab, Flask or NumPy.
+"""
+
+import importlib
+import click
+
+# Subcommand name -> "module:attribute" of its click command
+COMMANDS = {
+    'start': 'cli_session:start',
+    'stop': 'cli_session:stop',
+    'status': 'cli_session:status',
+    'list': 'cli_entries:list',
+    'add': 'cli_entries:add',
+    'addhours': 'cli_entries:addhours',
+    'delete': 'cli_entries:delete',
+    'edit': 'cli_entries:edit',
+    'summary': 'cli_entries:summary',
+    'search': 'cli_entries:search',
+    'overlaps': 'cli_entries:overlaps',
+    'batch': 'cli_entries:batch',
+    'report': 'cli_reports:report',
+    'web': 'cli_reports:web',
+    'daemon': 'cli_reports:daemon',
+    'migrate': 'cli_data:migrate',
+    'import': 'cli_data:import_entries',
+    'export': 'cli_data:export',
+    'rebuild': 'cli_data:rebuild',
+    'dbinfo': 'cli_data:dbinfo',
+    'bench': 'cli_bench:bench',
+}
+
+class LazyGroup(click.Group):
+    """click group that imports a subcommand's module the first time it is needed"""
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            module_name, attribute = self.lazy_subcommands[cmd_name].split(':')
+            command = getattr(importlib.import_module(module_name), attribute)
+            self.add_command(command, cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+@click.group(cls=LazyGroup, lazy_subcommands=COMMANDS)
+@click.option('--profile', is_flag=True,
+              help='Trace every SQL statement and print a ranked summary to stderr at exit')
+@click.pass_context
+def cli(ctx, profile):
+    """Simple timesheet tracking CLI tool
+    
+    Track your working time with start/stop commands or add work sessions for specific dates.
+    Generate monthly PDF reports at the end of each month.
+    """
+    if profile:
+        import profiler
+        profiler.enable()
+        ctx.call_on_close(profiler.print_report)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+PDF report, web interface and daemon commands. reportlab and Flask are
+imported only when these commands run.
+"""
+
+import click
+import calendar
+import sys
+from timesheet_sqlite import TimesheetManager
+
+@click.command()
+@click.option('--month', '-m', type=int, required=True, help='Month (1-12)')
+@click.option('--year', '-y', type=int, required=True, help='Year')
+@click.option('--output', '-o', help='Output PDF filename')
+def report(month, year, output):
+    """Generate a PDF report for the specified month"""
+    
+    if month < 1 or month > 12:
+        click.echo("❌ Month must be between 1 and 12")
+        return
+    
+    manager = TimesheetManager()
+    entries = manager.get_entries_for_month(year, month)
+    
+    if not entries:
+        month_name = calendar.month_name[month]
+        click.echo(f"❌ No work sessions found for {month_name} {year}")
+        return
+    
+    if not output:
+        month_name = calendar.month_name[month].lower()
+        output = f"timesheet_{month_name}_{year}.pdf"
+    
+    try:
+        from pdf_generator import PDFGenerator
+        generator = PDFGenerator()
+        generator.generate_monthly_report(manager, year, month, output)
+        
+        total_hours = manager.get_total_hours_for_month(year, month)
+        month_name = calendar.month_name[month]
+        
+        click.echo(f"✅ PDF report generated: {output}")
+        click.echo(f"   Month: {month_name} {year}")
+        click.echo(f"   Total hours: {total_hours:.2f}")
+        click.echo(f"   Total entries: {len(entries)}")
+        
+    except ImportError:
+        click.echo("❌ PDF generation requires reportlab. Install with: pip install reportlab")
+    except Exception as e:
+        click.echo(f"❌ Error generating PDF: {str(e)}")
+
+@click.command()
+def web():
+    """Launch the web interface"""
+    try:
+        # Check if Flask is installed
+        import flask
+        click.echo("🌐 Starting web interface...")
+        click.echo("   URL: http://localhost:5000")
+        click.echo("   Press Ctrl+C to stop")
+        
+        # Run the web app
+        from web_app import app
+        app.run(debug=False, host='0.0.0.0', port=5000)
+        
+    except ImportError:
+        click.echo("❌ Flask is not installed. Install with: pip install flask")
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"❌ Error starting web interface: {str(e)}")
+        sys.exit(1)
+
+@click.command()
+def daemon():
+    """Serve CLI commands from one warm process over a Unix socket
+    
+    While it runs, start, stop, status, list, add, addhours, summary and
+    search in this directory are forwarded to it.
+    """
+    import signal
+    from daemon import DB_FILE, serve
+    
+    # Open (and if needed create or migrate) the database before accepting commands
+    TimesheetManager(DB_FILE)
+    
+    def ready(path):
+        click.echo(f"🔌 Timesheet daemon listening on {path}")
+        click.echo("   Press Ctrl+C to stop")
+    
+    # Stop on SIGTERM like on Ctrl+C, so the socket file is removed
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        serve(DB_FILE, ready)
+    except KeyboardInterrupt:
+        click.echo("\n👋 Daemon stopped")
+    except (RuntimeError, OSError) as e:
+        click.echo(f"❌ Could not start daemon: {e}")
+        sys.exit(1)
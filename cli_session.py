@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Session commands: start, stop and status.
+
+These run many times a minute from shell hooks, so the database layer is
+only imported inside the commands: `status --porcelain` answers from the
+session state file and never loads sqlite3 unless it has to fall back.
+"""
+
+import click
+from datetime import datetime
+from daemon import DB_FILE
+from session_state import format_porcelain, read_state
+
+@click.command()
+@click.option('--description', '-d', default='', help='Description of the work session')
+def start(description):
+    """Start a new work session"""
+    from timesheet_sqlite import TimesheetManager
+    manager = TimesheetManager()
+    
+    if manager.start_session(description):
+        click.echo(f"✅ Work session started at {datetime.now().strftime('%H:%M:%S')}")
+        if description:
+            click.echo(f"   Description: {description}")
+    else:
+        click.echo("❌ A work session is already active. Stop it first with 'timesheet stop'")
+
+@click.command()
+def stop():
+    """Stop the current work session"""
+    from timesheet_sqlite import TimesheetManager
+    manager = TimesheetManager()
+    
+    session = manager.stop_session()
+    if session:
+        duration = session.duration_hours()
+        click.echo(f"✅ Work session stopped at {session.end_time.strftime('%H:%M:%S')}")
+        click.echo(f"   Duration: {duration:.2f} hours ({session.duration_minutes()} minutes)")
+        if session.description:
+            click.echo(f"   Description: {session.description}")
+    else:
+        click.echo("❌ No active work session to stop")
+
+@click.command()
+@click.option('--porcelain', is_flag=True,
+              help='One tab-separated line for shell prompts: idle, or active, minutes, start and description')
+def status(porcelain):
+    """Show current session status"""
+    if porcelain:
+        state = read_state(DB_FILE)
+        if state is None:
+            # State file missing or stale: ask the database and refresh it
+            from timesheet_sqlite import TimesheetManager
+            session = TimesheetManager(DB_FILE).sync_session_state()
+            state = (session.start_time, session.description) if session else (None, '')
+        click.echo(format_porcelain(*state))
+        return
+    
+    from timesheet_sqlite import TimesheetManager
+    session = TimesheetManager(DB_FILE).current_session
+    
+    if session:
+        start_time = session.start_time
+        duration = int((datetime.now() - start_time).total_seconds() / 60)
+        hours = duration / 60
+        
+        click.echo("🟢 Work session is ACTIVE")
+        click.echo(f"   Started: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        click.echo(f"   Duration: {hours:.2f} hours ({duration} minutes)")
+        if session.description:
+            click.echo(f"   Description: {session.description}")
+    else:
+        click.echo("🔴 No active work session")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Local daemon that runs CLI commands in one warm process.
+
+`timesheet daemon` listens on a Unix socket next to the database
+(timesheet.db.sock). While it runs, cli.py sends it the arguments of
+non-interactive commands and prints what it answers, so a command costs
+one interpreter start and a socket round trip instead of importing click
+and SQLite and opening the database. Without a daemon, or when it does
+not accept the connection, commands run in-process as before.
+
+The client half of this module is imported on every CLI invocation and
+must only use the standard library's lightweight modules.
+"""
+
+import os
+
+# The client only needs the C socket module; `socket` itself pulls in enum
+# and friends, which would add about a third to a forwarded command's cost
+import _socket
+
+SUFFIX = '.sock'
+
+# TimesheetManager's default database, served by a daemon started in its directory
+DB_FILE = 'timesheet.db'
+
+# Commands that never prompt or read stdin, so they can run in the daemon
+FORWARDED_COMMANDS = {'start', 'stop', 'status', 'list', 'add', 'addhours', 'summary', 'search', 'overlaps'}
+
+# Seconds a forwarded command may take before the client gives up
+CLIENT_TIMEOUT = 30
+
+def socket_path(db_path: str) -> str:
+    """Absolute path of the daemon socket for a database"""
+    return os.path.abspath(db_path) + SUFFIX
+
+def _recv_all(conn) -> bytes:
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+
+# Wire format, one exchange per connection. The request is the program name
+# and the arguments joined by NUL bytes; the reply is a header line
+# "<status> <stdout bytes>" followed by stdout and then stderr. Both are
+# UTF-8, and json is avoided because importing it costs more than the
+# round trip itself.
+
+def encode_request(args: list, prog_name: str) -> bytes:
+    return '\0'.join([prog_name, *args]).encode('utf-8')
+
+def decode_request(data: bytes) -> tuple:
+    """(args, prog_name) of a request"""
+    prog_name, *args = data.decode('utf-8').split('\0')
+    return args, prog_name
+
+def encode_reply(status: int, stdout: str, stderr: str) -> bytes:
+    out = stdout.encode('utf-8')
+    return f"{status} {len(out)}\n".encode('ascii') + out + stderr.encode('utf-8')
+
+def decode_reply(data: bytes) -> tuple:
+    """(status, stdout, stderr) of a reply"""
+    header, _, body = data.partition(b'\n')
+    status, length = (int(field) for field in header.split())
+    return status, body[:length].decode('utf-8'), body[length:].decode('utf-8')
+
+def forward(args: list, db_path: str = DB_FILE, prog_name: str = 'timesheet'):
+    """Run a command in the daemon for db_path.
+
+    Returns the daemon's (status, stdout, stderr), or None when the command
+    has to run in-process: it is not forwardable or no daemon accepts the
+    connection.
+    """
+    if not args or args[0] not in FORWARDED_COMMANDS or '--help' in args:
+        return None
+    path = socket_path(db_path)
+    if not os.path.exists(path):
+        return None
+
+    conn = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        try:
+            conn.connect(path)
+        except OSError:
+            # Stale socket left by a daemon that went away
+            return None
+        # Once the request is sent the command may have run, so failures
+        # from here on are reported instead of retried in-process
+        try:
+            conn.settimeout(CLIENT_TIMEOUT)
+            conn.sendall(encode_request(args, prog_name))
+            conn.shutdown(_socket.SHUT_WR)
+            return decode_reply(_recv_all(conn))
+        except (OSError, ValueError) as e:
+            return (1, '', f"❌ No answer from the timesheet daemon: {e}\n")
+    finally:
+        conn.close()
+
+def run_command(args: list, prog_name: str = 'timesheet') -> tuple:
+    """Run a CLI command in this process and return (status, stdout, stderr)"""
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+    from cli_group import cli
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = 0
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            cli.main(args=args, prog_name=prog_name, standalone_mode=True)
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            # Keep serving; report the failure like an uncaught error would
+            print(f"❌ {type(e).__name__}: {e}", file=stderr)
+            status = 1
+    return status, stdout.getvalue(), stderr.getvalue()
+
+def serve(db_path: str, ready=None):
+    """Serve forwarded commands for db_path until interrupted.
+
+    Requests are handled one at a time, so writes from forwarded commands
+    are serialized just like separate CLI runs. ready, if given, is called
+    once the socket accepts connections.
+    """
+    import socket
+    import socketserver
+
+    path = socket_path(db_path)
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            raise RuntimeError(f"a daemon is already listening on {path}")
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(path)
+        finally:
+            probe.close()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                args, prog_name = decode_request(_recv_all(self.request))
+            except UnicodeDecodeError:
+                reply = (2, '', 'Invalid request\n')
+            else:
+                reply = run_command(args, prog_name)
+            self.wfile.write(encode_reply(*reply))
+
+    # Only the owner may connect
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(path, Handler)
+    finally:
+        os.umask(old_umask)
+    try:
+        if ready is not None:
+            ready(path)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -1,18 +1,425 @@
 #!/usr/bin/env python3
 import sqlite3
 import os
+import threading
+import hashlib
+import heapq
+import re
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import contextmanager
 from datetime import datetime, date, time, timedelta
-from typing import Dict, List, Optional, Tuple
-from timesheet import TimeEntry
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from time_entry import TimeEntry, parse_clock, parse_duration, to_epoch
+from session_state import write_state
+
+if TYPE_CHECKING:
+    from entry_batch import EntryBatch
+
+# Connection tuning defaults (cache_size is negative, i.e. KiB rather than pages)
+DEFAULT_CACHE_SIZE = -16000
+DEFAULT_MMAP_SIZE = 64 * 1024 * 1024
+DEFAULT_BUSY_TIMEOUT = 5000
+
+SYNCHRONOUS_MODES = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+
+# Maximum number of idle connections kept around for reuse after release()
+MAX_IDLE_CONNECTIONS = 4
+
+# Months of parsed entries kept by the get_entries_for_month() cache
+MONTH_CACHE_SIZE = 24
+
+# Schema version stored in PRAGMA user_version, bumped by each migration
+SCHEMA_VERSION = 7
+
+# Rows updated per transaction when backfilling new columns
+BACKFILL_BATCH_SIZE = 5000
+
+# Rows per executemany() call in bulk inserts
+BULK_CHUNK_SIZE = 1000
+
+# Rows per fetchmany() call when streaming entries
+ITER_BATCH_SIZE = 1000
+
+# Default number of matches returned by search_entries()
+SEARCH_LIMIT = 50
+
+# Most recently added matches that search_entries() ranks by relevance
+SEARCH_RANK_WINDOW = 2000
+
+# Date ranges with at most this many entries are resolved to ids before searching
+SEARCH_RANGE_PREFILTER = 20000
+
+# What writes do with an entry that overlaps existing ones: refuse it with
+# OverlapError, keep it (callers report find_overlaps()), or fold the
+# overlapping entries into one
+OVERLAP_POLICIES = ('reject', 'warn', 'merge')
+
+class OverlapError(ValueError):
+    """An entry would overlap existing entries, listed in overlaps"""
+    
+    def __init__(self, entry: TimeEntry, overlaps: List[TimeEntry]):
+        spans = ', '.join(f"{other.start_time:%Y-%m-%d %H:%M}-{other.end_time:%H:%M}" for other in overlaps)
+        super().__init__(f"overlaps {len(overlaps)} existing "
+                         f"{'entry' if len(overlaps) == 1 else 'entries'}: {spans}")
+        self.entry = entry
+        self.overlaps = overlaps
+
+def content_hash(start_time: str, end_time: Optional[str], description: Optional[str]) -> str:
+    """Identity of an entry's content, used to skip duplicates on import"""
+    key = f"{start_time}|{end_time or ''}|{description or ''}"
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+def entry_columns(table: str = 'time_entries') -> str:
+    """SELECT list for TimeEntry.from_row().
+    
+    Whole-second timestamps are returned as their epoch-second copies, which
+    are smaller than the ISO strings and give durations without parsing.
+    """
+    return f'''{table}.id,
+        CASE WHEN length({table}.start_time) = 19 THEN {table}.start_ts ELSE {table}.start_time END,
+        CASE WHEN length({table}.end_time) = 19 THEN {table}.end_ts ELSE {table}.end_time END,
+        {table}.description'''
+
+def search_terms(query: str) -> List[str]:
+    """Words of a free-text search query, with FTS5 syntax characters dropped"""
+    return re.findall(r'\w+', query or '')
+
+def fts5_match_expression(terms: List[str]) -> str:
+    """FTS5 MATCH expression requiring every term, each quoted as a plain string"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+class TrackedConnection(sqlite3.Connection):
+    """sqlite3 connection that remembers the PRAGMA data_version it last saw"""
+    data_version = None
+
+def month_key(start_time) -> Tuple[int, int]:
+    """(year, month) of a start_time given as a datetime or ISO string"""
+    if isinstance(start_time, str):
+        return int(start_time[:4]), int(start_time[5:7])
+    return start_time.year, start_time.month
+
+class MonthCache:
+    """Bounded LRU cache of parsed get_entries_for_month() results.
+    
+    DatabaseManager invalidates the months its own writes touch. Commits made
+    through any other connection (another process, or another thread's pooled
+    connection) change that connection's PRAGMA data_version and clear the
+    whole cache, since the affected months are unknown.
+    """
+    
+    def __init__(self, max_months: int = MONTH_CACHE_SIZE):
+        self.max_months = max_months
+        self._months: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a result read before a write is never stored after it
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def get(self, conn: TrackedConnection, key: Tuple[int, int]) -> Optional[Tuple]:
+        """Cached entries for a month, or None after counting a miss"""
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        with self._lock:
+            if conn.data_version != version:
+                # Also taken for a connection's first read, as it cannot tell what it missed
+                conn.data_version = version
+                self._clear()
+            entries = self._months.get(key)
+            if entries is None:
+                self.misses += 1
+                return None
+            self._months.move_to_end(key)
+            self.hits += 1
+            return entries
+    
+    def put(self, key: Tuple[int, int], entries: Tuple, generation: int):
+        """Store a month read while self.generation was generation"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._months[key] = entries
+            self._months.move_to_end(key)
+            while len(self._months) > self.max_months:
+                self._months.popitem(last=False)
+    
+    def invalidate(self, *keys: Tuple[int, int]):
+        """Drop the given months"""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                if self._months.pop(key, None) is not None:
+                    self.invalidations += 1
+    
+    def clear(self):
+        """Drop every month"""
+        with self._lock:
+            self._clear()
+    
+    def _clear(self):
+        self.generation += 1
+        self.invalidations += len(self._months)
+        self._months.clear()
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations,
+                'months': len(self._months),
+                'max_months': self.max_months,
+            }
+
+class ConnectionManager:
+    """Hands out reusable, tuned SQLite connections for one database file.
+    
+    Each thread gets its own connection, which stays bound to it until
+    release() returns it to a small idle pool (the web app does this at the
+    end of every request, the CLI simply keeps it until exit). It also owns
+    the month cache, so every DatabaseManager on the file shares one.
+    """
+    
+    # Class of new connections; profiler.enable() swaps in a tracing subclass
+    factory = TrackedConnection
+    
+    def __init__(self, db_path: str, cache_size: int = DEFAULT_CACHE_SIZE,
+                 mmap_size: int = DEFAULT_MMAP_SIZE, busy_timeout: int = DEFAULT_BUSY_TIMEOUT):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle: List[sqlite3.Connection] = []
+        self._all: List[sqlite3.Connection] = []
+        self.month_cache = MonthCache()
+    
+    def _open(self) -> sqlite3.Connection:
+        """Open and configure a new connection"""
+        # Autocommit mode: transactions are managed explicitly by transaction()
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout / 1000,
+                               isolation_level=None, check_same_thread=False,
+                               factory=self.factory)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute(f'PRAGMA cache_size = {int(self.cache_size)}')
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout)}')
+        conn.create_function('content_hash', 3, content_hash, deterministic=True)
+        with self._lock:
+            self._all.append(conn)
+        return conn
+    
+    def connection(self) -> sqlite3.Connection:
+        """Get the connection bound to the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._open()
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+    
+    @contextmanager
+    def transaction(self):
+        """Run a block of writes in one transaction.
+        
+        Nested calls become savepoints of the outermost transaction, so
+        methods that write can be composed into a larger atomic unit.
+        """
+        conn = self.connection()
+        depth = self._local.depth
+        if depth == 0:
+            conn.execute('BEGIN IMMEDIATE')
+        else:
+            conn.execute(f'SAVEPOINT sp{depth}')
+        self._local.depth = depth + 1
+        try:
+            yield conn
+            if depth == 0:
+                conn.execute('COMMIT')
+            else:
+                conn.execute(f'RELEASE sp{depth}')
+        except BaseException:
+            # Also reached when COMMIT fails, which leaves the transaction open.
+            # Some errors roll it back already, and a second ROLLBACK would fail
+            if depth == 0:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+            else:
+                conn.execute(f'ROLLBACK TO sp{depth}')
+                conn.execute(f'RELEASE sp{depth}')
+            raise
+        finally:
+            self._local.depth = depth
+    
+    def release(self):
+        """Return the current thread's connection to the idle pool"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.depth:
+            return
+        self._local.conn = None
+        with self._lock:
+            if len(self._idle) < MAX_IDLE_CONNECTIONS:
+                self._idle.append(conn)
+                return
+            self._all.remove(conn)
+        conn.close()
+    
+    def close(self):
+        """Close every connection opened by this manager"""
+        with self._lock:
+            connections, self._all, self._idle = self._all, [], []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+        self.month_cache.clear()
+    
+    def settings(self) -> Dict:
+        """Report the effective connection settings as seen by SQLite"""
+        conn = self.connection()
+        settings = {}
+        for pragma in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'busy_timeout'):
+            settings[pragma] = conn.execute(f'PRAGMA {pragma}').fetchone()[0]
+        settings['synchronous'] = SYNCHRONOUS_MODES.get(settings['synchronous'], settings['synchronous'])
+        return settings
+
+_connection_managers: Dict[str, ConnectionManager] = {}
+_connection_managers_lock = threading.Lock()
+
+def get_connection_manager(db_path: str, **options) -> ConnectionManager:
+    """Get the shared ConnectionManager for a database file.
+    
+    All DatabaseManager instances (CLI, web app) pointing at the same file
+    share one manager; options only apply when it is first created.
+    """
+    key = db_path if db_path == ':memory:' else os.path.abspath(db_path)
+    with _connection_managers_lock:
+        manager = _connection_managers.get(key)
+        if manager is None:
+            manager = ConnectionManager(db_path, **options)
+            _connection_managers[key] = manager
+        return manager
+
+def month_bounds(year: int, month: int) -> Tuple[str, str]:
+    """Half-open [start, end) ISO date bounds of a month, for start_time range predicates"""
+    start_date = f"{year:04d}-{month:02d}-01"
+    if month == 12:
+        end_date = f"{year+1:04d}-01-01"
+    else:
+        end_date = f"{year:04d}-{month+1:02d}-01"
+    return start_date, end_date
+
+def encode_page_cursor(start_time: str, entry_id: int) -> str:
+    """Opaque keyset pagination cursor for an entry"""
+    return f"{start_time}~{entry_id}"
+
+def decode_page_cursor(cursor: str) -> Tuple[str, int]:
+    """Split a cursor from encode_page_cursor(), raises ValueError if malformed"""
+    start_time, _, entry_id = cursor.rpartition('~')
+    if not start_time:
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+    return start_time, int(entry_id)
+
+def _stream(cursor: sqlite3.Cursor, batch_size: int) -> Iterator:
+    """Yield a cursor's rows batch_size at a time, closing it when done"""
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+class EntriesView(Sequence):
+    """Read-only sequence of all completed entries in chronological order.
+    
+    Nothing is loaded up front: len() reads the daily rollup, indexing and
+    slicing fetch just the rows asked for, from whichever end of the list is
+    closer, and iteration streams. Each operation sees the database as it is
+    at that moment.
+    """
+    
+    def __init__(self, db: 'DatabaseManager'):
+        self.db = db
+    
+    def __len__(self) -> int:
+        return self.db.count_entries()
+    
+    def __bool__(self) -> bool:
+        return self.db.has_entries()
+    
+    def __iter__(self) -> Iterator[TimeEntry]:
+        return self.db.iter_entries_from()
+    
+    def __reversed__(self) -> Iterator[TimeEntry]:
+        return self.db.iter_entries_from(newest_first=True)
+    
+    def __getitem__(self, index):
+        length = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step != 1:
+                return self[start:stop][::step] if step > 0 else self[stop + 1:start + 1][::step]
+            return self._read(start, max(stop - start, 0), length)
+        
+        index = index.__index__()
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('entry index out of range')
+        return self._read(index, 1, length)[0]
+    
+    def _read(self, start: int, count: int, length: int) -> List[TimeEntry]:
+        if count == 0:
+            return []
+        from_end = length - start - count
+        if from_end < start:
+            entries = list(self.db.iter_entries_from(from_end, count, newest_first=True))
+            entries.reverse()
+            return entries
+        return list(self.db.iter_entries_from(start, count))
+    
+    def __repr__(self) -> str:
+        return f"<EntriesView of {self.db.db_path!r}>"
 
 class DatabaseManager:
-    def __init__(self, db_path: str = 'timesheet.db'):
+    def __init__(self, db_path: str = 'timesheet.db', **connection_options):
         self.db_path = db_path
+        self.connections = get_connection_manager(db_path, **connection_options)
         self.init_database()
     
+    def get_connection_settings(self) -> Dict:
+        """Get the effective SQLite connection settings"""
+        return self.connections.settings()
+    
+    def get_cache_stats(self) -> Dict:
+        """Get hit/miss counters of the month cache"""
+        return self.connections.month_cache.stats()
+    
+    def close(self):
+        """Close all pooled connections to this database"""
+        self.connections.close()
+    
     def init_database(self):
-        """Initialize the SQLite database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Initialize the SQLite database with required tables.
+        
+        A database already at SCHEMA_VERSION needs nothing, so opening one
+        costs a single PRAGMA read instead of the DDL and migration checks.
+        """
+        conn = self.connections.connection()
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+            return
+        
+        with self.connections.transaction() as conn:
             cursor = conn.cursor()
             
             # Create time_entries table
@@ -23,7 +430,9 @@ class DatabaseManager:
                     end_time TEXT,
                     description TEXT DEFAULT '',
                     created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    start_ts INTEGER,
+                    end_ts INTEGER
                 )
             ''')
             
@@ -43,12 +452,322 @@ class DatabaseManager:
                 ON time_entries(start_time)
             ''')
             
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_time_entries_date 
-                ON time_entries(date(start_time))
+            # Covering index for date range reads; replaces the old date(start_time)
+            # expression index, which range predicates on start_time cannot use.
+            # Tables from before v1 lack the epoch columns until v5 adds them
+            if 'start_ts' in self._column_names('time_entries'):
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_time_entries_range 
+                    ON time_entries(start_time, end_time, description, start_ts, end_ts)
+                ''')
+            else:
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_time_entries_range 
+                    ON time_entries(start_time, end_time, description)
+                ''')
+            
+            cursor.execute('DROP INDEX IF EXISTS idx_time_entries_date')
+        
+        self.migrate_schema()
+    
+    def migrate_schema(self):
+        """Apply pending schema migrations, tracked in PRAGMA user_version"""
+        migrations = [
+            (1, self._migrate_epoch_columns),
+            (2, self._migrate_daily_totals),
+            (3, self._migrate_content_hash),
+            (4, self.rebuild_search_index),
+            (5, self._migrate_range_index_epoch),
+            (6, self.rebuild_span_bound),
+            (7, self._migrate_epoch_triggers),
+        ]
+        
+        conn = self.connections.connection()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for target, migration in migrations:
+            if version < target:
+                migration()
+                with self.connections.transaction() as conn:
+                    conn.execute(f'PRAGMA user_version = {target}')
+    
+    def _column_names(self, table: str) -> List[str]:
+        conn = self.connections.connection()
+        return [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    
+    def _backfill(self, sql: str, batch_size: int = None):
+        """Run an UPDATE over time_entries in rowid batches, one short transaction each.
+        
+        The statement must take a (low, high] rowid range as its two parameters.
+        """
+        batch_size = batch_size or BACKFILL_BATCH_SIZE
+        conn = self.connections.connection()
+        max_id = conn.execute('SELECT MAX(rowid) FROM time_entries').fetchone()[0] or 0
+        for low in range(0, max_id, batch_size):
+            with self.connections.transaction() as conn:
+                conn.execute(sql, (low, low + batch_size))
+    
+    def _migrate_epoch_columns(self):
+        """v1: integer epoch-second copies of start_time/end_time for SQL arithmetic"""
+        with self.connections.transaction() as conn:
+            columns = self._column_names('time_entries')
+            if 'start_ts' not in columns:
+                conn.execute('ALTER TABLE time_entries ADD COLUMN start_ts INTEGER')
+            if 'end_ts' not in columns:
+                conn.execute('ALTER TABLE time_entries ADD COLUMN end_ts INTEGER')
+        
+        self._backfill('''
+            UPDATE time_entries
+            SET start_ts = CAST(strftime('%s', start_time) AS INTEGER),
+                end_ts = CAST(strftime('%s', end_time) AS INTEGER)
+            WHERE rowid > ? AND rowid <= ? AND start_ts IS NULL
+        ''')
+    
+    def _migrate_daily_totals(self):
+        """v2: trigger-maintained per-day rollup of completed entries"""
+        with self.connections.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS daily_totals (
+                    day TEXT PRIMARY KEY,
+                    total_minutes INTEGER NOT NULL,
+                    entry_count INTEGER NOT NULL,
+                    earliest_start TEXT,
+                    latest_end TEXT
+                ) WITHOUT ROWID
+            ''')
+            
+            # Inserts fold into the day's row directly
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_daily_totals_insert
+                AFTER INSERT ON time_entries WHEN NEW.end_ts IS NOT NULL
+                BEGIN
+                    INSERT INTO daily_totals (day, total_minutes, entry_count, earliest_start, latest_end)
+                    VALUES (substr(NEW.start_time, 1, 10), (NEW.end_ts - NEW.start_ts) / 60, 1,
+                            substr(NEW.start_time, 12, 8), substr(NEW.end_time, 12, 8))
+                    ON CONFLICT(day) DO UPDATE SET
+                        total_minutes = total_minutes + excluded.total_minutes,
+                        entry_count = entry_count + 1,
+                        earliest_start = min(earliest_start, excluded.earliest_start),
+                        latest_end = max(latest_end, excluded.latest_end);
+                END
+            ''')
+            
+            # Updates and deletes recompute the affected day(s), since min/max
+            # cannot be maintained by subtraction
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_daily_totals_update
+                AFTER UPDATE OF start_time, end_time, start_ts, end_ts ON time_entries
+                BEGIN
+                    {self._daily_total_refresh_sql('OLD')}
+                    {self._daily_total_refresh_sql('NEW')}
+                END
             ''')
             
-            conn.commit()
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_daily_totals_delete
+                AFTER DELETE ON time_entries
+                BEGIN
+                    {self._daily_total_refresh_sql('OLD')}
+                END
+            ''')
+        
+            # Month aggregates no longer scan time_entries, so the epoch index
+            # earlier versions of v1 created is not needed
+            conn.execute('DROP INDEX IF EXISTS idx_time_entries_epoch')
+        
+        self.rebuild_daily_totals()
+    
+    @staticmethod
+    def _daily_total_refresh_sql(row: str) -> str:
+        """Trigger body statements that recompute the daily_totals row for row.start_time's day"""
+        return f'''
+            DELETE FROM daily_totals WHERE day = substr({row}.start_time, 1, 10);
+            INSERT INTO daily_totals (day, total_minutes, entry_count, earliest_start, latest_end)
+            SELECT substr({row}.start_time, 1, 10), SUM((end_ts - start_ts) / 60), COUNT(*),
+                   MIN(substr(start_time, 12, 8)), MAX(substr(end_time, 12, 8))
+            FROM time_entries
+            WHERE start_time >= substr({row}.start_time, 1, 10)
+            AND start_time < date({row}.start_time, '+1 day')
+            AND end_ts IS NOT NULL
+            HAVING COUNT(*) > 0;
+        '''
+    
+    def rebuild_daily_totals(self) -> int:
+        """Recompute the daily_totals rollup from time_entries, returns the number of days"""
+        with self.connections.transaction() as conn:
+            conn.execute('DELETE FROM daily_totals')
+            cursor = conn.execute('''
+                INSERT INTO daily_totals (day, total_minutes, entry_count, earliest_start, latest_end)
+                SELECT substr(start_time, 1, 10), SUM((end_ts - start_ts) / 60), COUNT(*),
+                       MIN(substr(start_time, 12, 8)), MAX(substr(end_time, 12, 8))
+                FROM time_entries
+                WHERE end_ts IS NOT NULL
+                GROUP BY substr(start_time, 1, 10)
+            ''')
+            return cursor.rowcount
+    
+    def _migrate_content_hash(self):
+        """v3: unique content hash of (start, end, description) for idempotent imports"""
+        with self.connections.transaction() as conn:
+            if 'content_hash' not in self._column_names('time_entries'):
+                conn.execute('ALTER TABLE time_entries ADD COLUMN content_hash TEXT')
+            
+            # Partial, so pre-existing duplicates can stay (with a NULL hash)
+            conn.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_time_entries_content_hash 
+                ON time_entries(content_hash) WHERE content_hash IS NOT NULL
+            ''')
+        
+        # OR IGNORE leaves the hash NULL on all but the first copy of a duplicate
+        self._backfill('''
+            UPDATE OR IGNORE time_entries
+            SET content_hash = content_hash(start_time, end_time, description)
+            WHERE rowid > ? AND rowid <= ? AND content_hash IS NULL
+        ''')
+    
+    def _migrate_range_index_epoch(self):
+        """v5: add the epoch columns to the covering range index, for entry_columns()"""
+        with self.connections.transaction() as conn:
+            columns = [row[2] for row in conn.execute('PRAGMA index_info(idx_time_entries_range)')]
+            if 'start_ts' in columns:
+                # Created that way by init_database
+                return
+            conn.execute('DROP INDEX IF EXISTS idx_time_entries_range')
+            conn.execute('''
+                CREATE INDEX idx_time_entries_range 
+                ON time_entries(start_time, end_time, description, start_ts, end_ts)
+            ''')
+    
+    def _query_entries(self, sql: str, params=()) -> sqlite3.Cursor:
+        """Execute a SELECT of entry_columns(), returning rows as TimeEntry objects"""
+        cursor = self.connections.connection().cursor()
+        cursor.row_factory = TimeEntry.from_row
+        return cursor.execute(sql, params)
+    
+    def has_search_index(self) -> bool:
+        """Whether the entries_fts full-text index exists in this database"""
+        conn = self.connections.connection()
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries_fts'"
+        ).fetchone() is not None
+    
+    def rebuild_search_index(self) -> bool:
+        """v4: create (if needed) and repopulate the FTS5 index over descriptions.
+        
+        Returns False when this SQLite build lacks FTS5; search_entries() then
+        falls back to LIKE scans.
+        """
+        with self.connections.transaction() as conn:
+            try:
+                # External content table: the index stores only tokens, the text stays in time_entries
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                        description, content='time_entries', content_rowid='id',
+                        tokenize='porter unicode61 remove_diacritics 2'
+                    )
+                ''')
+            except sqlite3.OperationalError:
+                return False
+            
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_entries_fts_insert
+                AFTER INSERT ON time_entries
+                BEGIN
+                    INSERT INTO entries_fts (rowid, description) VALUES (NEW.id, NEW.description);
+                END
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_entries_fts_delete
+                AFTER DELETE ON time_entries
+                BEGIN
+                    INSERT INTO entries_fts (entries_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+                END
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_entries_fts_update
+                AFTER UPDATE OF description ON time_entries
+                BEGIN
+                    INSERT INTO entries_fts (entries_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+                    INSERT INTO entries_fts (rowid, description) VALUES (NEW.id, NEW.description);
+                END
+            ''')
+            
+            conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+        return True
+    
+    def rebuild_span_bound(self) -> int:
+        """v6: create (if needed) and recompute the longest entry duration, in seconds.
+        
+        find_overlaps() only has to look at entries starting at most this long
+        before a new one, a short range of the start_time index. Triggers
+        raise the bound when a longer entry is written; deleting entries
+        leaves it as it is, which is safe, until the next rebuild.
+        """
+        with self.connections.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS entry_span_bound (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    max_seconds INTEGER NOT NULL
+                )
+            ''')
+            
+            # The WHEN clause makes the usual write a read of one row
+            for event in ('INSERT', 'UPDATE OF start_ts, end_ts'):
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_entry_span_bound_{event.split()[0].lower()}
+                    AFTER {event} ON time_entries
+                    WHEN NEW.end_ts - NEW.start_ts > (SELECT max_seconds FROM entry_span_bound WHERE id = 1)
+                    BEGIN
+                        UPDATE entry_span_bound SET max_seconds = NEW.end_ts - NEW.start_ts WHERE id = 1;
+                    END
+                ''')
+            
+            conn.execute('''
+                INSERT OR REPLACE INTO entry_span_bound (id, max_seconds)
+                SELECT 1, COALESCE(MAX(end_ts - start_ts), 0) FROM time_entries
+            ''')
+            return conn.execute('SELECT max_seconds FROM entry_span_bound').fetchone()[0]
+    
+    def _migrate_epoch_triggers(self):
+        """v7: derive start_ts/end_ts from the ISO columns for rows written by other tools.
+        
+        This code writes the epoch columns itself, but an older version, the
+        sqlite3 shell or another program only writes start_time/end_time.
+        Their rows would be missing from every query and rollup that reads
+        the epoch columns; the triggers fill them in, and the update through
+        which they do so refreshes the daily totals and the span bound.
+        """
+        start_ts = "CAST(strftime('%s', NEW.start_time) AS INTEGER)"
+        end_ts = "CAST(strftime('%s', NEW.end_time) AS INTEGER)"
+        with self.connections.transaction() as conn:
+            # Checking for NULLs keeps the usual insert, which sets them, cheap
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_entry_epoch_insert
+                AFTER INSERT ON time_entries
+                WHEN NEW.start_ts IS NULL OR (NEW.end_ts IS NULL AND NEW.end_time IS NOT NULL)
+                BEGIN
+                    UPDATE time_entries SET start_ts = {start_ts}, end_ts = {end_ts} WHERE rowid = NEW.rowid;
+                END
+            ''')
+            
+            # An update of the ISO columns alone leaves stale rather than NULL copies
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_entry_epoch_update
+                AFTER UPDATE OF start_time, end_time ON time_entries
+                WHEN NEW.start_ts IS NOT {start_ts} OR NEW.end_ts IS NOT {end_ts}
+                BEGIN
+                    UPDATE time_entries SET start_ts = {start_ts}, end_ts = {end_ts} WHERE rowid = NEW.rowid;
+                END
+            ''')
+        
+        # Rows written by other tools since v1 backfilled the columns
+        self._backfill('''
+            UPDATE time_entries
+            SET start_ts = CAST(strftime('%s', start_time) AS INTEGER),
+                end_ts = CAST(strftime('%s', end_time) AS INTEGER)
+            WHERE rowid > ? AND rowid <= ?
+            AND (start_ts IS NOT CAST(strftime('%s', start_time) AS INTEGER)
+                 OR end_ts IS NOT CAST(strftime('%s', end_time) AS INTEGER))
+        ''')
     
     def migrate_from_json(self, json_file: str = 'timesheet_data.json'):
         """Migrate existing JSON data to SQLite database"""
@@ -61,11 +780,8 @@ class DatabaseManager:
                 data = json.load(f)
             
             # Migrate completed entries
-            entries = data.get('entries', [])
-            for entry_data in entries:
-                entry = TimeEntry.from_dict(entry_data)
-                if entry.end_time:  # Only migrate completed entries
-                    self.add_completed_entry(entry)
+            entries = (TimeEntry.from_dict(entry_data) for entry_data in data.get('entries', []))
+            self.add_completed_entries(entry for entry in entries if entry.end_time)
             
             # Migrate current session if exists
             current_data = data.get('current_session')
@@ -83,79 +799,144 @@ class DatabaseManager:
             print(f"❌ Error migrating from JSON: {str(e)}")
             return False
     
-    def add_completed_entry(self, entry: TimeEntry):
-        """Add a completed time entry to the database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO time_entries (start_time, end_time, description)
-                VALUES (?, ?, ?)
-            ''', (
-                entry.start_time.isoformat(),
-                entry.end_time.isoformat() if entry.end_time else None,
-                entry.description
-            ))
-            conn.commit()
-            return cursor.lastrowid
+    @staticmethod
+    def _entry_row(entry: TimeEntry) -> Tuple:
+        """Column values for inserting an entry into time_entries"""
+        start_time = entry.start_time.isoformat()
+        end_time = entry.end_time.isoformat() if entry.end_time else None
+        return (
+            start_time,
+            end_time,
+            entry.description,
+            to_epoch(entry.start_time),
+            to_epoch(entry.end_time) if entry.end_time else None,
+            content_hash(start_time, end_time, entry.description)
+        )
     
-    def start_session(self, description: str = "", start_time: datetime = None) -> bool:
-        """Start a new work session"""
-        if self.get_current_session():
-            return False  # Session already active
+    def _insert_entry(self, conn: sqlite3.Connection, entry: TimeEntry) -> int:
+        """Insert one entry, returns its id.
         
-        if start_time is None:
-            start_time = datetime.now()
+        The content hash only lets imports skip entries already stored: an
+        exact copy of an existing entry is stored with a NULL hash instead.
+        """
+        row = self._entry_row(entry)
+        cursor = conn.execute('''
+            INSERT INTO time_entries (start_time, end_time, description, start_ts, end_ts, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT DO NOTHING
+        ''', row)
+        if not cursor.rowcount:
+            cursor = conn.execute('''
+                INSERT INTO time_entries (start_time, end_time, description, start_ts, end_ts, content_hash)
+                VALUES (?, ?, ?, ?, ?, NULL)
+            ''', row[:-1])
+        return cursor.lastrowid
+    
+    def add_completed_entry(self, entry: TimeEntry, overlap: str = None, merged: List[TimeEntry] = None):
+        """Add a completed time entry to the database.
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO current_session (id, start_time, description)
+        overlap is one of OVERLAP_POLICIES; without it, overlapping entries
+        are not looked for. An exact copy of an existing entry overlaps it
+        like any other. With 'merge', the entries folded into the new one
+        (and deleted) are appended to merged.
+        """
+        with self.connections.transaction() as conn:
+            entry = self._resolve_overlaps(entry, overlap, merged=merged)
+            entry_id = self._insert_entry(conn, entry)
+        
+        self.connections.month_cache.invalidate(month_key(entry.start_time))
+        return entry_id
+    
+    def add_completed_entries(self, entries: Iterable[TimeEntry], chunk_size: int = None) -> int:
+        """Add many completed entries in one transaction, returns the number written.
+        
+        The iterable is consumed in chunks of chunk_size rows, so generators of
+        any length can be imported with bounded memory. Entries that duplicate
+        an existing one are skipped and not counted.
+        """
+        chunk_size = chunk_size or BULK_CHUNK_SIZE
+        rows = (self._entry_row(entry) for entry in entries)
+        added = 0
+        
+        with self.connections.transaction() as conn:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                cursor = conn.executemany('''
+                    INSERT INTO time_entries (start_time, end_time, description, start_ts, end_ts, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT DO NOTHING
+                ''', chunk)
+                added += cursor.rowcount
+        
+        if added:
+            self.connections.month_cache.clear()
+        return added
+    
+    def start_session(self, description: str = "", start_time: datetime = None) -> bool:
+        """Start a new work session, returns False if one is already active.
+        
+        The check and the insert are one statement in one write transaction,
+        so of several processes starting at once exactly one succeeds.
+        """
+        with self.connections.transaction() as conn:
+            # Read the clock once the write lock is held, so a session never
+            # starts before a concurrently stopped one has ended
+            if start_time is None:
+                start_time = datetime.now()
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO current_session (id, start_time, description)
                 VALUES (1, ?, ?)
             ''', (start_time.isoformat(), description))
-            conn.commit()
+            if not cursor.rowcount:
+                return False  # Session already active
         
+        write_state(self.db_path, start_time, description)
         return True
     
     def stop_session(self) -> Optional[TimeEntry]:
-        """Stop the current work session and move it to completed entries"""
-        current_session = self.get_current_session()
-        if not current_session:
-            return None
+        """Stop the current work session and move it to completed entries.
         
-        end_time = datetime.now()
-        entry = TimeEntry(current_session[1], end_time, current_session[2])
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        Claiming the session and recording it happen in one write
+        transaction, so of several processes stopping at once exactly one
+        gets the entry and the others see no active session.
+        """
+        with self.connections.transaction() as conn:
+            row = conn.execute('''
+                DELETE FROM current_session WHERE id = 1 RETURNING start_time, description
+            ''').fetchone()
+            if row is None:
+                return None
             
-            # Add to completed entries
-            cursor.execute('''
-                INSERT INTO time_entries (start_time, end_time, description)
-                VALUES (?, ?, ?)
-            ''', (
-                entry.start_time.isoformat(),
-                entry.end_time.isoformat(),
-                entry.description
-            ))
-            
-            # Remove from current session
-            cursor.execute('DELETE FROM current_session WHERE id = 1')
-            conn.commit()
+            entry = TimeEntry(datetime.fromisoformat(row[0]), datetime.now(), row[1])
+            self._insert_entry(conn, entry)
         
+        write_state(self.db_path)
+        self.connections.month_cache.invalidate(month_key(entry.start_time))
         return entry
     
     def get_current_session(self) -> Optional[Tuple[int, datetime, str]]:
         """Get the current active session"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT id, start_time, description FROM current_session WHERE id = 1
-            ''')
-            row = cursor.fetchone()
-            
-            if row:
-                return (row[0], datetime.fromisoformat(row[1]), row[2])
-            return None
+        conn = self.connections.connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, start_time, description FROM current_session WHERE id = 1
+        ''')
+        row = cursor.fetchone()
+        
+        if row:
+            return (row[0], datetime.fromisoformat(row[1]), row[2])
+        return None
+    
+    def sync_session_state(self) -> Optional[Tuple[int, datetime, str]]:
+        """Rewrite the session state file from the database and return the current session"""
+        session = self.get_current_session()
+        if session:
+            write_state(self.db_path, session[1], session[2])
+        else:
+            write_state(self.db_path)
+        return session
     
     def get_current_session_duration(self) -> int:
         """Get current session duration in minutes"""
@@ -166,258 +947,597 @@ class DatabaseManager:
     
     def get_all_entries(self, limit: int = None, offset: int = 0) -> List[TimeEntry]:
         """Get all completed time entries"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            query = '''
-                SELECT start_time, end_time, description 
-                FROM time_entries 
-                WHERE end_time IS NOT NULL
-                ORDER BY start_time DESC
-            '''
-            
-            if limit:
-                query += f' LIMIT {limit} OFFSET {offset}'
-            
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            entries = []
-            for row in rows:
-                start_time = datetime.fromisoformat(row[0])
-                end_time = datetime.fromisoformat(row[1]) if row[1] else None
-                entries.append(TimeEntry(start_time, end_time, row[2]))
-            
-            return entries
+        query = f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE end_time IS NOT NULL
+            ORDER BY start_time DESC
+        '''
+        
+        params = ()
+        if limit:
+            query += ' LIMIT ? OFFSET ?'
+            params = (limit, offset)
+        
+        return self._query_entries(query, params).fetchall()
+    
+    def iter_entries(self, start: Union[date, datetime, str] = None, end: Union[date, datetime, str] = None,
+                     batch_size: int = None) -> Iterator[TimeEntry]:
+        """Stream completed entries in chronological order, using constant memory.
+        
+        start and end bound start_time as a half-open [start, end) range; rows are
+        fetched from SQLite batch_size at a time.
+        """
+        batch_size = batch_size or ITER_BATCH_SIZE
+        where = ['end_time IS NOT NULL']
+        params = []
+        if start is not None:
+            where.append('start_time >= ?')
+            params.append(start if isinstance(start, str) else start.isoformat())
+        if end is not None:
+            where.append('start_time < ?')
+            params.append(end if isinstance(end, str) else end.isoformat())
+        
+        cursor = self._query_entries(f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE {' AND '.join(where)}
+            ORDER BY start_time
+        ''', params)
+        return _stream(cursor, batch_size)
+    
+    def iter_entries_from(self, offset: int = 0, limit: int = None, newest_first: bool = False,
+                          batch_size: int = None) -> Iterator[TimeEntry]:
+        """Stream completed entries by position in (start_time, id) order.
+        
+        Skips offset entries from the oldest end, or from the newest end with
+        newest_first (which also yields newest first). Reads walk the start_time
+        index from that end, so positions near either end are cheap.
+        """
+        direction = 'DESC' if newest_first else 'ASC'
+        cursor = self._query_entries(f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE end_time IS NOT NULL
+            ORDER BY start_time {direction}, id {direction}
+            LIMIT ? OFFSET ?
+        ''', (-1 if limit is None else limit, offset))
+        return _stream(cursor, batch_size or ITER_BATCH_SIZE)
+    
+    def has_entries(self) -> bool:
+        """Whether there is at least one completed entry"""
+        conn = self.connections.connection()
+        return conn.execute('SELECT 1 FROM time_entries WHERE end_time IS NOT NULL LIMIT 1').fetchone() is not None
+    
+    def get_entry_batch(self, start: Union[date, datetime, str] = None,
+                        end: Union[date, datetime, str] = None) -> 'EntryBatch':
+        """Completed entries with start_time in [start, end) as a columnar EntryBatch.
+        
+        Reads only the epoch columns and description, which the range index
+        covers, and never builds TimeEntry objects.
+        """
+        # Imported here so that only aggregating callers pay for NumPy
+        from entry_batch import EntryBatch
+        conn = self.connections.connection()
+        where = ['end_time IS NOT NULL']
+        params = []
+        if start is not None:
+            where.append('start_time >= ?')
+            params.append(start if isinstance(start, str) else start.isoformat())
+        if end is not None:
+            where.append('start_time < ?')
+            params.append(end if isinstance(end, str) else end.isoformat())
+        
+        return EntryBatch.from_rows(conn.execute(f'''
+            SELECT start_ts, end_ts, description
+            FROM time_entries
+            WHERE {' AND '.join(where)}
+            ORDER BY start_time
+        ''', params).fetchall())
     
     def get_entries_for_month(self, year: int, month: int) -> List[TimeEntry]:
-        """Get all completed entries for a specific month"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create date range for the month
-            start_date = f"{year:04d}-{month:02d}-01"
-            if month == 12:
-                end_date = f"{year+1:04d}-01-01"
-            else:
-                end_date = f"{year:04d}-{month+1:02d}-01"
-            
-            cursor.execute('''
-                SELECT start_time, end_time, description 
-                FROM time_entries 
-                WHERE end_time IS NOT NULL
-                AND date(start_time) >= ? 
-                AND date(start_time) < ?
-                ORDER BY start_time
-            ''', (start_date, end_date))
-            
-            rows = cursor.fetchall()
-            entries = []
-            for row in rows:
-                start_time = datetime.fromisoformat(row[0])
-                end_time = datetime.fromisoformat(row[1]) if row[1] else None
-                entries.append(TimeEntry(start_time, end_time, row[2]))
-            
-            return entries
+        """Get all completed entries for a specific month.
+        
+        Results are served from the month cache when possible (outside
+        transactions, whose uncommitted writes must not be cached).
+        """
+        conn = self.connections.connection()
+        cache = self.connections.month_cache
+        use_cache = not conn.in_transaction
+        if use_cache:
+            cached = cache.get(conn, (year, month))
+            if cached is not None:
+                return list(cached)
+            generation = cache.generation
+        
+        start_date, end_date = month_bounds(year, month)
+        entries = self._query_entries(f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE start_time >= ? 
+            AND start_time < ?
+            AND end_time IS NOT NULL
+            ORDER BY start_time
+        ''', (start_date, end_date)).fetchall()
+        
+        if use_cache:
+            cache.put((year, month), tuple(entries), generation)
+        return entries
     
     def get_entries_for_date(self, target_date: date) -> List[TimeEntry]:
         """Get all entries for a specific date"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            date_str = target_date.strftime('%Y-%m-%d')
-            cursor.execute('''
-                SELECT start_time, end_time, description 
-                FROM time_entries 
-                WHERE date(start_time) = ?
-                ORDER BY start_time
-            ''', (date_str,))
-            
-            rows = cursor.fetchall()
-            entries = []
-            for row in rows:
-                start_time = datetime.fromisoformat(row[0])
-                end_time = datetime.fromisoformat(row[1]) if row[1] else None
-                entries.append(TimeEntry(start_time, end_time, row[2]))
-            
-            return entries
+        return self._query_entries(f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE start_time >= ? 
+            AND start_time < ?
+            ORDER BY start_time
+        ''', (target_date.isoformat(), (target_date + timedelta(days=1)).isoformat())).fetchall()
     
     def get_total_hours_for_month(self, year: int, month: int) -> float:
         """Get total hours worked in a specific month"""
-        entries = self.get_entries_for_month(year, month)
-        return sum(entry.duration_hours() for entry in entries)
+        conn = self.connections.connection()
+        start_date, end_date = month_bounds(year, month)
+        
+        total_minutes = conn.execute('''
+            SELECT SUM(total_minutes) FROM daily_totals WHERE day >= ? AND day < ?
+        ''', (start_date, end_date)).fetchone()[0]
+        return (total_minutes or 0) / 60
     
     def get_daily_summary_for_month(self, year: int, month: int) -> Dict[int, float]:
         """Get daily hour totals for a specific month"""
-        entries = self.get_entries_for_month(year, month)
-        daily_hours = {}
+        conn = self.connections.connection()
+        start_date, end_date = month_bounds(year, month)
         
-        for entry in entries:
-            day = entry.start_time.day
-            if day not in daily_hours:
-                daily_hours[day] = 0
-            daily_hours[day] += entry.duration_hours()
+        cursor = conn.execute('''
+            SELECT CAST(substr(day, 9, 2) AS INTEGER), total_minutes 
+            FROM daily_totals WHERE day >= ? AND day < ?
+        ''', (start_date, end_date))
         
-        return daily_hours
+        return {day: minutes / 60 for day, minutes in cursor}
     
-    def add_manual_entry(self, date_obj: date, start_time_str: str, end_time_str: str, description: str = "") -> bool:
-        """Add a manual time entry for a specific date"""
+    def get_daily_details_for_month(self, year: int, month: int) -> Dict[int, Dict]:
+        """Get per-day totals, entry counts and earliest/latest times for a specific month"""
+        conn = self.connections.connection()
+        start_date, end_date = month_bounds(year, month)
+        
+        cursor = conn.execute('''
+            SELECT CAST(substr(day, 9, 2) AS INTEGER), total_minutes, entry_count, earliest_start, latest_end 
+            FROM daily_totals WHERE day >= ? AND day < ?
+        ''', (start_date, end_date))
+        
+        details = {}
+        for day, minutes, count, earliest_start, latest_end in cursor:
+            details[day] = {
+                'total_hours': minutes / 60,
+                'entries_count': count,
+                'earliest_start': time.fromisoformat(earliest_start) if earliest_start else None,
+                'latest_end': time.fromisoformat(latest_end) if latest_end else None,
+            }
+        return details
+    
+    @staticmethod
+    def manual_entry(date_obj: date, start_time_str: str, end_time_str: str, description: str = "") -> TimeEntry:
+        """Build an entry from a date and HH:MM start and end times.
+        
+        An end time at or before the start is taken to be on the next day.
+        Raises ValueError for malformed times.
+        """
+        # Create datetime objects for the specified date
+        start_datetime = datetime.combine(date_obj, parse_clock(start_time_str))
+        end_datetime = datetime.combine(date_obj, parse_clock(end_time_str))
+        
+        # Handle case where end time is next day (e.g., night shift)
+        if end_datetime <= start_datetime:
+            end_datetime += timedelta(days=1)
+        
+        return TimeEntry(start_datetime, end_datetime, description)
+    
+    @staticmethod
+    def duration_entry(date_obj: date, duration_str: str, start_time_str: str = "09:00", description: str = "") -> TimeEntry:
+        """Build an entry from a date, a duration like '5h 30m' and an HH:MM start.
+        
+        Raises ValueError for malformed or zero durations and times.
+        """
+        hours, minutes = parse_duration(duration_str)
+        if hours == 0 and minutes == 0:
+            raise ValueError(f"invalid duration {duration_str!r}, use e.g. '5h 30m', '2h' or '45m'")
+        
+        start_datetime = datetime.combine(date_obj, parse_clock(start_time_str))
+        
+        # Calculate end time
+        end_datetime = start_datetime + timedelta(hours=hours, minutes=minutes)
+        return TimeEntry(start_datetime, end_datetime, description)
+    
+    def add_manual_entry(self, date_obj: date, start_time_str: str, end_time_str: str, description: str = "",
+                         overlap: str = 'reject') -> bool:
+        """Add a manual time entry for a specific date.
+        
+        Returns False for malformed times; raises OverlapError if the entry
+        overlaps others and overlap is 'reject'.
+        """
         try:
-            # Parse time strings (format: HH:MM)
-            start_hour, start_min = map(int, start_time_str.split(':'))
-            end_hour, end_min = map(int, end_time_str.split(':'))
-            
-            # Create datetime objects for the specified date
-            start_datetime = datetime.combine(date_obj, time(start_hour, start_min))
-            end_datetime = datetime.combine(date_obj, time(end_hour, end_min))
-            
-            # Handle case where end time is next day (e.g., night shift)
-            if end_datetime <= start_datetime:
-                end_datetime += timedelta(days=1)
-            
-            # Create and add the entry
-            entry = TimeEntry(start_datetime, end_datetime, description)
-            self.add_completed_entry(entry)
-            return True
-            
-        except (ValueError, IndexError):
+            entry = self.manual_entry(date_obj, start_time_str, end_time_str, description)
+        except ValueError:
             return False
+        self.add_completed_entry(entry, overlap)
+        return True
     
-    def add_duration_entry(self, date_obj: date, duration_str: str, start_time_str: str = "09:00", description: str = "") -> bool:
-        """Add a work entry using duration format (e.g., '5h 30m', '2h', '45m')"""
+    def add_duration_entry(self, date_obj: date, duration_str: str, start_time_str: str = "09:00", description: str = "",
+                           overlap: str = 'reject') -> bool:
+        """Add a work entry using duration format (e.g., '5h 30m', '2h', '45m').
+        
+        Returns False for malformed input; raises OverlapError if the entry
+        overlaps others and overlap is 'reject'.
+        """
         try:
-            from timesheet import TimesheetManager
-            # Parse duration string using existing method
-            temp_manager = TimesheetManager()
-            hours, minutes = temp_manager._parse_duration(duration_str)
-            if hours == 0 and minutes == 0:
-                return False
-            
-            # Parse start time
-            start_hour, start_min = map(int, start_time_str.split(':'))
-            start_datetime = datetime.combine(date_obj, time(start_hour, start_min))
-            
-            # Calculate end time
-            end_datetime = start_datetime + timedelta(hours=hours, minutes=minutes)
-            
-            # Create and add the entry
-            entry = TimeEntry(start_datetime, end_datetime, description)
-            self.add_completed_entry(entry)
-            return True
-            
-        except (ValueError, IndexError):
+            entry = self.duration_entry(date_obj, duration_str, start_time_str, description)
+        except ValueError:
             return False
+        self.add_completed_entry(entry, overlap)
+        return True
+    
+    def find_overlaps(self, entry: TimeEntry, exclude_id: int = None) -> List[TimeEntry]:
+        """Completed entries whose time span overlaps entry's, oldest first.
+        
+        Entries that only touch it (one ends as the other starts) and the
+        entry with id exclude_id are not included.
+        Only entries starting within the longest entry duration before it can
+        overlap, so the query reads a short range of the start_time index.
+        """
+        return self._query_entries(f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE start_time >= strftime('%Y-%m-%dT%H:%M:%S',
+                                         :start - (SELECT max_seconds FROM entry_span_bound WHERE id = 1), 'unixepoch')
+            AND start_time < :end_time
+            AND start_ts < :end AND end_ts > :start
+            AND id IS NOT :exclude_id
+            ORDER BY start_time, id
+        ''', {
+            'start': to_epoch(entry.start_time),
+            'end': to_epoch(entry.end_time),
+            'end_time': entry.end_time.isoformat(),
+            'exclude_id': exclude_id,
+        }).fetchall()
+    
+    def _resolve_overlaps(self, entry: TimeEntry, overlap: Optional[str], exclude_id: int = None,
+                          merged: List[TimeEntry] = None) -> TimeEntry:
+        """Apply an overlap policy to an entry about to be written; call within the write transaction.
+        
+        Returns the entry to write: entry itself, or for 'merge' one entry
+        spanning it and everything overlapping it, which are deleted (and
+        appended to merged, if given).
+        """
+        if overlap is not None and overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"unknown overlap policy {overlap!r} (expected one of {', '.join(OVERLAP_POLICIES)})")
+        if overlap in (None, 'warn'):
+            return entry
+        
+        # Merging widens the entry, which can reach further entries
+        while True:
+            overlaps = self.find_overlaps(entry, exclude_id)
+            if not overlaps:
+                return entry
+            if overlap == 'reject':
+                raise OverlapError(entry, overlaps)
+            
+            conn = self.connections.connection()
+            conn.executemany('DELETE FROM time_entries WHERE rowid = ?', [(other.id,) for other in overlaps])
+            if merged is not None:
+                merged.extend(overlaps)
+            self.connections.month_cache.invalidate(*(month_key(other.start_time) for other in overlaps))
+            spans = sorted(overlaps + [entry], key=lambda e: e.start_time)
+            descriptions = dict.fromkeys(e.description for e in spans if e.description)
+            entry = TimeEntry(spans[0].start_time, max(e.end_time for e in spans), '; '.join(descriptions))
+    
+    def iter_overlapping_pairs(self, batch_size: int = None) -> Iterator[Tuple[int, int, int]]:
+        """(earlier id, later id, overlapping seconds) of every pair of overlapping entries.
+        
+        A single sweep over the entries in start order, read from the covering
+        range index: entries still running when the next one starts are kept
+        in a heap by end time, so the pass costs O(n log n) plus the pairs found.
+        """
+        conn = self.connections.connection()
+        cursor = conn.execute('''
+            SELECT id, start_ts, end_ts FROM time_entries 
+            WHERE end_ts IS NOT NULL 
+            ORDER BY start_time
+        ''')
+        running = []
+        for entry_id, start_ts, end_ts in _stream(cursor, batch_size or ITER_BATCH_SIZE):
+            while running and running[0][0] <= start_ts:
+                heapq.heappop(running)
+            for other_end, other_id in running:
+                yield other_id, entry_id, min(end_ts, other_end) - start_ts
+            heapq.heappush(running, (end_ts, entry_id))
+    
+    def get_entries_by_ids(self, entry_ids: Iterable[int]) -> Dict[int, TimeEntry]:
+        """Entries for the given database ids, by id; unknown ids are left out"""
+        entry_ids = list(entry_ids)
+        entries = {}
+        for first in range(0, len(entry_ids), BULK_CHUNK_SIZE):
+            chunk = entry_ids[first:first + BULK_CHUNK_SIZE]
+            for entry in self._query_entries(f'''
+                SELECT {entry_columns()} 
+                FROM time_entries 
+                WHERE rowid IN ({', '.join('?' * len(chunk))})
+            ''', chunk):
+                entries[entry.id] = entry
+        return entries
     
     def delete_entry_by_id(self, entry_id: int) -> bool:
         """Delete a time entry by database ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM time_entries WHERE rowid = ?', (entry_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+        with self.connections.transaction() as conn:
+            row = conn.execute('DELETE FROM time_entries WHERE rowid = ? RETURNING start_time', (entry_id,)).fetchone()
+        
+        if row is None:
+            return False
+        self.connections.month_cache.invalidate(month_key(row[0]))
+        return True
     
-    def update_entry_by_id(self, entry_id: int, start_time: datetime, end_time: datetime, description: str = "") -> bool:
-        """Update a time entry by database ID"""
-        with sqlite3.connect(self.db_path) as conn:
+    def update_entry_by_id(self, entry_id: int, start_time: datetime, end_time: datetime, description: str = "",
+                           overlap: str = 'reject') -> bool:
+        """Update a time entry by database ID.
+        
+        Returns False if there is no such entry; raises OverlapError if it
+        would overlap others (an exact copy included) and overlap is 'reject'.
+        """
+        with self.connections.transaction() as conn:
             cursor = conn.cursor()
+            cursor.execute('SELECT start_time FROM time_entries WHERE rowid = ?', (entry_id,))
+            old = cursor.fetchone()
+            if old is None:
+                return False
+            entry = self._resolve_overlaps(TimeEntry(start_time, end_time, description), overlap, entry_id)
+            row = self._entry_row(entry)
             cursor.execute('''
-                UPDATE time_entries 
-                SET start_time = ?, end_time = ?, description = ?, updated_at = CURRENT_TIMESTAMP
+                UPDATE OR IGNORE time_entries 
+                SET start_time = ?, end_time = ?, description = ?,
+                    start_ts = ?, end_ts = ?, content_hash = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE rowid = ?
-            ''', (start_time.isoformat(), end_time.isoformat(), description, entry_id))
-            conn.commit()
-            return cursor.rowcount > 0
+            ''', row + (entry_id,))
+            if not cursor.rowcount:
+                # Now a copy of another entry, which keeps the hash (see _insert_entry)
+                cursor.execute('''
+                    UPDATE time_entries 
+                    SET start_time = ?, end_time = ?, description = ?,
+                        start_ts = ?, end_ts = ?, content_hash = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE rowid = ?
+                ''', row[:-1] + (entry_id,))
+        
+        self.connections.month_cache.invalidate(month_key(old[0]), month_key(entry.start_time))
+        return True
     
     def get_entry_by_id(self, entry_id: int) -> Optional[Tuple[int, TimeEntry]]:
         """Get a specific entry by database ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT rowid, start_time, end_time, description 
-                FROM time_entries 
-                WHERE rowid = ?
-            ''', (entry_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                entry_id = row[0]
-                start_time = datetime.fromisoformat(row[1])
-                end_time = datetime.fromisoformat(row[2]) if row[2] else None
-                entry = TimeEntry(start_time, end_time, row[3])
-                return (entry_id, entry)
+        entry = self._query_entries(f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE rowid = ?
+        ''', (entry_id,)).fetchone()
+        
+        if entry:
+            return (entry.id, entry)
+        return None
+    
+    def resolve_index(self, index: int) -> Optional[int]:
+        """Database ID of the entry at a 1-based display index, None if out of range.
+        
+        Indexes follow the chronological (start_time, id) order of `list` and
+        EntriesView. The row is found with one LIMIT 1 OFFSET query on the
+        start_time index, counted from whichever end is closer.
+        """
+        total = self.count_entries()
+        if not 1 <= index <= total:
             return None
+        if index > total // 2:
+            direction, offset = 'DESC', total - index
+        else:
+            direction, offset = 'ASC', index - 1
+        
+        conn = self.connections.connection()
+        row = conn.execute(f'''
+            SELECT id FROM time_entries
+            WHERE end_time IS NOT NULL
+            ORDER BY start_time {direction}, id {direction}
+            LIMIT 1 OFFSET ?
+        ''', (offset,)).fetchone()
+        return row[0] if row else None
     
     def get_entries_with_ids(self, limit: int = None) -> List[Tuple[int, TimeEntry]]:
         """Get all entries with their database IDs"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            query = '''
-                SELECT rowid, start_time, end_time, description 
-                FROM time_entries 
-                WHERE end_time IS NOT NULL
-                ORDER BY start_time DESC
-            '''
-            
-            if limit:
-                query += f' LIMIT {limit}'
-            
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            entries = []
-            for row in rows:
-                entry_id = row[0]
-                start_time = datetime.fromisoformat(row[1])
-                end_time = datetime.fromisoformat(row[2]) if row[2] else None
-                entry = TimeEntry(start_time, end_time, row[3])
-                entries.append((entry_id, entry))
-            
-            return entries
+        query = f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE end_time IS NOT NULL
+            ORDER BY start_time DESC
+        '''
+        
+        params = ()
+        if limit:
+            query += ' LIMIT ?'
+            params = (limit,)
+        
+        return [(entry.id, entry) for entry in self._query_entries(query, params)]
+    
+    def count_entries(self) -> int:
+        """Get the number of completed entries (from the daily rollup, O(days))"""
+        conn = self.connections.connection()
+        return conn.execute('SELECT SUM(entry_count) FROM daily_totals').fetchone()[0] or 0
+    
+    def get_entries_page(self, cursor: Optional[str] = None, limit: int = 20, direction: str = 'older') -> Dict:
+        """Get one page of (id, entry) pairs, newest first, by keyset pagination on (start_time, rowid).
+        
+        With a cursor (a next_cursor/prev_cursor from an earlier page), direction
+        'older' continues after it and 'newer' goes back before it. Without one,
+        'older' returns the newest page and 'newer' the oldest.
+        """
+        newer = direction == 'newer'
+        order = 'ASC' if newer else 'DESC'
+        
+        where = 'end_time IS NOT NULL'
+        params: List = []
+        if cursor:
+            where += ' AND (start_time, rowid) > (?, ?)' if newer else ' AND (start_time, rowid) < (?, ?)'
+            params.extend(decode_page_cursor(cursor))
+        params.append(limit + 1)
+        
+        entries = self._query_entries(f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE {where}
+            ORDER BY start_time {order}, rowid {order}
+            LIMIT ?
+        ''', params).fetchall()
+        
+        # The extra row only tells whether there is another page this way
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        if newer:
+            entries.reverse()
+            has_newer, has_older = has_more, cursor is not None
+        else:
+            has_newer, has_older = cursor is not None, has_more
+        
+        first, last = (entries[0], entries[-1]) if entries else (None, None)
+        return {
+            'entries': [(entry.id, entry) for entry in entries],
+            'next_cursor': encode_page_cursor(last.start_time.isoformat(), last.id) if last and has_older else None,
+            'prev_cursor': encode_page_cursor(first.start_time.isoformat(), first.id) if first and has_newer else None,
+        }
+    
+    def search_entries(self, query: str, start: Union[date, datetime, str] = None,
+                       end: Union[date, datetime, str] = None, limit: int = None) -> List[Tuple[int, TimeEntry]]:
+        """Find completed entries whose description contains every word of query.
+        
+        Returns (id, entry) pairs, best matches first (most recent first when
+        ranked equally). start and end bound start_time as a half-open range.
+        See search_entries_page() for which matches are ranked.
+        """
+        return self.search_entries_page(query, start, end, limit)['entries']
+    
+    def search_entries_page(self, query: str, start: Union[date, datetime, str] = None,
+                            end: Union[date, datetime, str] = None, limit: int = None) -> Dict:
+        """search_entries() plus whether its ranking left matches out.
+        
+        Only the SEARCH_RANK_WINDOW most recently added matches are ranked, so
+        words that occur in a large share of all entries stay cheap to search.
+        When more match, 'truncated' is True: older matches may rank better
+        than the 'entries' returned, and a narrower date range finds them.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return {'entries': [], 'truncated': False}
+        if not self.has_search_index():
+            return {'entries': self._search_entries_like(terms, start, end, limit), 'truncated': False}
+        
+        bounds = []
+        params = [fts5_match_expression(terms)]
+        if start is not None:
+            bounds.append('start_time >= ?')
+            params.append(start if isinstance(start, str) else start.isoformat())
+        if end is not None:
+            bounds.append('start_time < ?')
+            params.append(end if isinstance(end, str) else end.isoformat())
+        
+        conn = self.connections.connection()
+        if bounds:
+            # Entries in the range, counted from the start_time index but at most one past the limit
+            range_size = conn.execute(f'''
+                SELECT COUNT(*) FROM (
+                    SELECT 1 FROM time_entries WHERE {' AND '.join(bounds)} LIMIT ?
+                )
+            ''', params[1:] + [SEARCH_RANGE_PREFILTER + 1]).fetchone()[0]
+        
+        if not bounds:
+            candidates = 'FROM entries_fts WHERE entries_fts MATCH ?'
+        elif range_size <= SEARCH_RANGE_PREFILTER:
+            # Narrow range: collect its ids once from the start_time index. The unary +
+            # keeps FTS5 from turning the IN list into one index probe per id
+            candidates = f'''FROM entries_fts WHERE entries_fts MATCH ?
+                AND +entries_fts.rowid IN (SELECT id FROM time_entries WHERE {' AND '.join(bounds)})'''
+        else:
+            # Wide range: most matches fall inside it, so checking each one stops early
+            candidates = f'''FROM entries_fts JOIN time_entries r ON r.id = entries_fts.rowid
+                WHERE entries_fts MATCH ? AND {' AND '.join('r.' + bound for bound in bounds)}'''
+        # One match past the window tells whether it left any out
+        truncated = conn.execute(f'''
+            SELECT COUNT(*) FROM (SELECT 1 {candidates} LIMIT ?)
+        ''', params + [SEARCH_RANK_WINDOW + 1]).fetchone()[0] > SEARCH_RANK_WINDOW
+        params.append(SEARCH_RANK_WINDOW)
+        params.append(limit or SEARCH_LIMIT)
+        
+        entries = self._query_entries(f'''
+            WITH matches AS MATERIALIZED (
+                SELECT entries_fts.rowid AS id, bm25(entries_fts) AS score 
+                {candidates}
+                ORDER BY entries_fts.rowid DESC 
+                LIMIT ?
+            )
+            SELECT {entry_columns('t')} 
+            FROM matches JOIN time_entries t ON t.id = matches.id
+            WHERE t.end_time IS NOT NULL
+            ORDER BY matches.score, t.start_time DESC
+            LIMIT ?
+        ''', params)
+        
+        return {'entries': [(entry.id, entry) for entry in entries], 'truncated': truncated}
+    
+    def _search_entries_like(self, terms: List[str], start, end, limit: int = None) -> List[Tuple[int, TimeEntry]]:
+        """search_entries() for SQLite builds without FTS5: unranked LIKE scans, newest first"""
+        where = ['end_time IS NOT NULL']
+        params = []
+        for term in terms:
+            where.append("description LIKE ? ESCAPE '\\'")
+            params.append('%' + term.replace('_', '\\_') + '%')
+        if start is not None:
+            where.append('start_time >= ?')
+            params.append(start if isinstance(start, str) else start.isoformat())
+        if end is not None:
+            where.append('start_time < ?')
+            params.append(end if isinstance(end, str) else end.isoformat())
+        params.append(limit or SEARCH_LIMIT)
+        
+        entries = self._query_entries(f'''
+            SELECT {entry_columns()} 
+            FROM time_entries 
+            WHERE {' AND '.join(where)}
+            ORDER BY start_time DESC
+            LIMIT ?
+        ''', params)
+        
+        return [(entry.id, entry) for entry in entries]
     
     def get_stats(self) -> Dict:
         """Get overall statistics"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Total entries
-            cursor.execute('SELECT COUNT(*) FROM time_entries WHERE end_time IS NOT NULL')
-            total_entries = cursor.fetchone()[0]
-            
-            # Total hours
-            cursor.execute('''
-                SELECT SUM(
-                    (julianday(end_time) - julianday(start_time)) * 24
-                ) FROM time_entries WHERE end_time IS NOT NULL
-            ''')
-            total_hours = cursor.fetchone()[0] or 0
-            
-            # This month stats
-            now = datetime.now()
-            start_of_month = f"{now.year:04d}-{now.month:02d}-01"
-            if now.month == 12:
-                start_of_next_month = f"{now.year+1:04d}-01-01"
-            else:
-                start_of_next_month = f"{now.year:04d}-{now.month+1:02d}-01"
-            
-            cursor.execute('''
-                SELECT COUNT(*), SUM(
-                    (julianday(end_time) - julianday(start_time)) * 24
-                ) FROM time_entries 
-                WHERE end_time IS NOT NULL
-                AND date(start_time) >= ? 
-                AND date(start_time) < ?
-            ''', (start_of_month, start_of_next_month))
-            
-            month_result = cursor.fetchone()
-            month_entries = month_result[0] or 0
-            month_hours = month_result[1] or 0
-            
-            return {
-                'total_entries': total_entries,
-                'total_hours': round(total_hours, 2),
-                'month_entries': month_entries,
-                'month_hours': round(month_hours, 2),
-                'current_month': now.month,
-                'current_year': now.year
-            }
+        conn = self.connections.connection()
+        cursor = conn.cursor()
+        
+        # Total entries and hours, O(days) via the daily rollup
+        cursor.execute('SELECT SUM(entry_count), SUM(total_minutes) / 60.0 FROM daily_totals')
+        total_entries, total_hours = cursor.fetchone()
+        total_entries = total_entries or 0
+        total_hours = total_hours or 0
+        
+        # This month stats
+        now = datetime.now()
+        start_of_month, start_of_next_month = month_bounds(now.year, now.month)
+        
+        cursor.execute('''
+            SELECT SUM(entry_count), SUM(total_minutes) / 60.0 
+            FROM daily_totals WHERE day >= ? AND day < ?
+        ''', (start_of_month, start_of_next_month))
+        
+        month_result = cursor.fetchone()
+        month_entries = month_result[0] or 0
+        month_hours = month_result[1] or 0
+        
+        return {
+            'total_entries': total_entries,
+            'total_hours': round(total_hours, 2),
+            'month_entries': month_entries,
+            'month_hours': round(month_hours, 2),
+            'current_month': now.month,
+            'current_year': now.year
+        }
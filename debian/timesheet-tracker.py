@@ -11,9 +11,9 @@ sys.path.insert(0, '/usr/lib/python3/dist-packages/timesheet_tracker')
 
 # Import and run the CLI
 try:
-    from cli import cli
+    from cli import main
     if __name__ == '__main__':
-        cli()
+        main()
 except ImportError as e:
     print(f"Error importing timesheet tracker: {e}")
     print("Please ensure the package is properly installed.")
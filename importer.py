@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Streaming import and export of time entries as CSV or JSONL files.
+
+Both formats use the same fields as TimeEntry.to_dict(): start_time and
+end_time as ISO timestamps, plus an optional description. Input is read
+lazily and committed in chunks, and exports are written from a row
+iterator, so memory use does not depend on file size. Duplicates of
+existing entries are skipped, which makes re-running an import safe.
+"""
+
+import csv
+import json
+import time as _time
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, IO, Iterable, Iterator, Optional
+from time_entry import TimeEntry
+
+DEFAULT_IMPORT_CHUNK_SIZE = 5000
+
+FIELDS = ('start_time', 'end_time', 'description')
+
+class ImportStats:
+    """Running counters for an import"""
+
+    def __init__(self):
+        self.read = 0
+        self.added = 0
+        self.started = _time.perf_counter()
+
+    @property
+    def skipped(self) -> int:
+        return self.read - self.added
+
+    @property
+    def elapsed(self) -> float:
+        return _time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Entries read per second"""
+        elapsed = self.elapsed
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+def _entry_from_record(record: Dict, line: int) -> TimeEntry:
+    try:
+        start_time = datetime.fromisoformat(record['start_time'])
+        end_time = datetime.fromisoformat(record['end_time'])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"line {line}: invalid or missing start_time/end_time ({e})")
+    # Entries are stored in naive local time; convert values with a UTC offset
+    if start_time.tzinfo is not None:
+        start_time = start_time.astimezone().replace(tzinfo=None)
+    if end_time.tzinfo is not None:
+        end_time = end_time.astimezone().replace(tzinfo=None)
+    if end_time <= start_time:
+        raise ValueError(f"line {line}: end_time must be after start_time")
+    return TimeEntry(start_time, end_time, record.get('description') or '')
+
+def read_csv(source: IO) -> Iterator[TimeEntry]:
+    """Yield entries from a CSV file with a start_time,end_time[,description] header"""
+    reader = csv.DictReader(source)
+    for record in reader:
+        yield _entry_from_record(record, reader.line_num)
+
+def read_jsonl(source: IO) -> Iterator[TimeEntry]:
+    """Yield entries from a file with one JSON object per line"""
+    for line, text in enumerate(source, 1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {line}: invalid JSON ({e.msg})")
+        if not isinstance(record, dict):
+            raise ValueError(f"line {line}: expected a JSON object")
+        yield _entry_from_record(record, line)
+
+READERS = {
+    'csv': read_csv,
+    'jsonl': read_jsonl,
+}
+
+def write_csv(entries: Iterable[TimeEntry], target: IO) -> int:
+    """Write entries as CSV with a header row; returns the number written"""
+    writer = csv.writer(target)
+    writer.writerow(FIELDS)
+    count = 0
+    for entry in entries:
+        writer.writerow((entry.start_time.isoformat(), entry.end_time.isoformat(), entry.description))
+        count += 1
+    return count
+
+def write_jsonl(entries: Iterable[TimeEntry], target: IO) -> int:
+    """Write entries as one JSON object per line; returns the number written"""
+    count = 0
+    for entry in entries:
+        target.write(json.dumps(entry.to_dict()) + '\n')
+        count += 1
+    return count
+
+WRITERS = {
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+}
+
+def detect_format(filename: str) -> Optional[str]:
+    """Guess the file format from a file name"""
+    name = filename.lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+def import_entries(db, entries: Iterable[TimeEntry], chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+                   progress: Callable[[ImportStats], None] = None) -> ImportStats:
+    """Write entries to the database, committing every chunk_size entries.
+
+    Chunks that were committed before an error stay in the database; since
+    duplicates are skipped, the import can simply be run again.
+    """
+    stats = ImportStats()
+    entries = iter(entries)
+    while True:
+        chunk = list(islice(entries, chunk_size))
+        if not chunk:
+            break
+        stats.added += db.add_completed_entries(chunk)
+        stats.read += len(chunk)
+        if progress:
+            progress(stats)
+    return stats
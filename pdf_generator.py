@@ -6,6 +6,7 @@ from reportlab.lib.units import inch
 from datetime import datetime, date
 import calendar
 from typing import List
+from entry_batch import EntryBatch
 
 # Import both timesheet managers for compatibility
 try:
@@ -43,9 +44,12 @@ class PDFGenerator:
         story.append(Spacer(1, 20))
         
         # Summary section
-        entries = manager.get_entries_for_month(year, month)
         total_hours = manager.get_total_hours_for_month(year, month)
         daily_summary = manager.get_daily_summary_for_month(year, month)
+        if hasattr(manager, 'get_entry_batch_for_month'):
+            batch = manager.get_entry_batch_for_month(year, month)
+        else:
+            batch = EntryBatch.from_entries(manager.get_entries_for_month(year, month))
         
         summary_heading = Paragraph("Summary", self.heading_style)
         story.append(summary_heading)
@@ -53,6 +57,7 @@ class PDFGenerator:
         summary_data = [
             ["Total Hours Worked:", f"{total_hours:.2f}"],
             ["Total Days Worked:", str(len(daily_summary))],
+            ["Total Work Sessions:", str(len(batch))],
             ["Average Hours/Day:", f"{total_hours/len(daily_summary):.2f}" if daily_summary else "0.00"]
         ]
         
@@ -82,7 +87,7 @@ class PDFGenerator:
                 daily_data.append([date_str, hours])
             
             daily_table = Table(daily_data, colWidths=[2.5*inch, 2.5*inch])
-            daily_table.setStyle(TableStyle([
+            daily_style = TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
                 ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -93,27 +98,45 @@ class PDFGenerator:
                 ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
                 ('FONTSIZE', (0, 1), (-1, -1), 10),
                 ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            ])
+            daily_table.setStyle(daily_style)
             
             story.append(daily_table)
             story.append(Spacer(1, 30))
+            
+            weekday_heading = Paragraph("Hours by Weekday", self.heading_style)
+            story.append(weekday_heading)
+            
+            weekday_data = [["Weekday", "Hours Worked"]]
+            for weekday, hours in batch.by_weekday().items():
+                if hours:
+                    weekday_data.append([calendar.day_name[weekday], f"{hours:.2f}"])
+            
+            weekday_table = Table(weekday_data, colWidths=[2.5*inch, 2.5*inch])
+            weekday_table.setStyle(daily_style)
+            story.append(weekday_table)
+            story.append(Spacer(1, 30))
         
-        # Detailed entries
-        if entries:
+        # Detailed entries, streamed from the database when the manager supports it
+        if hasattr(manager, 'iter_entries_for_month'):
+            entries = manager.iter_entries_for_month(year, month)
+        else:
+            entries = sorted(manager.get_entries_for_month(year, month), key=lambda x: x.start_time)
+        
+        details_data = [["Date", "Start Time", "End Time", "Duration (h)", "Description"]]
+        for entry in entries:
+            date_str = entry.start_time.strftime("%Y-%m-%d")
+            start_time = entry.start_time.strftime("%H:%M")
+            end_time = entry.end_time.strftime("%H:%M") if entry.end_time else "N/A"
+            duration = f"{entry.duration_hours():.2f}"
+            description = entry.description[:30] + "..." if len(entry.description) > 30 else entry.description
+            
+            details_data.append([date_str, start_time, end_time, duration, description])
+        
+        if len(details_data) > 1:
             details_heading = Paragraph("Detailed Time Entries", self.heading_style)
             story.append(details_heading)
             
-            details_data = [["Date", "Start Time", "End Time", "Duration (h)", "Description"]]
-            
-            for entry in sorted(entries, key=lambda x: x.start_time):
-                date_str = entry.start_time.strftime("%Y-%m-%d")
-                start_time = entry.start_time.strftime("%H:%M")
-                end_time = entry.end_time.strftime("%H:%M") if entry.end_time else "N/A"
-                duration = f"{entry.duration_hours():.2f}"
-                description = entry.description[:30] + "..." if len(entry.description) > 30 else entry.description
-                
-                details_data.append([date_str, start_time, end_time, duration, description])
-            
             details_table = Table(details_data, colWidths=[1.2*inch, 1*inch, 1*inch, 1*inch, 2.3*inch])
             details_table.setStyle(TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+SQL statement profiler behind `timesheet --profile` and TIMESHEET_PROFILE.
+
+After enable(), every connection the database layer opens records each
+statement it executes: wall time (including fetching the rows), rows
+returned or changed, and the statement's EXPLAIN QUERY PLAN, looked up once
+per distinct statement. report() ranks the statements by total time and
+flags full-table scans, SELECTs repeated with the same parameters (like
+several get_current_session() calls in one command) and SELECTs run once
+per item with different parameters, the N+1 pattern.
+
+Statements are recorded per thread, so the web app can report each request
+on its own. Connections opened before enable() are not traced.
+"""
+
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+from database import ConnectionManager, TrackedConnection
+
+# Statements shown in a report, slowest first
+TOP_STATEMENTS = 15
+
+# A SELECT run this many times with different parameters is flagged as N+1
+N_PLUS_ONE_CALLS = 5
+
+# Statements without a query plan worth asking for
+NO_PLAN = ('BEGIN', 'COMMIT', 'END', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'PRAGMA',
+           'CREATE', 'DROP', 'ALTER', 'ANALYZE', 'VACUUM', 'REINDEX', 'EXPLAIN')
+
+# Plan step reading a whole table without an index; subqueries, constant
+# rows and virtual tables show up as SCAN too but are not flagged
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+_local = threading.local()
+_plans = {}
+_plans_lock = threading.Lock()
+
+class Statement:
+    """Everything recorded about one distinct SQL statement"""
+
+    def __init__(self, sql: str, plan: List[str]):
+        self.sql = sql
+        self.plan = plan
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.parameters = Counter()
+
+    def count_parameters(self, parameters):
+        try:
+            if isinstance(parameters, dict):
+                parameters = tuple(sorted(parameters.items()))
+            self.parameters[tuple(parameters)] += 1
+        except TypeError:
+            pass
+
+    @property
+    def is_select(self) -> bool:
+        return self.sql.split(None, 1)[0].upper() in ('SELECT', 'WITH')
+
+    def full_scans(self) -> List[str]:
+        """Tables the statement reads without an index"""
+        scans = []
+        for step in self.plan:
+            match = FULL_SCAN.match(step.strip())
+            if match and match.group(1) != 'CONSTANT':
+                scans.append(match.group(1))
+        return scans
+
+    def flags(self) -> List[str]:
+        flags = [f"full scan of {table}" for table in self.full_scans()]
+        if self.is_select and self.parameters:
+            parameters, calls = self.parameters.most_common(1)[0]
+            if calls > 1:
+                flags.append(f"repeated {calls}x with the same parameters")
+            if len(self.parameters) >= N_PLUS_ONE_CALLS:
+                flags.append(f"N+1: run {len(self.parameters)}x with different parameters")
+        return flags
+
+def _statements() -> dict:
+    statements = getattr(_local, 'statements', None)
+    if statements is None:
+        statements = _local.statements = {}
+    return statements
+
+def _query_plan(conn: sqlite3.Connection, sql: str, parameters) -> List[str]:
+    """EXPLAIN QUERY PLAN steps of sql, indented by depth"""
+    if sql.split(None, 1)[0].upper() in NO_PLAN:
+        return []
+    try:
+        # A plain cursor, so the EXPLAIN itself is not recorded
+        rows = sqlite3.Cursor(conn).execute('EXPLAIN QUERY PLAN ' + sql, parameters).fetchall()
+    except (sqlite3.Error, ValueError):
+        return []
+    depth = {0: -1}
+    plan = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        plan.append('  ' * depth[node] + detail)
+    return plan
+
+def _record(conn: sqlite3.Connection, sql: str, parameters) -> Statement:
+    key = ' '.join(sql.split())
+    statements = _statements()
+    statement = statements.get(key)
+    if statement is None:
+        with _plans_lock:
+            plan = _plans.get(key)
+        if plan is None:
+            plan = _query_plan(conn, sql, parameters)
+            with _plans_lock:
+                _plans[key] = plan
+        statement = statements[key] = Statement(key, plan)
+    statement.calls += 1
+    return statement
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that charges execution and fetch time to its statement"""
+
+    _statement = None
+
+    def _executed(self, statement: Statement, start: float):
+        statement.seconds += time.perf_counter() - start
+        if self.description is None and self.rowcount > 0:
+            statement.rows += self.rowcount
+        self._statement = statement
+
+    def _fetched(self, start: float, rows: int):
+        if self._statement is not None:
+            self._statement.seconds += time.perf_counter() - start
+            self._statement.rows += rows
+
+    def execute(self, sql, parameters=()):
+        statement = _record(self.connection, sql, parameters)
+        statement.count_parameters(parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._executed(statement, start)
+
+    def executemany(self, sql, seq_of_parameters):
+        if isinstance(seq_of_parameters, (list, tuple)) and seq_of_parameters:
+            statement = _record(self.connection, sql, seq_of_parameters[0])
+        else:
+            statement = _record(self.connection, sql, ())
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._executed(statement, start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        row = super().__next__()
+        self._fetched(start, 1)
+        return row
+
+class ProfiledConnection(TrackedConnection):
+    """Connection whose cursors, including conn.execute()'s, are profiled"""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts create plain cursors, bypassing cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def enable():
+    """Trace every statement on connections opened from now on"""
+    ConnectionManager.factory = ProfiledConnection
+
+def disable():
+    ConnectionManager.factory = TrackedConnection
+
+def is_enabled() -> bool:
+    return ConnectionManager.factory is ProfiledConnection
+
+def reset():
+    """Forget the statements recorded by the current thread"""
+    _local.statements = {}
+
+def statements() -> List[Statement]:
+    """Statements recorded by the current thread, slowest first"""
+    return sorted(_statements().values(), key=lambda s: s.seconds, reverse=True)
+
+def report(title: str = 'SQL profile', top: int = TOP_STATEMENTS) -> str:
+    """Ranked summary of the statements recorded by the current thread"""
+    ranked = statements()
+    calls = sum(s.calls for s in ranked)
+    total_ms = sum(s.seconds for s in ranked) * 1000
+    lines = [f"{title}: {calls} statements ({len(ranked)} distinct), "
+             f"{total_ms:.2f} ms, {sum(s.rows for s in ranked)} rows"]
+    if not ranked:
+        return lines[0]
+    lines.append(f"{'#':>3} {'total ms':>9} {'calls':>6} {'rows':>8}  statement")
+    for number, statement in enumerate(ranked[:top], 1):
+        sql = statement.sql if len(statement.sql) <= 100 else statement.sql[:97] + '...'
+        lines.append(f"{number:>3} {statement.seconds * 1000:>9.2f} {statement.calls:>6} "
+                     f"{statement.rows:>8}  {sql}")
+        indent = ' ' * 30
+        for flag in statement.flags():
+            lines.append(f"{indent}! {flag}")
+        for step in statement.plan:
+            lines.append(f"{indent}plan: {step}")
+    if len(ranked) > top:
+        rest = ranked[top:]
+        lines.append(f"    ... {len(rest)} more statements, "
+                     f"{sum(s.seconds for s in rest) * 1000:.2f} ms")
+    flagged = sum(1 for s in ranked if s.flags())
+    if flagged:
+        lines.append(f"{flagged} of {len(ranked)} statements flagged (!)")
+    return '\n'.join(lines)
+
+def print_report(title: str = 'SQL profile', file: Optional[object] = None):
+    """Print report() to stderr and start recording afresh"""
+    print(report(title), file=file or sys.stderr)
+    reset()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Session state file for shell prompts.
+
+DatabaseManager.start_session/stop_session keep a one-line copy of the
+running session next to the database (timesheet.db.session), so
+`status --porcelain` can answer without importing sqlite3 or opening the
+database. The database stays the source of truth: a state file that is
+missing, unreadable or older than the database or its WAL is ignored and
+the caller falls back to a query.
+
+This module must only import the standard library's lightweight modules.
+"""
+
+import os
+from datetime import datetime
+from typing import Optional, Tuple
+
+SUFFIX = '.session'
+
+IDLE = 'idle'
+ACTIVE = 'active'
+
+def state_path(db_path: str) -> Optional[str]:
+    """Path of the state file for a database, None for in-memory databases"""
+    if not db_path or db_path == ':memory:' or db_path.startswith('file:'):
+        return None
+    return db_path + SUFFIX
+
+def write_state(db_path: str, start_time: Optional[datetime] = None, description: str = ""):
+    """Atomically record the running session, or no session if start_time is None"""
+    path = state_path(db_path)
+    if path is None:
+        return
+    if start_time is None:
+        line = IDLE
+    else:
+        line = f"{ACTIVE}\t{start_time.isoformat()}\t{description or ''}"
+
+    # Readers see either the old file or the new one, never a partial write
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(line + '\n')
+        os.replace(temp_path, path)
+    except OSError:
+        # Only a cache; the next reader falls back to the database
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+def read_state(db_path: str) -> Optional[Tuple[Optional[datetime], str]]:
+    """(start_time, description) of the running session from the state file
+
+    Returns (None, '') when no session is running and None when the file
+    cannot be trusted, in which case the database has to be asked.
+    """
+    path = state_path(db_path)
+    if path is None:
+        return None
+    try:
+        state_mtime = os.stat(path).st_mtime_ns
+        # Any commit after the file was written makes it stale
+        if os.stat(db_path).st_mtime_ns > state_mtime:
+            return None
+        try:
+            if os.stat(db_path + '-wal').st_mtime_ns > state_mtime:
+                return None
+        except FileNotFoundError:
+            pass
+        with open(path, encoding='utf-8') as f:
+            line = f.read().rstrip('\n')
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    if line == IDLE:
+        return (None, '')
+    parts = line.split('\t', 2)
+    if len(parts) != 3 or parts[0] != ACTIVE:
+        return None
+    try:
+        return (datetime.fromisoformat(parts[1]), parts[2])
+    except ValueError:
+        return None
+
+def format_porcelain(start_time: Optional[datetime], description: str = "", now: datetime = None) -> str:
+    """Stable one-line status for scripts: `idle` or `active<TAB>minutes<TAB>start<TAB>description`"""
+    if start_time is None:
+        return IDLE
+    minutes = int(((now or datetime.now()) - start_time).total_seconds() / 60)
+    description = ' '.join((description or '').split())
+    return f"{ACTIVE}\t{minutes}\t{start_time.isoformat(timespec='seconds')}\t{description}"
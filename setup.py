@@ -37,7 +37,7 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            "timesheet-tracker=cli:cli",
+            "timesheet-tracker=cli:main",
         ],
     },
     include_package_data=True,
@@ -119,5 +119,9 @@ finally:
     # Cleanup test database
     import os
     if os.path.exists('test_timesheet.db'):
+        db.close()
         os.remove('test_timesheet.db')
         print("🧹 Test database cleaned up")
+    # Left behind by start_session/stop_session for status --porcelain
+    if os.path.exists('test_timesheet.db.session'):
+        os.remove('test_timesheet.db.session')
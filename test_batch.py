@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""
+Test Batch Operations
+=====================
+"""
+
+import io
+import sqlite3
+import pytest
+from database import DatabaseManager
+from batch import JSON_CHUNK_SIZE, BatchError, iter_json_records, run_batch
+
+WEEK = """# one week of work
+add -d 2025-08-04 -s 09:00 -e 17:00 --desc "Client work"
+addhours -d 2025-08-05 -dur "5h 30m" --desc Review
+
+{"op": "add", "date": "2025-08-06", "start": "22:00", "end": "02:00", "description": "Night shift"}
+"""
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test_batch.db'))
+    yield manager
+    manager.close()
+
+def descriptions(db):
+    return [entry.description for entry in db.iter_entries_from()]
+
+def test_batch_applies_every_operation(db):
+    counts = run_batch(db, io.StringIO(WEEK))
+    assert counts == {'add': 2, 'addhours': 1, 'delete': 0, 'edit': 0}
+    assert descriptions(db) == ['Client work', 'Review', 'Night shift']
+    assert db.get_total_hours_for_month(2025, 8) == 17.5
+
+    # Indexes refer to the entries before the batch, whatever it deletes first
+    run_batch(db, io.StringIO('delete -i 1\nedit -i 2 -s 10:00 --desc "Review, shorter"\n'))
+    assert descriptions(db) == ['Review, shorter', 'Night shift']
+    assert db.get_total_hours_for_month(2025, 8) == 8.5
+
+def test_invalid_batch_changes_nothing_and_reports_every_line(db):
+    run_batch(db, io.StringIO(WEEK))
+    before = descriptions(db)
+
+    with pytest.raises(BatchError) as error:
+        run_batch(db, io.StringIO(
+            'delete -i 1\n'
+            'add -d 2025-08-07 -s 9 -e 10\n'
+            'addhours -d 2025-08-07 -dur 0h\n'
+            'edit -i 1 --desc again\n'
+            '{"op": "delete", "index": 99}\n'
+            'frobnicate\n'
+        ))
+    assert [line for line, _ in error.value.errors] == [2, 3, 4, 5, 6]
+    assert descriptions(db) == before
+
+def test_failure_while_applying_rolls_back_earlier_operations(db):
+    run_batch(db, io.StringIO(WEEK))
+
+    # Valid on its own, but the edit turns entry 2 into a copy of entry 1
+    with pytest.raises(BatchError) as error:
+        run_batch(db, io.StringIO(
+            'add -d 2025-08-01 -s 08:00 -e 09:00 --desc "Early start"\n'
+            'edit -i 2 -d 2025-08-04 -s 09:00 -e 17:00 --desc "Client work"\n'
+        ))
+    assert error.value.errors == [(2, 'overlaps 1 existing entry: 2025-08-04 09:00-17:00')]
+    assert descriptions(db) == ['Client work', 'Review', 'Night shift']
+
+def test_overlapping_operations_follow_the_policy(db):
+    run_batch(db, io.StringIO(WEEK))
+    late = 'add -d 2025-08-04 -s 16:00 -e 18:00 --desc "Client call"\n'
+
+    with pytest.raises(BatchError) as error:
+        run_batch(db, io.StringIO(late))
+    assert error.value.errors[0][0] == 1
+    assert 'overlaps 1 existing entry' in error.value.errors[0][1]
+
+    run_batch(db, io.StringIO(late), overlap='merge')
+    assert descriptions(db) == ['Client work; Client call', 'Review', 'Night shift']
+    assert db.get_total_hours_for_month(2025, 8) == 18.5
+
+def test_write_lock_is_not_held_while_reading(db):
+    def slow_source():
+        yield 'add -d 2025-08-04 -s 09:00 -e 12:00\n'
+        # Another writer, like `timesheet start`, gets the lock at once meanwhile
+        other = sqlite3.connect(db.db_path, timeout=0, isolation_level=None)
+        other.execute('BEGIN IMMEDIATE')
+        other.execute('ROLLBACK')
+        other.close()
+        yield 'add -d 2025-08-04 -s 13:00 -e 17:00\n'
+
+    assert run_batch(db, slow_source())['add'] == 2
+    assert db.count_entries() == 2
+
+@pytest.mark.parametrize('text', [
+    '[{"date": "2025-08-04"}, 12.5e1, "caf\u00e9", [1, 2]]',
+    '{"date": "2025-08-04"}\n125.0\n\n"caf\u00e9"\n[1, 2]\n',
+])
+def test_json_records_are_read_in_chunks(text):
+    # Three-byte chunks split values, numbers and characters alike
+    stream = io.BytesIO(text.encode())
+    assert list(iter_json_records(stream, chunk_size=3)) == [{'date': '2025-08-04'}, 125.0, 'caf\u00e9', [1, 2]]
+
+    records = iter_json_records(io.BytesIO(b'[{"a": 1}, {"b": ]'), chunk_size=3)
+    assert next(records) == {'a': 1}
+    with pytest.raises(ValueError):
+        next(records)
+
+@pytest.mark.parametrize('head', [b'{"a": 1}\n{oops}\n', b'[{"a": 1}, {"b": tr, '])
+def test_malformed_json_fails_without_reading_to_the_end(head):
+    stream = io.BytesIO(head + b'{"a": 1},\n' * 100000)
+    records = iter_json_records(stream)
+    assert next(records) == {'a': 1}
+    with pytest.raises(ValueError):
+        next(records)
+    assert stream.tell() <= 2 * JSON_CHUNK_SIZE
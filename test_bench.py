@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+"""
+Test Benchmark Suite
+====================
+"""
+
+import json
+import os
+from bench import bench_methods, populate, run
+from database import DatabaseManager
+
+def test_scale_suite_reports_every_section(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    report = run('scale', [300], repeat=2, json_file='results.json')
+
+    with open('results.json') as f:
+        saved = json.load(f)
+    assert saved['suite'] == 'scale' and saved['environment']['sqlite']
+    sections = saved['results']['300']
+    assert 'get_entries_for_month' in sections['methods']
+    assert 'GET /reports' in sections['web']
+    assert 'generate_monthly_report' in sections['pdf']
+    assert sections == json.loads(json.dumps(report['results'][300]))
+
+    # Throwaway databases only: nothing is created in the working directory
+    assert os.listdir(tmp_path) == ['results.json']
+
+def test_method_benchmarks_leave_the_data_set_unchanged(tmp_path):
+    db_path = str(tmp_path / 'bench.db')
+    populate(db_path, 200)
+    bench_methods(db_path, repeat=3)
+
+    db = DatabaseManager(db_path)
+    assert db.count_entries() == 200
+    assert db.get_current_session() is None
+    db.close()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""
+Test CLI Startup
+================
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules the session commands must never pull in
+HEAVY_MODULES = ('reportlab', 'flask', 'werkzeug', 'jinja2', 'dateutil', 'numpy',
+                 'pdf_generator', 'web_app', 'entry_batch', 'importer',
+                 'cli_entries', 'cli_reports', 'cli_data')
+
+# Import time in microseconds allowed for everything the command loads on
+# top of click; the database layer and sqlite3 take about 20ms
+IMPORT_BUDGET_US = 60000
+
+def import_times(command):
+    """(module, cumulative microseconds, top level) for each import made while resolving a subcommand"""
+    code = f"import click; import cli_group; cli_group.cli.get_command(None, {command!r})"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=HERE, capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented under the module that triggered them
+        times.append((name.strip(), int(cumulative), not name[1:].startswith(' ')))
+    return times
+
+@pytest.mark.parametrize('command', ['status', 'start', 'stop'])
+def test_session_commands_skip_heavy_imports(command):
+    times = import_times(command)
+    names = [name for name, _, _ in times]
+    assert 'session_state' in names
+    assert not {name.split('.')[0] for name in names} & set(HEAVY_MODULES)
+
+    # Everything imported after click is the cost of the command itself
+    # (the subcommand module is loaded through importlib, which -X importtime
+    # does not report, so its own imports show up at the top level)
+    after_click = times[names.index('click') + 1:]
+    own = sum(cumulative for _, cumulative, top_level in after_click if top_level)
+    assert own < IMPORT_BUDGET_US, f"{command} imports took {own / 1000:.1f}ms"
+
+@pytest.mark.parametrize('command', ['migrate', 'import', 'export'])
+def test_data_commands_skip_the_benchmarks(command):
+    names = {name for name, _, _ in import_times(command)}
+    assert 'timesheet_sqlite' in names
+    assert 'bench' not in names
+
+def test_every_command_resolves():
+    import cli_group
+    for name in cli_group.COMMANDS:
+        assert cli_group.cli.get_command(None, name).name == name
+
+def test_porcelain_status_skips_sqlite(tmp_path):
+    def porcelain(*args):
+        result = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(HERE, 'cli.py'), *args],
+                                cwd=tmp_path, capture_output=True, text=True, check=True)
+        return result.stdout.strip(), 'sqlite3' in result.stderr
+
+    # First call has no state file yet, so it asks the database and writes one
+    assert porcelain('status', '--porcelain') == ('idle', True)
+    assert porcelain('status', '--porcelain') == ('idle', False)
+
+    subprocess.run([sys.executable, os.path.join(HERE, 'cli.py'), 'start', '-d', 'prompt'],
+                   cwd=tmp_path, capture_output=True, check=True)
+    line, used_sqlite = porcelain('status', '--porcelain')
+    assert line.startswith('active\t0\t') and line.endswith('\tprompt')
+    assert not used_sqlite
+
+def test_commands_are_forwarded_to_a_running_daemon(tmp_path):
+    cli_path = os.path.join(HERE, 'cli.py')
+    socket_path = tmp_path / 'timesheet.db.sock'
+    daemon = subprocess.Popen([sys.executable, cli_path, 'daemon'], cwd=tmp_path,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        for _ in range(100):
+            if socket_path.exists():
+                break
+            time.sleep(0.05)
+        assert socket_path.exists(), daemon.stdout.read() if daemon.poll() is not None else 'no socket'
+
+        def run(*args):
+            result = subprocess.run([sys.executable, '-X', 'importtime', cli_path, *args],
+                                    cwd=tmp_path, capture_output=True, text=True)
+            imported = {line.split('|')[2].strip() for line in result.stderr.splitlines()
+                        if line.startswith('import time:')}
+            return result, imported
+
+        result, imported = run('start', '-d', 'forwarded')
+        assert result.returncode == 0 and 'forwarded' in result.stdout
+        # The client never loads click or the database layer
+        assert not imported & {'click', 'sqlite3', 'cli_group', 'json'}
+
+        result, _ = run('status', '--porcelain')
+        assert result.stdout.startswith('active\t0\t')
+
+        result, _ = run('list', '--no-such-option')
+        assert result.returncode == 2 and 'No such option' in result.stderr
+    finally:
+        daemon.terminate()
+        daemon.wait(timeout=10)
+    assert not socket_path.exists()
+
+def test_stale_daemon_socket_falls_back_to_in_process(tmp_path):
+    # A socket file nobody listens on, as left by a killed daemon
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(tmp_path / 'timesheet.db.sock'))
+    stale.close()
+
+    result = subprocess.run([sys.executable, os.path.join(HERE, 'cli.py'), 'status'],
+                            cwd=tmp_path, capture_output=True, text=True, check=True)
+    assert 'No active work session' in result.stdout
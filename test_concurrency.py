@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+"""
+Test Concurrent Sessions
+========================
+"""
+
+import multiprocessing
+import time
+from database import DatabaseManager
+
+PROCESSES = 6
+ROUNDS = 60
+
+# Session starts and stops per second all processes must reach together;
+# far below what SQLite manages, it only catches lock convoys and timeouts
+MIN_THROUGHPUT = 50
+
+def hammer(db_path, rounds, go):
+    """Try to start and stop a session rounds times; returns (started, stopped)"""
+    db = DatabaseManager(db_path)
+    go.wait()
+    started = stopped = 0
+    for _ in range(rounds):
+        started += db.start_session('stress')
+        stopped += db.stop_session() is not None
+    db.close()
+    return started, stopped
+
+def test_concurrent_start_stop_keeps_one_session(tmp_path):
+    db_path = str(tmp_path / 'stress.db')
+    DatabaseManager(db_path).close()
+
+    context = multiprocessing.get_context('spawn')
+    with context.Manager() as manager:
+        go = manager.Event()
+        with context.Pool(PROCESSES) as pool:
+            results = [pool.apply_async(hammer, (db_path, ROUNDS, go)) for _ in range(PROCESSES)]
+            # Let every worker open its database before the clock starts
+            time.sleep(1)
+            begin = time.perf_counter()
+            go.set()
+            counts = [result.get(timeout=120) for result in results]
+            elapsed = time.perf_counter() - begin
+
+    started = sum(s for s, _ in counts)
+    stopped = sum(s for _, s in counts)
+    db = DatabaseManager(db_path)
+    active = db.get_current_session() is not None
+    entries = list(db.iter_entries_from())
+    db.close()
+
+    # Every successful start ends as exactly one entry or the active session
+    assert started == stopped + active
+    assert len(entries) == stopped > 0
+    # Sessions never overlap: each one starts after the previous one stopped
+    for previous, entry in zip(entries, entries[1:]):
+        assert previous.start_time < previous.end_time <= entry.start_time
+
+    attempts = 2 * PROCESSES * ROUNDS
+    assert attempts / elapsed >= MIN_THROUGHPUT
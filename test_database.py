@@ -0,0 +1,670 @@
+#!/usr/bin/env python3
+
+"""
+Test Database Layer
+===================
+"""
+
+import os
+import pytest
+import random
+import sqlite3
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+from database import DatabaseManager, OverlapError
+from timesheet import TimeEntry
+from session_state import format_porcelain, read_state
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test_timesheet.db'))
+    yield manager
+    manager.close()
+
+def add(db, start, end, description=''):
+    entry = TimeEntry(datetime.fromisoformat(start), datetime.fromisoformat(end), description)
+    return db.add_completed_entry(entry)
+
+def query_plans(db, call):
+    """Run call() and return the EXPLAIN QUERY PLAN details of every SELECT it executed"""
+    conn = db.connections.connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+
+    plans = {}
+    for sql in statements:
+        if sql.lstrip().upper().startswith('SELECT'):
+            plans[sql] = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+    return plans
+
+def assert_covering_range_scan(plans, index='idx_time_entries_range'):
+    assert plans, "no queries were executed"
+    for sql, details in plans.items():
+        assert any(f'USING COVERING INDEX {index}' in d for d in details), (sql, details)
+        assert not any(d.startswith('SCAN') for d in details), (sql, details)
+
+def test_month_range_boundaries(db):
+    add(db, '2025-07-31T23:30:00', '2025-08-01T00:30:00', 'previous month')
+    add(db, '2025-08-01T00:00:00', '2025-08-01T01:00:00', 'first')
+    add(db, '2025-08-31T23:59:00', '2025-09-01T00:59:00', 'last')
+    add(db, '2025-09-01T00:00:00', '2025-09-01T02:00:00', 'next month')
+
+    entries = db.get_entries_for_month(2025, 8)
+    assert [e.description for e in entries] == ['first', 'last']
+    assert db.get_total_hours_for_month(2025, 8) == 2.0
+
+    december = db.get_entries_for_month(2025, 12)
+    assert december == []
+
+def test_date_range_boundaries(db):
+    add(db, '2025-08-14T22:00:00', '2025-08-15T01:00:00', 'night before')
+    add(db, '2025-08-15T09:00:00', '2025-08-15T12:00:00', 'morning')
+    add(db, '2025-08-16T00:00:00', '2025-08-16T01:00:00', 'next day')
+
+    entries = db.get_entries_for_date(date(2025, 8, 15))
+    assert [e.description for e in entries] == ['morning']
+
+def test_range_reads_use_covering_index(db):
+    for day in range(1, 29):
+        add(db, f'2025-08-{day:02d}T09:00:00', f'2025-08-{day:02d}T17:00:00', 'work')
+    db.connections.connection().execute('ANALYZE')
+
+    assert_covering_range_scan(query_plans(db, lambda: db.get_entries_for_month(2025, 8)))
+    assert_covering_range_scan(query_plans(db, lambda: db.get_entries_for_date(date(2025, 8, 15))))
+
+def test_summaries_read_daily_totals(db):
+    add(db, '2025-08-01T09:00:00', '2025-08-01T17:00:00')
+
+    for call in (db.get_stats,
+                 lambda: db.get_total_hours_for_month(2025, 8),
+                 lambda: db.get_daily_summary_for_month(2025, 8)):
+        for sql, details in query_plans(db, call).items():
+            assert 'time_entries' not in sql, sql
+            assert all('daily_totals' in d for d in details), (sql, details)
+
+def test_daily_totals_follow_writes(db):
+    first = add(db, '2025-08-01T09:00:00', '2025-08-01T12:00:00', 'a')
+    add(db, '2025-08-01T13:00:00', '2025-08-01T17:30:00', 'b')
+    add(db, '2025-08-02T10:00:00', '2025-08-02T11:00:00', 'c')
+
+    details = db.get_daily_details_for_month(2025, 8)
+    assert details[1]['total_hours'] == 7.5
+    assert details[1]['entries_count'] == 2
+    assert details[1]['earliest_start'].strftime('%H:%M') == '09:00'
+    assert details[1]['latest_end'].strftime('%H:%M') == '17:30'
+
+    # Moving an entry to another day updates both days
+    db.update_entry_by_id(first, datetime(2025, 8, 2, 8, 0), datetime(2025, 8, 2, 9, 0), 'a')
+    assert db.get_daily_summary_for_month(2025, 8) == {1: 4.5, 2: 2.0}
+    assert db.get_daily_details_for_month(2025, 8)[1]['earliest_start'].strftime('%H:%M') == '13:00'
+
+    db.delete_entry_by_id(first)
+    assert db.get_daily_summary_for_month(2025, 8) == {1: 4.5, 2: 1.0}
+    assert db.get_stats()['total_entries'] == 2
+
+    conn = db.connections.connection()
+    conn.execute('DELETE FROM daily_totals')
+    assert db.get_total_hours_for_month(2025, 8) == 0
+    assert db.rebuild_daily_totals() == 2
+    assert db.get_total_hours_for_month(2025, 8) == 5.5
+
+def test_aggregates_match_entry_durations(db):
+    add(db, '2025-08-01T09:00:00', '2025-08-01T17:30:00')
+    add(db, '2025-08-01T22:00:00', '2025-08-02T01:15:00')
+    add(db, '2025-08-05T09:00:10.500000', '2025-08-05T09:45:00')
+
+    entries = db.get_entries_for_month(2025, 8)
+    assert db.get_total_hours_for_month(2025, 8) == pytest.approx(sum(e.duration_hours() for e in entries))
+    assert db.get_daily_summary_for_month(2025, 8) == pytest.approx({1: 11.75, 5: 44 / 60})
+
+def test_rows_written_by_other_tools_get_epoch_columns(db):
+    add(db, '2025-08-01T09:00:00', '2025-08-01T10:00:00', 'ours')
+
+    # Another program (or an older version) only writes the ISO columns
+    other = sqlite3.connect(db.db_path, isolation_level=None)
+    other.execute("""
+        INSERT INTO time_entries (start_time, end_time, description)
+        VALUES ('2025-08-02T09:00:00', '2025-08-02T11:30:00', 'theirs')
+    """)
+    assert db.count_entries() == 2
+    assert db.get_total_hours_for_month(2025, 8) == 3.5
+    assert [entry.duration_hours() for entry in db.get_entries_for_month(2025, 8)] == [1.0, 2.5]
+    assert [entry.description for entry in db.find_overlaps(span('2025-08-02T11:00:00', '2025-08-02T12:00:00'))] == ['theirs']
+
+    # Moving it by its ISO columns alone moves its epoch copies too
+    other.execute("""
+        UPDATE time_entries SET start_time = '2025-08-05T09:00:00', end_time = '2025-08-05T10:00:00'
+        WHERE description = 'theirs'
+    """)
+    other.close()
+    assert db.get_daily_summary_for_month(2025, 8) == pytest.approx({1: 1.0, 5: 1.0})
+    assert db.find_overlaps(span('2025-08-02T11:00:00', '2025-08-02T12:00:00')) == []
+
+def test_epoch_migration_backfills_in_batches(tmp_path, monkeypatch):
+    import sqlite3
+    import database
+
+    # A database created before the epoch columns existed
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE time_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            start_time TEXT NOT NULL,
+            end_time TEXT,
+            description TEXT DEFAULT '',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO time_entries (start_time, end_time, description) VALUES (?, ?, ?)',
+        [(f'2025-08-{day:02d}T09:00:00', f'2025-08-{day:02d}T10:30:00', '') for day in range(1, 29)]
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(database, 'BACKFILL_BATCH_SIZE', 5)
+    db = DatabaseManager(path)
+
+    conn = db.connections.connection()
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == database.SCHEMA_VERSION
+    assert conn.execute('SELECT COUNT(*) FROM time_entries WHERE start_ts IS NULL').fetchone()[0] == 0
+    assert [row[2] for row in conn.execute('PRAGMA index_info(idx_time_entries_range)')] == [
+        'start_time', 'end_time', 'description', 'start_ts', 'end_ts']
+    assert db.get_total_hours_for_month(2025, 8) == 28 * 1.5
+    db.close()
+
+def test_failed_commit_rolls_back(tmp_path):
+    from database import ConnectionManager
+    manager = ConnectionManager(str(tmp_path / 'commit.db'))
+    conn = manager.connection()
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute('CREATE TABLE parent (id INTEGER PRIMARY KEY)')
+    conn.execute('CREATE TABLE child (parent_id INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED)')
+
+    # A deferred foreign key is only checked, and fails, at COMMIT
+    with pytest.raises(sqlite3.IntegrityError):
+        with manager.transaction() as conn:
+            conn.execute('INSERT INTO child VALUES (1)')
+    assert not conn.in_transaction
+
+    manager.release()
+    with manager.transaction() as conn:
+        conn.execute('INSERT INTO parent VALUES (1)')
+    assert conn.execute('SELECT COUNT(*) FROM child').fetchone()[0] == 0
+    manager.close()
+
+def test_new_database_builds_no_index_it_drops(tmp_path):
+    from database import get_connection_manager
+    path = str(tmp_path / 'new.db')
+    conn = get_connection_manager(path).connection()
+    statements = []
+    conn.set_trace_callback(lambda sql: statements.append(' '.join(sql.split())))
+    try:
+        db = DatabaseManager(path)
+    finally:
+        conn.set_trace_callback(None)
+
+    created = [sql for sql in statements if sql.startswith('CREATE INDEX')]
+    assert not [sql for sql in created if 'idx_time_entries_epoch' in sql]
+    assert len([sql for sql in created if 'idx_time_entries_range' in sql]) == 1
+    assert not [sql for sql in statements if sql.startswith('DROP INDEX idx_time_entries_range')]
+    db.close()
+
+def test_bulk_insert_is_one_transaction(db):
+    entries = [
+        TimeEntry(datetime(2025, 8, day, 9, 0), datetime(2025, 8, day, 17, 0), f'day {day}')
+        for day in range(1, 29)
+    ]
+    assert db.add_completed_entries(iter(entries), chunk_size=5) == 28
+    assert db.get_total_hours_for_month(2025, 8) == 28 * 8
+
+    # A failure in a later chunk rolls back the earlier ones too
+    broken = entries[:12] + [TimeEntry(None)]
+    with pytest.raises(AttributeError):
+        db.add_completed_entries(broken, chunk_size=5)
+    assert db.get_stats()['total_entries'] == 28
+
+def test_exact_copies_follow_the_overlap_policy(db):
+    same = span('2025-08-01T09:00:00', '2025-08-01T12:00:00', 'same')
+    first = db.add_completed_entry(same)
+    with pytest.raises(OverlapError):
+        db.add_completed_entry(same, 'reject')
+    copy = db.add_completed_entry(same, 'warn')
+    assert copy != first
+    # Only imports skip entries that are already stored
+    assert db.add_completed_entries([same]) == 0
+    assert db.get_stats()['total_entries'] == 2
+
+    # Editing an entry into a copy of another one is an overlap too
+    other = add(db, '2025-08-02T09:00:00', '2025-08-02T12:00:00', 'different')
+    with pytest.raises(OverlapError):
+        db.update_entry_by_id(other, datetime(2025, 8, 1, 9), datetime(2025, 8, 1, 12), 'same')
+    assert db.update_entry_by_id(other, datetime(2025, 8, 1, 9), datetime(2025, 8, 1, 12), 'same', overlap='warn')
+    assert db.get_stats()['total_entries'] == 3
+
+def test_keyset_pages_walk_both_ways(db):
+    for day in range(1, 11):
+        # Two entries per day share a start time, so ties are broken by id
+        add(db, f'2025-08-{day:02d}T09:00:00', f'2025-08-{day:02d}T10:00:00', f'{day}a')
+        add(db, f'2025-08-{day:02d}T09:00:00', f'2025-08-{day:02d}T11:00:00', f'{day}b')
+    assert db.count_entries() == 20
+
+    seen, pages = [], []
+    page = db.get_entries_page(limit=6)
+    assert page['prev_cursor'] is None
+    while True:
+        pages.append(page)
+        seen.extend(entry.description for _, entry in page['entries'])
+        if not page['next_cursor']:
+            break
+        page = db.get_entries_page(page['next_cursor'], limit=6)
+
+    assert len(seen) == 20 and len(set(seen)) == 20
+    assert seen[:2] == ['10b', '10a']
+    assert [len(p['entries']) for p in pages] == [6, 6, 6, 2]
+
+    # Going back from the last page returns the previous page unchanged
+    back = db.get_entries_page(pages[-1]['prev_cursor'], limit=6, direction='newer')
+    assert [entry_id for entry_id, _ in back['entries']] == [entry_id for entry_id, _ in pages[-2]['entries']]
+    assert back['next_cursor'] == pages[-2]['next_cursor']
+
+    oldest = db.get_entries_page(limit=6, direction='newer')
+    assert [entry.description for _, entry in oldest['entries']][-1] == '1a'
+    assert oldest['next_cursor'] is None
+
+def test_keyset_page_query_uses_index(db):
+    add(db, '2025-08-01T09:00:00', '2025-08-01T10:00:00')
+    for call in (lambda: db.get_entries_page(limit=5),
+                 lambda: db.get_entries_page('2025-08-01T09:00:00~1', limit=5),
+                 lambda: db.get_entries_page('2025-08-01T09:00:00~1', limit=5, direction='newer')):
+        for sql, details in query_plans(db, call).items():
+            assert any('idx_time_entries_start_time' in d for d in details), (sql, details)
+            assert not any('TEMP B-TREE' in d for d in details), (sql, details)
+
+def test_iter_entries_streams_in_order(db):
+    for day in (3, 1, 2, 5, 4):
+        add(db, f'2025-08-{day:02d}T09:00:00', f'2025-08-{day:02d}T10:00:00', str(day))
+    db.start_session('running')
+
+    assert [e.description for e in db.iter_entries(batch_size=2)] == ['1', '2', '3', '4', '5']
+    between = db.iter_entries(date(2025, 8, 2), datetime(2025, 8, 4, 9, 0), batch_size=1)
+    assert [e.description for e in between] == ['2', '3']
+    assert [e.description for e in db.iter_entries(start='2025-08-05')] == ['5']
+
+MEMORY_PROBE = """
+import resource, sys
+from database import DatabaseManager
+db = DatabaseManager(sys.argv[1], mmap_size=0)
+baseline = None
+for count, entry in enumerate(db.iter_entries(batch_size=500), 1):
+    if count == 1000:
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(count, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline)
+"""
+
+def test_iter_entries_memory_is_flat(tmp_path):
+    pytest.importorskip('resource')
+    rows = 1_000_000
+    path = str(tmp_path / 'large.db')
+    DatabaseManager(path).close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute('''
+            INSERT INTO time_entries (start_time, end_time, description, start_ts, end_ts)
+            WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < ? - 1)
+            SELECT strftime('%Y-%m-%dT%H:%M:%S', 1500000000 + i * 3600, 'unixepoch'),
+                   strftime('%Y-%m-%dT%H:%M:%S', 1500000000 + i * 3600 + 1800, 'unixepoch'),
+                   'entry ' || i, 1500000000 + i * 3600, 1500000000 + i * 3600 + 1800
+            FROM n
+        ''', (rows,))
+    conn.close()
+
+    # Run in a fresh interpreter so peak RSS reflects only the iteration
+    result = subprocess.run([sys.executable, '-c', MEMORY_PROBE, path],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    count, growth_kb = map(int, result.stdout.split())
+    assert count == rows
+    # Only SQLite's page cache may grow; a materialised list would take hundreds of MB
+    assert growth_kb < 32 * 1024, f"peak RSS grew by {growth_kb} KB"
+
+def test_search_follows_writes(db, monkeypatch):
+    import database
+
+    first = add(db, '2025-08-01T09:00:00', '2025-08-01T12:00:00', 'Invoice migration prep')
+    add(db, '2025-08-04T09:00:00', '2025-08-04T11:00:00', 'Migrating invoices, part 2')
+    add(db, '2025-09-01T09:00:00', '2025-09-01T10:00:00', 'Invoice review')
+    add(db, '2025-09-02T09:00:00', '2025-09-02T10:00:00', 'Code review')
+
+    found = db.search_entries('invoice migration')
+    # Stemming matches other word forms; the shorter, closer match ranks first
+    assert [entry.description for _, entry in found] == ['Invoice migration prep', 'Migrating invoices, part 2']
+    for prefilter in (database.SEARCH_RANGE_PREFILTER, 0):
+        monkeypatch.setattr(database, 'SEARCH_RANGE_PREFILTER', prefilter)
+        september = db.search_entries('invoice', start=date(2025, 9, 1))
+        assert [entry.description for _, entry in september] == ['Invoice review']
+        august = db.search_entries('invoice', date(2025, 8, 1), datetime(2025, 8, 4, 9, 0))
+        assert [entry.description for _, entry in august] == ['Invoice migration prep']
+    assert db.search_entries('"unbalanced OR') == []
+    assert db.search_entries('  ') == []
+
+    db.update_entry_by_id(first, datetime(2025, 8, 1, 9), datetime(2025, 8, 1, 12), 'Planning')
+    assert [entry_id for entry_id, _ in db.search_entries('planning')] == [first]
+    assert len(db.search_entries('migration')) == 1
+    db.delete_entry_by_id(first)
+    assert db.search_entries('planning') == []
+
+def test_search_reports_matches_left_out_of_ranking(db, monkeypatch):
+    import database
+
+    # The best match, added first and so the first left out of a small window
+    add(db, '2025-07-01T09:00:00', '2025-07-01T10:00:00', 'Invoice')
+    for day in range(1, 6):
+        add(db, f'2025-08-{day:02d}T09:00:00', f'2025-08-{day:02d}T10:00:00', f'Invoice batch {day}')
+
+    monkeypatch.setattr(database, 'SEARCH_RANK_WINDOW', 3)
+    page = db.search_entries_page('invoice')
+    assert page['truncated']
+    assert [entry.description for _, entry in page['entries']] == ['Invoice batch 5', 'Invoice batch 4', 'Invoice batch 3']
+    assert not db.search_entries_page('invoice', start=date(2025, 8, 3))['truncated']
+    assert db.search_entries_page('invoice', start=date(2025, 8, 2))['truncated']
+
+    monkeypatch.setattr(database, 'SEARCH_RANK_WINDOW', 6)
+    page = db.search_entries_page('invoice')
+    assert not page['truncated']
+    assert page['entries'][0][1].description == 'Invoice'
+
+def test_search_without_fts5_uses_like(db, monkeypatch):
+    add(db, '2025-08-01T09:00:00', '2025-08-01T12:00:00', 'Invoice migration')
+    add(db, '2025-08-02T09:00:00', '2025-08-02T12:00:00', 'invoice_export')
+    monkeypatch.setattr(db, 'has_search_index', lambda: False)
+
+    assert [entry.description for _, entry in db.search_entries('INVOICE')] == ['invoice_export', 'Invoice migration']
+    assert [entry.description for _, entry in db.search_entries('invoice_export')] == ['invoice_export']
+
+def test_month_cache_invalidates_written_months(db):
+    august = add(db, '2025-08-01T09:00:00', '2025-08-01T10:00:00', 'a')
+    add(db, '2025-09-01T09:00:00', '2025-09-01T10:00:00', 'b')
+
+    def reads():
+        return [len(db.get_entries_for_month(2025, month)) for month in (8, 9)]
+
+    assert reads() == [1, 1]
+    assert reads() == [1, 1]
+    assert (db.get_cache_stats()['hits'], db.get_cache_stats()['misses']) == (2, 2)
+
+    add(db, '2025-08-02T09:00:00', '2025-08-02T10:00:00', 'c')
+    assert reads() == [2, 1]
+    assert (db.get_cache_stats()['hits'], db.get_cache_stats()['misses']) == (3, 3)
+
+    # Moving an entry invalidates both its old and its new month
+    db.update_entry_by_id(august, datetime(2025, 9, 2, 9), datetime(2025, 9, 2, 10), 'a')
+    assert reads() == [1, 2]
+    db.delete_entry_by_id(august)
+    assert reads() == [1, 1]
+
+    db.start_session('running', datetime(2025, 9, 3, 9))
+    db.stop_session()
+    assert reads() == [1, 2]
+
+def test_month_cache_sees_other_connections(db):
+    add(db, '2025-08-01T09:00:00', '2025-08-01T10:00:00')
+    assert len(db.get_entries_for_month(2025, 8)) == 1
+
+    # Another process writing the same file
+    other = sqlite3.connect(db.db_path)
+    other.execute('''
+        INSERT INTO time_entries (start_time, end_time, description, start_ts, end_ts)
+        VALUES ('2025-08-02T09:00:00', '2025-08-02T10:00:00', 'elsewhere', 1754125200, 1754128800)
+    ''')
+    other.commit()
+    other.close()
+
+    assert [e.description for e in db.get_entries_for_month(2025, 8)] == ['', 'elsewhere']
+
+def test_month_cache_is_bounded(db):
+    db.connections.month_cache.max_months = 2
+    for month in (1, 2, 3, 1):
+        db.get_entries_for_month(2025, month)
+    stats = db.get_cache_stats()
+    assert stats['months'] == 2
+    assert stats['misses'] == 4
+
+def test_entries_decode_timestamps_lazily(db):
+    whole = add(db, '2025-08-01T09:00:00', '2025-08-01T17:30:00', 'whole seconds')
+    add(db, '2025-08-02T09:00:00.250000', '2025-08-02T09:45:00', 'fractional')
+
+    first, second = db.get_entries_for_month(2025, 8)
+    assert first.id == whole
+    # Whole-second timestamps arrive as epoch seconds, durations need no datetimes
+    assert (type(first._start), type(first._end)) == (int, int)
+    assert first.duration_hours() == 8.5
+    assert type(first._start) is int
+
+    assert first.start_time == datetime(2025, 8, 1, 9, 0)
+    assert second.start_time == datetime(2025, 8, 2, 9, 0, 0, 250000)
+    assert second.duration_minutes() == 44
+    assert second.to_dict() == {
+        'start_time': '2025-08-02T09:00:00.250000',
+        'end_time': '2025-08-02T09:45:00',
+        'description': 'fractional',
+    }
+    assert not hasattr(first, '__dict__')
+
+@pytest.mark.parametrize('use_numpy', [True, False], ids=['numpy', 'array'])
+def test_entry_batch_matches_daily_totals(db, monkeypatch, use_numpy):
+    import entry_batch
+    if not use_numpy:
+        monkeypatch.setattr(entry_batch, 'numpy', None)
+    elif entry_batch.numpy is None:
+        pytest.skip('NumPy is not installed')
+    add(db, '2025-07-31T23:00:00', '2025-08-01T01:00:00', 'previous month')
+    add(db, '2025-08-01T09:00:00', '2025-08-01T17:30:00', 'Code review')
+    add(db, '2025-08-01T22:00:00', '2025-08-02T01:15:00', 'Deployment')
+    add(db, '2025-08-05T09:00:10.500000', '2025-08-05T09:45:00', 'Code review')
+    add(db, '2025-08-10T10:00:00', '2025-08-10T12:00:00')
+
+    batch = db.get_entry_batch(date(2025, 8, 1), date(2025, 9, 1))
+    assert len(batch) == 4
+    assert batch.descriptions == ['Code review', 'Deployment', '']
+    assert batch.total_hours() == pytest.approx(db.get_total_hours_for_month(2025, 8))
+    assert {day.day: hours for day, hours in batch.by_day().items()} == pytest.approx(
+        db.get_daily_summary_for_month(2025, 8))
+    assert batch.by_week() == pytest.approx({date(2025, 7, 28): 11.75, date(2025, 8, 4): 2 + 44 / 60})
+    assert batch.by_weekday() == pytest.approx({0: 0, 1: 44 / 60, 2: 0, 3: 0, 4: 11.75, 5: 0, 6: 2})
+    assert batch.by_description() == pytest.approx({'Code review': 8.5 + 44 / 60, 'Deployment': 3.25, '': 2})
+    assert batch.earliest_start() == datetime(2025, 8, 1, 9, 0)
+    assert batch.latest_end() == datetime(2025, 8, 10, 12, 0)
+
+    from_entries = entry_batch.EntryBatch.from_entries(db.get_entries_for_month(2025, 8))
+    assert from_entries.by_day() == batch.by_day()
+
+    empty = db.get_entry_batch('2025-10-01', '2025-11-01')
+    assert len(empty) == 0 and empty.total_hours() == 0
+    assert empty.by_day() == {} and empty.by_description() == {}
+    assert empty.earliest_start() is None
+
+def test_entries_view_reads_only_what_is_asked(db):
+    from database import EntriesView
+    view = EntriesView(db)
+    assert len(view) == 0 and not view and view[-5:] == []
+
+    for day in range(1, 11):
+        add(db, f'2025-08-{day:02d}T09:00:00', f'2025-08-{day:02d}T10:00:00', f'day {day}')
+    # Same start time: ties are ordered by id
+    add(db, '2025-08-05T09:00:00', '2025-08-05T09:30:00', 'day 5 again')
+    db.start_session('running')
+
+    days = [f'day {day}' for day in range(1, 11)]
+    days.insert(5, 'day 5 again')
+    assert len(view) == 11 and view
+    assert [e.description for e in view] == days
+    assert [e.description for e in reversed(view)] == days[::-1]
+    assert view[0].description == 'day 1'
+    assert view[-1].description == 'day 10'
+    assert view[5].description == 'day 5 again'
+    assert [e.description for e in view[-3:]] == days[-3:]
+    assert [e.description for e in view[2:5]] == days[2:5]
+    assert [e.description for e in view[::3]] == days[::3]
+    assert [e.description for e in view[8:2:-2]] == days[8:2:-2]
+    with pytest.raises(IndexError):
+        view[11]
+
+    conn = db.connections.connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        view[-3:]
+    finally:
+        conn.set_trace_callback(None)
+    reads = [sql for sql in statements if 'FROM time_entries' in sql]
+    assert len(reads) == 1 and 'LIMIT 3 OFFSET 0' in reads[0] and 'DESC' in reads[0]
+
+def test_resolve_index_matches_display_order(db):
+    from database import EntriesView
+    for day in (3, 1, 2, 5, 4):
+        add(db, f'2025-08-{day:02d}T09:00:00', f'2025-08-{day:02d}T10:00:00', f'day {day}')
+    add(db, '2025-08-04T09:00:00', '2025-08-04T09:30:00', 'day 4 again')
+
+    view = EntriesView(db)
+    assert [db.resolve_index(i) for i in range(1, 7)] == [entry.id for entry in view]
+    assert db.resolve_index(0) is None
+    assert db.resolve_index(7) is None
+
+    conn = db.connections.connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        db.resolve_index(6)
+    finally:
+        conn.set_trace_callback(None)
+    reads = [sql for sql in statements if 'FROM time_entries' in sql]
+    assert len(reads) == 1 and 'DESC' in reads[0] and 'LIMIT 1 OFFSET 0' in reads[0]
+    plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + reads[0])]
+    assert plan == ['SCAN time_entries USING INDEX idx_time_entries_start_time']
+
+def span(start, end, description=''):
+    return TimeEntry(datetime.fromisoformat(start), datetime.fromisoformat(end), description)
+
+def test_overlap_policies(db):
+    morning = add(db, '2025-08-04T09:00:00', '2025-08-04T12:00:00', 'Morning')
+    add(db, '2025-08-04T13:00:00', '2025-08-04T17:00:00', 'Afternoon')
+
+    # Touching entries are not overlaps, exact copies are
+    assert db.find_overlaps(span('2025-08-04T12:00:00', '2025-08-04T13:00:00')) == []
+    assert [entry.id for entry in db.find_overlaps(span('2025-08-04T09:00:00', '2025-08-04T12:00:00', 'Morning'))] == [morning]
+
+    with pytest.raises(OverlapError) as error:
+        db.add_manual_entry(date(2025, 8, 4), '11:00', '14:00', 'Lunch call')
+    assert [entry.description for entry in error.value.overlaps] == ['Morning', 'Afternoon']
+    assert db.count_entries() == 2
+
+    assert db.add_manual_entry(date(2025, 8, 4), '11:30', '12:30', 'Call', overlap='warn')
+    assert db.count_entries() == 3
+
+    # Merging swallows everything the widening span reaches
+    assert db.add_manual_entry(date(2025, 8, 4), '12:15', '13:30', 'Review', overlap='merge')
+    merged = db.get_entries_for_date(date(2025, 8, 4))
+    assert [(e.start_time.hour, e.end_time.hour, e.description) for e in merged] == \
+        [(9, 17, 'Morning; Call; Review; Afternoon')]
+    assert db.get_total_hours_for_month(2025, 8) == 8
+
+    # An edit does not overlap the entry it replaces
+    assert db.update_entry_by_id(merged[0].id, datetime(2025, 8, 4, 8), datetime(2025, 8, 4, 16), 'Day')
+    other = add(db, '2025-08-05T09:00:00', '2025-08-05T10:00:00')
+    with pytest.raises(OverlapError):
+        db.update_entry_by_id(other, datetime(2025, 8, 4, 15), datetime(2025, 8, 4, 18))
+
+def test_overlaps_match_brute_force(db):
+    rng = random.Random(7)
+    entries = []
+    for _ in range(300):
+        start = datetime(2025, 8, 1) + timedelta(minutes=rng.randrange(30 * 24 * 60))
+        entries.append(TimeEntry(start, start + timedelta(hours=rng.randrange(1, 10)), f'task {len(entries)}'))
+    db.add_completed_entries(entries)
+    stored = list(db.iter_entries_from())
+
+    def overlapping(a, b):
+        return a.start_time < b.end_time and b.start_time < a.end_time
+
+    expected = {frozenset((a.id, b.id)) for i, a in enumerate(stored) for b in stored[i + 1:] if overlapping(a, b)}
+    pairs = list(db.iter_overlapping_pairs(batch_size=7))
+    assert {frozenset(pair[:2]) for pair in pairs} == expected
+    by_id = {entry.id: entry for entry in stored}
+    for first, second, seconds in pairs:
+        a, b = by_id[first], by_id[second]
+        assert seconds == (min(a.end_time, b.end_time) - max(a.start_time, b.start_time)).total_seconds()
+
+    probe = span('2025-08-10T08:00:00', '2025-08-10T18:00:00')
+    found = [entry.id for entry in db.find_overlaps(probe)]
+    assert found == [entry.id for entry in stored if overlapping(entry, probe)]
+    for details in query_plans(db, lambda: db.find_overlaps(probe)).values():
+        assert 'SEARCH time_entries USING INDEX idx_time_entries_start_time (start_time>? AND start_time<?)' in details
+
+    # A longer entry widens the range looked at; deleting it narrows it on rebuild
+    long_id = add(db, '2025-08-07T08:00:00', '2025-08-10T09:00:00', 'Conference')
+    assert long_id in [entry.id for entry in db.find_overlaps(probe)]
+    db.delete_entry_by_id(long_id)
+    assert db.rebuild_span_bound() == 9 * 3600
+
+def test_current_schema_opens_with_one_read(db):
+    conn = db.connections.connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        DatabaseManager(db.db_path)
+    finally:
+        conn.set_trace_callback(None)
+    assert statements == ['PRAGMA user_version']
+
+def test_json_data_is_migrated_only_on_request(tmp_path, monkeypatch):
+    import json
+    from time_entry import parse_duration
+    from timesheet_sqlite import TimesheetManager
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'timesheet_data.json').write_text(json.dumps({'entries': [
+        {'start_time': '2025-08-01T09:00:00', 'end_time': '2025-08-01T12:00:00', 'description': 'legacy'},
+    ]}))
+
+    manager = TimesheetManager(str(tmp_path / 'timesheet.db'))
+    assert not manager.entries
+    assert manager.migrate_from_json()
+    assert [e.description for e in manager.entries] == ['legacy']
+    assert (tmp_path / 'timesheet_data.json.backup').exists()
+
+    assert parse_duration('5h 30m') == (5, 30)
+    assert parse_duration('45m') == (0, 45)
+    assert parse_duration('25h') == (0, 0)
+
+def test_session_state_file_follows_start_and_stop(db):
+    assert read_state(db.db_path) is None
+
+    start = datetime(2025, 8, 1, 9, 0)
+    assert db.start_session('prompt\twork', start)
+    assert read_state(db.db_path) == (start, 'prompt\twork')
+    assert format_porcelain(start, 'prompt\twork', now=datetime(2025, 8, 1, 10, 30)) == \
+        'active\t90\t2025-08-01T09:00:00\tprompt work'
+
+    db.stop_session()
+    assert read_state(db.db_path) == (None, '')
+    assert format_porcelain(None) == 'idle'
+
+def test_session_state_file_is_stale_after_other_writes(db):
+    db.start_session('running', datetime(2025, 8, 1, 9, 0))
+    state_file = db.db_path + '.session'
+    mtime = os.stat(state_file).st_mtime_ns
+
+    # A session changed behind the manager's back must not be trusted
+    db.connections.connection().execute('DELETE FROM current_session')
+    os.utime(state_file, ns=(mtime - 10**9, mtime - 10**9))
+    assert read_state(db.db_path) is None
+
+    assert db.sync_session_state() is None
+    assert read_state(db.db_path) == (None, '')
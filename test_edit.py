@@ -50,6 +50,7 @@ else:
 # Cleanup
 import os
 if os.path.exists('test_edit_timesheet.db'):
+    manager.db.close()
     os.remove('test_edit_timesheet.db')
     print("🧹 Test database cleaned up")
 
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+"""
+Test CSV/JSONL Import
+=====================
+"""
+
+import io
+from datetime import datetime, timezone
+import pytest
+from database import DatabaseManager
+from importer import import_entries, read_csv, read_jsonl
+
+CSV_DATA = """start_time,end_time,description
+2025-08-01T09:00:00,2025-08-01T12:00:00,Invoice migration
+2025-08-01T13:00:00,2025-08-01T17:00:00,
+2025-08-02T09:00:00,2025-08-02T10:30:00,"Review, part 1"
+"""
+
+JSONL_DATA = """{"start_time": "2025-08-01T09:00:00", "end_time": "2025-08-01T12:00:00", "description": "Invoice migration"}
+
+{"start_time": "2025-08-03T09:00:00", "end_time": "2025-08-03T11:00:00", "description": "Planning"}
+"""
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test_import.db'))
+    yield manager
+    manager.close()
+
+def test_csv_import_is_idempotent(db):
+    stats = import_entries(db, read_csv(io.StringIO(CSV_DATA)), chunk_size=2)
+    assert (stats.read, stats.added, stats.skipped) == (3, 3, 0)
+    assert db.get_total_hours_for_month(2025, 8) == 8.5
+
+    stats = import_entries(db, read_csv(io.StringIO(CSV_DATA)), chunk_size=2)
+    assert (stats.read, stats.added, stats.skipped) == (3, 0, 3)
+    assert db.get_stats()['total_entries'] == 3
+
+def test_jsonl_import_skips_entries_from_other_sources(db):
+    import_entries(db, read_csv(io.StringIO(CSV_DATA)))
+
+    stats = import_entries(db, read_jsonl(io.StringIO(JSONL_DATA)))
+    assert (stats.read, stats.added, stats.skipped) == (2, 1, 1)
+
+def test_invalid_record_keeps_committed_chunks(db):
+    data = CSV_DATA + "2025-08-04T09:00:00,not a time,broken\n"
+    with pytest.raises(ValueError, match='line 5'):
+        import_entries(db, read_csv(io.StringIO(data)), chunk_size=2)
+    assert db.get_stats()['total_entries'] == 2
+
+    # Fixing the file and re-running only adds what is missing
+    stats = import_entries(db, read_csv(io.StringIO(CSV_DATA)), chunk_size=2)
+    assert stats.added == 1
+
+def test_timestamps_with_an_offset_become_local_time(db):
+    data = '{"start_time": "2025-08-01T09:00:00+02:00", "end_time": "2025-08-01T07:30:00Z"}\n'
+    assert import_entries(db, read_jsonl(io.StringIO(data))).added == 1
+
+    entry = next(db.iter_entries_from())
+    assert entry.start_time == datetime(2025, 8, 1, 7, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert entry.duration_hours() == 0.5
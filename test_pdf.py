@@ -51,6 +51,7 @@ except Exception as e:
 finally:
     # Clean up test database
     if os.path.exists('test_pdf_timesheet.db'):
+        manager.db.close()
         os.remove('test_pdf_timesheet.db')
         print("🧹 Test database cleaned up")
 
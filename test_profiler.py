@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Test SQL Profiler
+=================
+"""
+
+from datetime import date
+import pytest
+from click.testing import CliRunner
+import profiler
+from database import DatabaseManager, get_connection_manager
+
+@pytest.fixture
+def profiling():
+    profiler.enable()
+    profiler.reset()
+    yield
+    profiler.disable()
+    profiler.reset()
+
+def find(sql_start):
+    return next(s for s in profiler.statements() if s.sql.startswith(sql_start))
+
+def test_profiler_records_statements_and_flags_patterns(tmp_path, profiling):
+    db = DatabaseManager(str(tmp_path / 'profile.db'))
+    for day in range(1, 7):
+        db.add_manual_entry(date(2025, 3, day), '09:00', '12:00', f'Day {day}')
+    ids = [entry.id for entry in db.get_all_entries()]
+
+    profiler.reset()
+    for _ in range(3):
+        db.get_current_session()
+    for entry_id in ids:
+        db.get_entry_by_id(entry_id)
+    assert db.count_entries() == 6
+
+    session = find('SELECT id, start_time, description FROM current_session')
+    assert session.calls == 3 and session.rows == 0
+    assert 'repeated 3x with the same parameters' in session.flags()
+
+    by_id = next(s for s in profiler.statements() if s.sql.endswith('WHERE rowid = ?'))
+    assert by_id.calls == 6 and by_id.rows == 6
+    assert 'N+1: run 6x with different parameters' in by_id.flags()
+    assert any('SEARCH time_entries' in step for step in by_id.plan)
+
+    assert find('SELECT SUM(entry_count) FROM daily_totals').full_scans() == ['daily_totals']
+
+    summary = profiler.report()
+    assert summary.startswith('SQL profile: 10 statements (3 distinct)')
+    assert '! full scan of daily_totals' in summary
+    db.close()
+
+def test_profile_option_prints_summary_to_stderr(tmp_path, monkeypatch):
+    from cli_group import cli
+
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    assert runner.invoke(cli, ['start']).exit_code == 0
+    assert 'SQL profile' not in runner.invoke(cli, ['status']).stderr
+
+    # Like a new process: only connections opened after --profile are traced
+    get_connection_manager('timesheet.db').close()
+    try:
+        result = runner.invoke(cli, ['--profile', 'stop'])
+    finally:
+        profiler.disable()
+    assert result.exit_code == 0
+    assert 'Work session stopped' in result.stdout
+    assert result.stderr.startswith('SQL profile:')
+    assert 'DELETE FROM current_session WHERE id = 1' in result.stderr
+    assert 'plan: SEARCH current_session' in result.stderr
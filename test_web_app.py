@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+Test Web API
+============
+"""
+
+import io
+import json
+import sqlite3
+import pytest
+
+pytest.importorskip('flask')
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # web_app opens timesheet.db in the working directory when it is imported
+    monkeypatch.chdir(tmp_path)
+    import web_app
+    from timesheet_sqlite import TimesheetManager
+    monkeypatch.setattr(web_app, 'timesheet_manager', TimesheetManager(str(tmp_path / 'test_web.db')))
+    yield web_app.app.test_client()
+    web_app.timesheet_manager.db.close()
+
+def test_bulk_entries_report_each_item(client):
+    items = [
+        {'date': '2025-08-04', 'start_time': '09:00', 'end_time': '12:00', 'description': 'Client work'},
+        {'date': '2025-08-04', 'start_time': '11:00', 'duration': '2h', 'description': 'Overlaps'},
+        {'date': '2025-08-05', 'duration': '1h 30m'},
+        {'date': '2025-08-06', 'start_time': '9'},
+    ]
+
+    # With atomic=1 the invalid items cancel the whole request
+    response = client.post('/api/entries/bulk?atomic=1', json=items)
+    assert response.status_code == 422
+    assert [result['index'] for result in response.get_json()['results']] == [1, 3]
+    assert client.get('/api/stats').get_json()['total_entries'] == 0
+
+    # Otherwise they are skipped; newline-delimited JSON works the same
+    response = client.post('/api/entries/bulk', data='\n'.join(json.dumps(item) for item in items),
+                           content_type='application/x-ndjson')
+    body = response.get_json()
+    assert (body['added'], body['failed']) == (2, 2)
+    assert 'overlaps 1 existing entry' in body['results'][1]['error']
+    assert [sorted(result) for result in body['results']] == [['id', 'index'], ['error', 'index'],
+                                                              ['id', 'index'], ['error', 'index']]
+
+    response = client.post('/api/entries/bulk?overlap=warn', json=items[1:2])
+    assert response.get_json()['results'][0]['overlaps'] == [body['results'][0]['id']]
+
+    response = client.post('/api/entries/bulk', data='[{"date": "2025-08-07", "duration": "1h"}, {')
+    assert response.status_code == 400
+    assert client.get('/api/stats').get_json()['total_entries'] == 3
+
+def test_bulk_upload_is_read_without_the_write_lock(client, tmp_path):
+    import web_app
+
+    class SlowUpload(io.BytesIO):
+        def readinto(self, buffer):
+            # Another writer, like `timesheet start`, gets the lock at once meanwhile
+            other = sqlite3.connect(web_app.timesheet_manager.db.db_path, timeout=0, isolation_level=None)
+            other.execute('BEGIN IMMEDIATE')
+            other.execute('ROLLBACK')
+            other.close()
+            return super().readinto(memoryview(buffer)[:16])
+
+    body = '\n'.join(json.dumps({'date': '2025-08-04', 'start_time': f'{hour:02d}:00', 'duration': '1h'})
+                     for hour in range(8, 12)).encode()
+    response = client.post('/api/entries/bulk', input_stream=SlowUpload(body), content_length=len(body),
+                           content_type='application/x-ndjson')
+    assert response.get_json()['added'] == 4
+
+def test_search_flags_matches_left_out_of_ranking(client, monkeypatch):
+    import database
+    items = [{'date': f'2025-08-{day:02d}', 'duration': '1h', 'description': f'Invoice {day}'} for day in range(1, 5)]
+    client.post('/api/entries/bulk', json=items)
+
+    assert client.get('/api/search?q=invoice').get_json()['truncated'] is False
+    monkeypatch.setattr(database, 'SEARCH_RANK_WINDOW', 2)
+    body = client.get('/api/search?q=invoice').get_json()
+    assert (body['count'], body['truncated']) == (2, True)
+    assert client.get('/api/search?q=invoice&from=2025-08-03').get_json()['truncated'] is False
+
+def test_bulk_merge_reports_the_surviving_entry(client):
+    items = [
+        {'date': '2025-08-04', 'start_time': '09:00', 'end_time': '10:00', 'description': 'a'},
+        {'date': '2025-08-04', 'start_time': '10:30', 'end_time': '11:30', 'description': 'b'},
+        # Merges a and b, which the first two results must no longer point to
+        {'date': '2025-08-04', 'start_time': '09:30', 'end_time': '10:45', 'description': 'c'},
+        {'date': '2025-08-05', 'start_time': '09:00', 'end_time': '10:00', 'description': 'd'},
+    ]
+    results = client.post('/api/entries/bulk?overlap=merge', json=items).get_json()['results']
+    ids = [result['id'] for result in results]
+
+    assert ids[0] == ids[1] == ids[2] != ids[3]
+    assert len(results[2]['overlaps']) == 2
+    merged = client.get(f'/api/entry/{ids[0]}').get_json()['entry']
+    assert (merged['start_time'], merged['end_time'], merged['description']) == ('09:00', '11:30', 'a; c; b')
+    assert client.get('/api/stats').get_json()['total_entries'] == 2
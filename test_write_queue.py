@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+"""
+Test Write Queue
+================
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from database import DatabaseManager, OverlapError
+from time_entry import TimeEntry
+from write_queue import WriteQueue
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test_write_queue.db'))
+    yield manager
+    manager.close()
+
+def hour(day: int, start: int, description: str = 'queued') -> TimeEntry:
+    start_time = datetime(2025, 8, day, start)
+    return TimeEntry(start_time, start_time + timedelta(hours=1), description)
+
+def test_writes_are_committed_in_batches(db):
+    # A long window collects every write below into one or two batches
+    queue = WriteQueue(db.connections, window=0.2)
+    futures = [queue.submit(db.add_completed_entry, hour(4, start)) for start in range(8, 16)]
+    ids = [future.result(timeout=10) for future in futures]
+    queue.close()
+
+    assert len(set(ids)) == 8
+    assert db.count_entries() == 8
+    assert queue.stats()['writes'] == 8
+    assert queue.stats()['batches'] < 8
+
+def test_failed_write_is_rolled_back_alone(db):
+    db.add_completed_entry(hour(5, 9, 'existing'))
+    queue = WriteQueue(db.connections, window=0.2)
+    before = queue.submit(db.add_completed_entry, hour(5, 8), 'reject')
+    clash = queue.submit(db.add_completed_entry, hour(5, 9, 'clash'), 'reject')
+    delete = queue.submit(db.delete_entry_by_id, db.resolve_index(1))
+    queue.close()
+
+    assert before.result() and delete.result()
+    with pytest.raises(OverlapError):
+        clash.result()
+    assert [entry.description for entry in db.iter_entries_from()] == ['queued']
+
+    with pytest.raises(RuntimeError):
+        queue.submit(db.delete_entry_by_id, 1)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Time entry type shared by the JSON and SQLite timesheet managers.
+"""
+
+import re
+from datetime import datetime, time, timedelta
+from typing import Dict, Optional, Tuple, Union
+
+EPOCH = datetime(1970, 1, 1)
+
+Timestamp = Union[datetime, str, int]
+
+def decode_timestamp(value: Optional[Timestamp]) -> Optional[datetime]:
+    """datetime of a timestamp given as a datetime, an ISO string or epoch seconds"""
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return EPOCH + timedelta(seconds=value)
+
+def to_epoch(value: datetime) -> int:
+    """Epoch seconds of a naive timestamp, matching SQLite's strftime('%s', ...)"""
+    return (value - EPOCH) // timedelta(seconds=1)
+
+def parse_duration(duration_str: str) -> Tuple[int, int]:
+    """Parse duration string like '5h 30m', '2h', '45m' and return (hours, minutes).
+    
+    Returns (0, 0) for strings without a valid duration.
+    """
+    duration_str = duration_str.lower().strip()
+    hours = 0
+    minutes = 0
+    
+    # Pattern to match hours and minutes
+    hour_match = re.search(r'(\d+)h', duration_str)
+    minute_match = re.search(r'(\d+)m', duration_str)
+    
+    if hour_match:
+        hours = int(hour_match.group(1))
+    if minute_match:
+        minutes = int(minute_match.group(1))
+    
+    # Validate reasonable values
+    if hours > 24 or minutes > 59:
+        return (0, 0)
+    
+    return (hours, minutes)
+
+def parse_clock(time_str: str) -> time:
+    """Parse an HH:MM time of day; raises ValueError"""
+    try:
+        hour, minute = map(int, time_str.split(':'))
+        return time(hour, minute)
+    except (AttributeError, ValueError):
+        raise ValueError(f"invalid time {time_str!r}, use HH:MM")
+
+class TimeEntry:
+    """One work session.
+    
+    start_time and end_time may be passed as datetimes, ISO strings or epoch
+    seconds; they are converted to datetime on first access, so entries that
+    are only counted, summed or written back out are never parsed. Entries
+    read from the database carry their row id.
+    """
+    __slots__ = ('_start', '_end', 'description', 'id')
+    
+    def __init__(self, start_time: Timestamp, end_time: Optional[Timestamp] = None,
+                 description: str = "", id: Optional[int] = None):
+        self._start = start_time
+        self._end = end_time
+        self.description = description
+        self.id = id
+    
+    @classmethod
+    def from_row(cls, cursor, row) -> 'TimeEntry':
+        """sqlite3 row factory for rows of (id, start, end, description)"""
+        entry = cls.__new__(cls)
+        entry.id, entry._start, entry._end, entry.description = row
+        return entry
+    
+    @property
+    def start_time(self) -> datetime:
+        value = self._start
+        if not isinstance(value, datetime):
+            value = self._start = decode_timestamp(value)
+        return value
+    
+    @start_time.setter
+    def start_time(self, value: Timestamp):
+        self._start = value
+    
+    @property
+    def end_time(self) -> Optional[datetime]:
+        value = self._end
+        if value is not None and not isinstance(value, datetime):
+            value = self._end = decode_timestamp(value)
+        return value
+    
+    @end_time.setter
+    def end_time(self, value: Optional[Timestamp]):
+        self._end = value
+    
+    def to_dict(self) -> Dict:
+        return {
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'description': self.description
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TimeEntry':
+        start_time = datetime.fromisoformat(data['start_time'])
+        end_time = datetime.fromisoformat(data['end_time']) if data['end_time'] else None
+        return cls(start_time, end_time, data.get('description', ''))
+    
+    def duration_minutes(self) -> int:
+        if self._end is None:
+            return 0
+        if type(self._start) is int and type(self._end) is int:
+            # Both still in epoch seconds, no need to build datetimes
+            return int((self._end - self._start) / 60)
+        return int((self.end_time - self.start_time).total_seconds() / 60)
+    
+    def duration_hours(self) -> float:
+        return self.duration_minutes() / 60
+    
+    def __repr__(self) -> str:
+        return f"TimeEntry({self.start_time!r}, {self.end_time!r}, {self.description!r}, id={self.id!r})"
@@ -1,35 +1,8 @@
 import json
 import os
-import re
 from datetime import datetime, date, time, timedelta
 from typing import Dict, List, Optional
-
-class TimeEntry:
-    def __init__(self, start_time: datetime, end_time: Optional[datetime] = None, description: str = ""):
-        self.start_time = start_time
-        self.end_time = end_time
-        self.description = description
-    
-    def to_dict(self) -> Dict:
-        return {
-            'start_time': self.start_time.isoformat(),
-            'end_time': self.end_time.isoformat() if self.end_time else None,
-            'description': self.description
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'TimeEntry':
-        start_time = datetime.fromisoformat(data['start_time'])
-        end_time = datetime.fromisoformat(data['end_time']) if data['end_time'] else None
-        return cls(start_time, end_time, data.get('description', ''))
-    
-    def duration_minutes(self) -> int:
-        if not self.end_time:
-            return 0
-        return int((self.end_time - self.start_time).total_seconds() / 60)
-    
-    def duration_hours(self) -> float:
-        return self.duration_minutes() / 60
+from time_entry import TimeEntry, parse_duration
 
 class TimesheetManager:
     def __init__(self, data_file: str = 'timesheet_data.json'):
@@ -153,24 +126,7 @@ class TimesheetManager:
     
     def _parse_duration(self, duration_str: str) -> tuple:
         """Parse duration string like '5h 30m', '2h', '45m' and return (hours, minutes)"""
-        duration_str = duration_str.lower().strip()
-        hours = 0
-        minutes = 0
-        
-        # Pattern to match hours and minutes
-        hour_match = re.search(r'(\d+)h', duration_str)
-        minute_match = re.search(r'(\d+)m', duration_str)
-        
-        if hour_match:
-            hours = int(hour_match.group(1))
-        if minute_match:
-            minutes = int(minute_match.group(1))
-        
-        # Validate reasonable values
-        if hours > 24 or minutes > 59:
-            return (0, 0)
-        
-        return (hours, minutes)
+        return parse_duration(duration_str)
     
     def delete_entry(self, entry_index: int) -> bool:
         """Delete a work entry by index (1-based)"""
@@ -1,54 +1,24 @@
-import json
-import os
-import re
 from datetime import datetime, date, time, timedelta
-from typing import Dict, List, Optional
-from database import DatabaseManager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+from database import DatabaseManager, EntriesView, month_bounds
+from time_entry import TimeEntry, parse_duration
 
-class TimeEntry:
-    def __init__(self, start_time: datetime, end_time: Optional[datetime] = None, description: str = ""):
-        self.start_time = start_time
-        self.end_time = end_time
-        self.description = description
-    
-    def to_dict(self) -> Dict:
-        return {
-            'start_time': self.start_time.isoformat(),
-            'end_time': self.end_time.isoformat() if self.end_time else None,
-            'description': self.description
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'TimeEntry':
-        start_time = datetime.fromisoformat(data['start_time'])
-        end_time = datetime.fromisoformat(data['end_time']) if data['end_time'] else None
-        return cls(start_time, end_time, data.get('description', ''))
-    
-    def duration_minutes(self) -> int:
-        if not self.end_time:
-            return 0
-        return int((self.end_time - self.start_time).total_seconds() / 60)
-    
-    def duration_hours(self) -> float:
-        return self.duration_minutes() / 60
+if TYPE_CHECKING:
+    from entry_batch import EntryBatch
 
 class TimesheetManager:
     def __init__(self, data_file: str = 'timesheet.db'):
-        # Use SQLite database instead of JSON
+        # Use SQLite database instead of JSON; legacy JSON data is only
+        # imported by migrate_from_json() (the `migrate` command)
         self.db = DatabaseManager(data_file)
         
-        # Check for legacy JSON file and migrate if exists
-        json_file = 'timesheet_data.json'
-        if os.path.exists(json_file):
-            self.db.migrate_from_json(json_file)
-        
         # Maintain compatibility properties
         self.data_file = data_file
     
     @property
-    def entries(self) -> List[TimeEntry]:
-        """Get all entries for backward compatibility"""
-        return self.db.get_all_entries()
+    def entries(self) -> EntriesView:
+        """All completed entries, oldest first, as a lazy read-only sequence"""
+        return EntriesView(self.db)
     
     @property
     def current_session(self) -> Optional[TimeEntry]:
@@ -74,6 +44,13 @@ class TimesheetManager:
         """Stop the current work session"""
         return self.db.stop_session()
     
+    def sync_session_state(self) -> Optional[TimeEntry]:
+        """Refresh the session state file read by `status --porcelain`"""
+        session_data = self.db.sync_session_state()
+        if session_data:
+            return TimeEntry(session_data[1], None, session_data[2])
+        return None
+    
     def get_current_session_duration(self) -> int:
         """Get current session duration in minutes"""
         return self.db.get_current_session_duration()
@@ -82,62 +59,87 @@ class TimesheetManager:
         """Get all completed entries for a specific month"""
         return self.db.get_entries_for_month(year, month)
     
+    def iter_entries(self, start=None, end=None, batch_size: int = None) -> Iterator[TimeEntry]:
+        """Stream completed entries in chronological order with constant memory"""
+        return self.db.iter_entries(start, end, batch_size)
+    
+    def iter_entries_for_month(self, year: int, month: int) -> Iterator[TimeEntry]:
+        """Stream the completed entries of a month in chronological order"""
+        return self.db.iter_entries(*month_bounds(year, month))
+    
+    def get_entry_batch(self, start=None, end=None) -> 'EntryBatch':
+        """Completed entries in [start, end) as columns for aggregation"""
+        return self.db.get_entry_batch(start, end)
+    
+    def get_entry_batch_for_month(self, year: int, month: int) -> 'EntryBatch':
+        """Completed entries of a month as columns for aggregation"""
+        return self.db.get_entry_batch(*month_bounds(year, month))
+    
     def get_total_hours_for_month(self, year: int, month: int) -> float:
         """Get total hours worked in a specific month"""
         return self.db.get_total_hours_for_month(year, month)
     
-    def add_manual_entry(self, date_obj: date, start_time_str: str, end_time_str: str, description: str = "") -> bool:
-        """Add a manual time entry for a specific date"""
-        return self.db.add_manual_entry(date_obj, start_time_str, end_time_str, description)
+    def add_manual_entry(self, date_obj: date, start_time_str: str, end_time_str: str, description: str = "",
+                         overlap: str = 'reject') -> bool:
+        """Add a manual time entry for a specific date (raises OverlapError when rejecting an overlap)"""
+        return self.db.add_manual_entry(date_obj, start_time_str, end_time_str, description, overlap)
     
-    def add_duration_entry(self, date_obj: date, duration_str: str, start_time_str: str = "09:00", description: str = "") -> bool:
+    def add_duration_entry(self, date_obj: date, duration_str: str, start_time_str: str = "09:00", description: str = "",
+                           overlap: str = 'reject') -> bool:
         """Add a work entry using duration format (e.g., '5h 30m', '2h', '45m')"""
-        return self.db.add_duration_entry(date_obj, duration_str, start_time_str, description)
+        return self.db.add_duration_entry(date_obj, duration_str, start_time_str, description, overlap)
+    
+    def find_overlaps(self, entry: TimeEntry, exclude_id: int = None) -> List[TimeEntry]:
+        """Completed entries whose time span overlaps entry's"""
+        return self.db.find_overlaps(entry, exclude_id)
+    
+    def migrate_from_json(self, json_file: str = 'timesheet_data.json') -> bool:
+        """Import a legacy JSON timesheet, then rename it to <json_file>.backup"""
+        return self.db.migrate_from_json(json_file)
     
     def _parse_duration(self, duration_str: str) -> tuple:
         """Parse duration string like '5h 30m', '2h', '45m' and return (hours, minutes)"""
-        duration_str = duration_str.lower().strip()
-        hours = 0
-        minutes = 0
-        
-        # Pattern to match hours and minutes
-        hour_match = re.search(r'(\d+)h', duration_str)
-        minute_match = re.search(r'(\d+)m', duration_str)
-        
-        if hour_match:
-            hours = int(hour_match.group(1))
-        if minute_match:
-            minutes = int(minute_match.group(1))
-        
-        # Validate reasonable values
-        if hours > 24 or minutes > 59:
-            return (0, 0)
-        
-        return (hours, minutes)
+        return parse_duration(duration_str)
     
     def delete_entry(self, entry_index: int) -> bool:
         """Delete a work entry by index (1-based) - for backward compatibility"""
-        # Get entries with IDs for proper deletion
-        entries_with_ids = self.db.get_entries_with_ids()
-        
-        if 1 <= entry_index <= len(entries_with_ids):
-            # Sort by start time to match display order
-            sorted_entries = sorted(entries_with_ids, key=lambda x: x[1].start_time)
-            entry_id = sorted_entries[entry_index - 1][0]
-            return self.db.delete_entry_by_id(entry_id)
-        return False
+        entry_id = self.db.resolve_index(entry_index)
+        if entry_id is None:
+            return False
+        return self.db.delete_entry_by_id(entry_id)
+    
+    def resolve_index(self, entry_index: int) -> Optional[int]:
+        """Database ID of the entry at a 1-based display index, None if out of range"""
+        return self.db.resolve_index(entry_index)
     
     def get_entries_with_index(self) -> List[tuple]:
         """Get all entries with their 1-based index for display"""
-        entries = self.db.get_all_entries()
-        # Sort by start time and add 1-based index
-        sorted_entries = sorted(entries, key=lambda x: x.start_time)
-        return [(i + 1, entry) for i, entry in enumerate(sorted_entries)]
+        return list(enumerate(self.entries, 1))
     
     def get_daily_summary_for_month(self, year: int, month: int) -> Dict[int, float]:
         """Get daily hour totals for a specific month"""
         return self.db.get_daily_summary_for_month(year, month)
     
+    def get_daily_details_for_month(self, year: int, month: int) -> Dict[int, Dict]:
+        """Get per-day totals, entry counts and earliest/latest times for a specific month"""
+        return self.db.get_daily_details_for_month(year, month)
+    
+    def rebuild_daily_totals(self) -> int:
+        """Recompute the daily totals rollup from all entries"""
+        return self.db.rebuild_daily_totals()
+    
+    def rebuild_span_bound(self) -> int:
+        """Recompute the longest entry duration bounding overlap checks, in seconds"""
+        return self.db.rebuild_span_bound()
+    
+    def get_cache_stats(self) -> Dict:
+        """Get hit/miss counters of the month cache"""
+        return self.db.get_cache_stats()
+    
+    def rebuild_search_index(self) -> bool:
+        """Repopulate the full-text search index, False if FTS5 is unavailable"""
+        return self.db.rebuild_search_index()
+    
     # New methods for enhanced functionality
     def get_entries_for_date(self, target_date: date) -> List[TimeEntry]:
         """Get all entries for a specific date"""
@@ -161,10 +163,31 @@ class TimesheetManager:
         result = self.db.get_entry_by_id(entry_id)
         return result[1] if result else None
     
-    def update_entry_by_id(self, entry_id: int, start_time: datetime, end_time: datetime, description: str = "") -> bool:
-        """Update an existing entry"""
-        return self.db.update_entry_by_id(entry_id, start_time, end_time, description)
+    def update_entry_by_id(self, entry_id: int, start_time: datetime, end_time: datetime, description: str = "",
+                           overlap: str = 'reject') -> bool:
+        """Update an existing entry (raises OverlapError when rejecting an overlap)"""
+        return self.db.update_entry_by_id(entry_id, start_time, end_time, description, overlap)
+    
+    def delete_entry_by_id(self, entry_id: int) -> bool:
+        """Delete an entry by database ID"""
+        return self.db.delete_entry_by_id(entry_id)
     
     def get_entries_with_ids(self) -> List[tuple]:
         """Get all entries with their database IDs"""
         return self.db.get_entries_with_ids()
+    
+    def get_entries_page(self, cursor: Optional[str] = None, limit: int = 20, direction: str = 'older') -> Dict:
+        """Get one newest-first page of (id, entry) pairs plus next/prev cursors"""
+        return self.db.get_entries_page(cursor, limit, direction)
+    
+    def search_entries(self, query: str, start=None, end=None, limit: int = None) -> List[tuple]:
+        """Full-text search over descriptions, returns ranked (id, entry) pairs"""
+        return self.db.search_entries(query, start, end, limit)
+    
+    def search_entries_page(self, query: str, start=None, end=None, limit: int = None) -> Dict:
+        """search_entries() plus whether ranking left older matches out"""
+        return self.db.search_entries_page(query, start, end, limit)
+    
+    def count_entries(self) -> int:
+        """Get the number of completed entries"""
+        return self.db.count_entries()
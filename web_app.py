@@ -1,16 +1,56 @@
 #!/usr/bin/env python3
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, send_file
 from datetime import datetime, date, timedelta, time
 import calendar
+import json
 import os
 import tempfile
+from batch import BatchError, iter_json_records
+from database import DatabaseManager, OverlapError, OVERLAP_POLICIES
 from timesheet_sqlite import TimesheetManager
+from time_entry import TimeEntry
 
 app = Flask(__name__)
 
+# TIMESHEET_PROFILE=1 prints the SQL statements of every request to stderr
+if os.environ.get('TIMESHEET_PROFILE'):
+    import profiler
+    profiler.enable()
+
+    @app.before_request
+    def start_sql_profile():
+        profiler.reset()
+
+    @app.after_request
+    def print_sql_profile(response):
+        profiler.print_report(f"SQL profile for {request.method} {request.full_path.rstrip('?')}")
+        return response
+
 # Initialize the timesheet manager with SQLite backend
 timesheet_manager = TimesheetManager()
 
+# TIMESHEET_WRITE_QUEUE=1 commits entry writes in batches from one writer
+# thread; TIMESHEET_WRITE_QUEUE_WINDOW_MS sets how long a batch waits for more
+write_queue = None
+if os.environ.get('TIMESHEET_WRITE_QUEUE'):
+    import atexit
+    from write_queue import WriteQueue, DEFAULT_WINDOW
+    window_ms = os.environ.get('TIMESHEET_WRITE_QUEUE_WINDOW_MS')
+    write_queue = WriteQueue(timesheet_manager.db.connections,
+                             float(window_ms) / 1000 if window_ms else DEFAULT_WINDOW)
+    atexit.register(write_queue.close)
+
+def write(fn, *args):
+    """Call a database write, through the write queue when it is enabled"""
+    if write_queue is None:
+        return fn(*args)
+    return write_queue.call(fn, *args)
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Return this request's database connection to the shared pool"""
+    timesheet_manager.db.connections.release()
+
 @app.route('/')
 def index():
     """Main dashboard page"""
@@ -82,30 +122,32 @@ def session_status():
 
 @app.route('/entries')
 def entries():
-    """List all entries with pagination"""
-    page = request.args.get('page', 1, type=int)
+    """List all entries with keyset pagination (newest first)"""
     per_page = 20
+    page = request.args.get('page', 1, type=int)
     
-    # Get entries with their database IDs
-    entries_with_ids = timesheet_manager.get_entries_with_ids()
-    total_entries = len(entries_with_ids)
-    
-    # Calculate pagination
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    entries_page = entries_with_ids[start_idx:end_idx]
+    # ?after=<cursor> pages towards older entries, ?before=<cursor> towards newer
+    # ones; an empty ?before= jumps to the oldest page
+    before = request.args.get('before')
+    try:
+        if before is not None:
+            result = timesheet_manager.get_entries_page(before or None, per_page, 'newer')
+        else:
+            result = timesheet_manager.get_entries_page(request.args.get('after'), per_page, 'older')
+    except ValueError:
+        return redirect(url_for('entries'))
     
-    # Calculate pagination info
-    total_pages = (total_entries + per_page - 1) // per_page
-    has_prev = page > 1
-    has_next = page < total_pages
+    total_entries = timesheet_manager.count_entries()
+    total_pages = max((total_entries + per_page - 1) // per_page, 1)
     
     return render_template('entries.html',
-                         entries_with_ids=entries_page,
-                         page=page,
+                         entries_with_ids=result['entries'],
+                         page=min(max(page, 1), total_pages),
                          total_pages=total_pages,
-                         has_prev=has_prev,
-                         has_next=has_next,
+                         prev_cursor=result['prev_cursor'],
+                         next_cursor=result['next_cursor'],
+                         has_prev=result['prev_cursor'] is not None,
+                         has_next=result['next_cursor'] is not None,
                          total_entries=total_entries)
 
 @app.route('/add_entry')
@@ -125,35 +167,168 @@ def add_entry():
     
     return render_template('add_entry.html', today=today)
 
+def overlaps_json(entries):
+    """JSON list of the entries an added or edited entry overlaps"""
+    return [{
+        'id': entry.id,
+        'start_time': entry.start_time.isoformat(),
+        'end_time': entry.end_time.isoformat(),
+        'description': entry.description
+    } for entry in entries]
+
+def overlap_conflict(error):
+    """409 response for an entry refused by the 'reject' overlap policy"""
+    return jsonify({'success': False, 'message': f'Entry {error}', 'overlaps': overlaps_json(error.overlaps)}), 409
+
+def entry_from_json(data):
+    """Build the entry described by a JSON object; raises ValueError if it is invalid"""
+    if not isinstance(data, dict):
+        raise ValueError('expected a JSON object')
+    for field in ('date', 'start_time', 'end_time', 'duration', 'description'):
+        if data.get(field) is not None and not isinstance(data[field], str):
+            raise ValueError(f'{field} must be a string')
+    if not data.get('date'):
+        raise ValueError('date is required')
+    entry_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+    description = data.get('description') or ''
+    
+    if data.get('end_time'):
+        # Time range entry
+        if not data.get('start_time'):
+            raise ValueError('start_time is required with end_time')
+        return DatabaseManager.manual_entry(entry_date, data['start_time'], data['end_time'], description)
+    if data.get('duration'):
+        # Duration entry, starting at 09:00 unless given
+        return DatabaseManager.duration_entry(entry_date, data['duration'], data.get('start_time') or '09:00', description)
+    raise ValueError('Either end_time or duration is required')
+
 @app.route('/api/entry/add', methods=['POST'])
 def api_add_entry():
     """Add a new time entry"""
     data = request.get_json()
     
     try:
-        entry_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
-        start_time = data['start_time']
-        description = data.get('description', '')
+        entry = entry_from_json(data)
         
-        if 'end_time' in data and data['end_time']:
-            # Time range entry
-            end_time = data['end_time']
-            success = timesheet_manager.add_manual_entry(entry_date, start_time, end_time, description)
-        elif 'duration' in data and data['duration']:
-            # Duration entry
-            duration = data['duration']
-            success = timesheet_manager.add_duration_entry(entry_date, duration, start_time, description)
-        else:
-            return jsonify({'success': False, 'message': 'Either end_time or duration is required'}), 400
+        # reject (default) refuses overlapping entries, warn adds and lists
+        # them, merge replaces them with one entry spanning them all
+        overlap = data.get('overlap', 'reject')
+        if overlap not in OVERLAP_POLICIES:
+            return jsonify({'success': False, 'message': f"overlap must be one of {', '.join(OVERLAP_POLICIES)}"}), 400
+        overlaps = timesheet_manager.find_overlaps(entry) if overlap != 'reject' else []
+        try:
+            write(timesheet_manager.db.add_completed_entry, entry, overlap)
+        except OverlapError as e:
+            return overlap_conflict(e)
         
-        if success:
-            return jsonify({'success': True, 'message': 'Entry added successfully'})
+        if not overlaps:
+            message = 'Entry added successfully'
+        elif overlap == 'merge':
+            message = f'Entry merged with {len(overlaps)} overlapping entries'
         else:
-            return jsonify({'success': False, 'message': 'Failed to add entry. Check your input.'}), 400
+            message = f'Entry added; it overlaps {len(overlaps)} existing entries'
+        return jsonify({'success': True, 'message': message, 'overlaps': overlaps_json(overlaps)})
             
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 400
 
+def bulk_result_json(index, result):
+    """JSON object for one bulk item: its new id (and overlapping or merged ids) or its error"""
+    if isinstance(result, str):
+        return {'index': index, 'error': result}
+    if isinstance(result, tuple):
+        return {'index': index, 'id': result[0], 'overlaps': result[1]}
+    return {'index': index, 'id': result}
+
+def bulk_response_json(summary, results):
+    """Stream a bulk response: summary fields, then one result per item"""
+    yield json.dumps(summary)[:-1] + ', "results": ['
+    for start in range(0, len(results), 1000):
+        yield (', ' if start else '') + ', '.join(
+            json.dumps(bulk_result_json(index, result))
+            for index, result in enumerate(results[start:start + 1000], start))
+    yield ']}'
+
+# Largest bulk request body, and most entries in one bulk request
+BULK_MAX_BYTES = 16 * 1024 * 1024
+BULK_MAX_ITEMS = 20000
+
+@app.route('/api/entries/bulk', methods=['POST'])
+def api_bulk_entries():
+    """Add many entries in one transaction.
+    
+    The body is a JSON array or newline-delimited JSON of objects like
+    /api/entry/add takes. It is read and checked before the write lock is
+    taken, so a slow upload does not hold up other writers. Items that are
+    invalid or refused by the overlap policy (?overlap=, default reject)
+    are reported and skipped; with ?atomic=1 any such item cancels the
+    whole request.
+    """
+    overlap = request.args.get('overlap', 'reject')
+    if overlap not in OVERLAP_POLICIES:
+        return jsonify({'success': False, 'message': f"overlap must be one of {', '.join(OVERLAP_POLICIES)}"}), 400
+    atomic = request.args.get('atomic', '').lower() in ('1', 'true', 'yes')
+    if (request.content_length or 0) > BULK_MAX_BYTES:
+        return jsonify({'success': False, 'message': f'Request body larger than {BULK_MAX_BYTES} bytes'}), 413
+    db = timesheet_manager.db
+    
+    # Per item its entry or error message, replaced by its id, (id,
+    # overlapping or merged ids) or error message once it has been added
+    results = []
+    failed = 0
+    # Indexes of the items whose result is each id added so far, so that
+    # items merged into a later one report the entry that replaced them
+    added_ids = {}
+    try:
+        for item in iter_json_records(request.stream):
+            if len(results) == BULK_MAX_ITEMS:
+                return jsonify({'success': False, 'message': f'More than {BULK_MAX_ITEMS} entries in one request'}), 413
+            try:
+                results.append(entry_from_json(item))
+            except (ValueError, TypeError) as e:
+                failed += 1
+                results.append(str(e))
+    except ValueError as e:
+        # Malformed JSON: nothing has been written yet
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    try:
+        # Not through the write queue: this already is one transaction
+        with db.connections.transaction():
+            for index, entry in enumerate(results):
+                if isinstance(entry, str):
+                    continue
+                try:
+                    overlaps = db.find_overlaps(entry) if overlap == 'warn' else []
+                    entry_id = db.add_completed_entry(entry, overlap, overlaps)
+                except OverlapError as e:
+                    failed += 1
+                    results[index] = str(e)
+                    continue
+                results[index] = (entry_id, [other.id for other in overlaps]) if overlaps else entry_id
+                indexes = added_ids.setdefault(entry_id, [])
+                indexes.append(index)
+                for other in overlaps if overlap == 'merge' else ():
+                    for earlier in added_ids.pop(other.id, ()):
+                        result = results[earlier]
+                        results[earlier] = (entry_id, result[1]) if isinstance(result, tuple) else entry_id
+                        indexes.append(earlier)
+            if atomic and failed:
+                raise BatchError([(index, result) for index, result in enumerate(results) if isinstance(result, str)])
+    except BatchError as e:
+        # Only the failures: the other items' ids were rolled back
+        return jsonify({'success': False, 'message': f'{failed} of {len(results)} entries are invalid; nothing was added',
+                        'added': 0, 'failed': failed,
+                        'results': [bulk_result_json(index, error) for index, error in e.errors]}), 422
+    
+    # Months were invalidated item by item before the commit; drop any read since
+    if len(results) > failed:
+        db.connections.month_cache.clear()
+    added = len(results) - failed
+    summary = {'success': not failed, 'message': f'Added {added} of {len(results)} entries',
+               'added': added, 'failed': failed}
+    return Response(bulk_response_json(summary, results), mimetype='application/json')
+
 @app.route('/reports')
 def reports():
     """Reports page"""
@@ -175,8 +350,14 @@ def reports():
     working_days = len(daily_summary)
     avg_hours_per_day = total_hours / working_days if working_days > 0 else 0
     
+    # Hours per week of the month (days 1-7, 8-14, ...; days 29-31 count as week 5)
+    weekly_hours = [0.0] * 5
+    for day, hours in timesheet_manager.get_entry_batch_for_month(year, month).by_day().items():
+        weekly_hours[(day.day - 1) // 7] += hours
+    
     return render_template('reports.html',
                          entries=entries,
+                         weekly_hours=weekly_hours,
                          total_hours=total_hours,
                          daily_summary=daily_summary,
                          calendar_weeks=cal,
@@ -189,7 +370,7 @@ def reports():
 @app.route('/api/entry/<int:entry_id>/delete', methods=['DELETE'])
 def delete_entry(entry_id):
     """Delete a time entry"""
-    if timesheet_manager.db.delete_entry_by_id(entry_id):
+    if write(timesheet_manager.db.delete_entry_by_id, entry_id):
         return jsonify({'success': True, 'message': 'Entry deleted successfully'})
     else:
         return jsonify({'success': False, 'message': 'Entry not found'}), 404
@@ -238,9 +419,19 @@ def update_entry(entry_id):
         if end_datetime <= start_datetime:
             end_datetime += timedelta(days=1)
         
+        overlap = data.get('overlap', 'reject')
+        if overlap not in OVERLAP_POLICIES:
+            return jsonify({'success': False, 'message': f"overlap must be one of {', '.join(OVERLAP_POLICIES)}"}), 400
+        entry = TimeEntry(start_datetime, end_datetime, description)
+        overlaps = timesheet_manager.find_overlaps(entry, entry_id) if overlap != 'reject' else []
+        
         # Update the entry
-        if timesheet_manager.update_entry_by_id(entry_id, start_datetime, end_datetime, description):
-            return jsonify({'success': True, 'message': 'Entry updated successfully'})
+        try:
+            updated = write(timesheet_manager.update_entry_by_id, entry_id, start_datetime, end_datetime, description, overlap)
+        except OverlapError as e:
+            return overlap_conflict(e)
+        if updated:
+            return jsonify({'success': True, 'message': 'Entry updated successfully', 'overlaps': overlaps_json(overlaps)})
         else:
             return jsonify({'success': False, 'message': 'Entry not found or update failed'}), 404
             
@@ -267,6 +458,43 @@ def api_stats():
     """Get statistics"""
     return jsonify(timesheet_manager.get_stats())
 
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    """Hit/miss counters of the database month cache"""
+    return jsonify(timesheet_manager.get_cache_stats())
+
+@app.route('/api/search')
+def api_search():
+    """Full-text search over entry descriptions, best matches first"""
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 50, type=int)
+    try:
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+    
+    page = timesheet_manager.search_entries_page(
+        query, start, end + timedelta(days=1) if end else None, max(1, min(limit, 500))
+    )
+    results = [{
+        'id': entry_id,
+        'date': entry.start_time.date().isoformat(),
+        'start_time': entry.start_time.isoformat(),
+        'end_time': entry.end_time.isoformat(),
+        'description': entry.description,
+        'duration_hours': round(entry.duration_hours(), 2)
+    } for entry_id, entry in page['entries']]
+    
+    return jsonify({
+        'query': query,
+        'results': results,
+        'count': len(results),
+        'total_hours': round(sum(result['duration_hours'] for result in results), 2),
+        # Only the most recent matches were ranked; a from/to range covers the rest
+        'truncated': page['truncated']
+    })
+
 @app.route('/api/day-details/<date_str>')
 def api_day_details(date_str):
     """API endpoint to get detailed information for a specific day"""
@@ -322,36 +550,22 @@ def calendar_view():
     entries = timesheet_manager.get_entries_for_month(year, month)
     daily_summary = timesheet_manager.get_daily_summary_for_month(year, month)
     
+    # Totals, counts and earliest/latest times come from the daily rollup
+    daily_details = timesheet_manager.get_daily_details_for_month(year, month)
+    for details in daily_details.values():
+        details['descriptions'] = []
+    
     # Group entries by date for detailed view
     entries_by_date = {}
-    daily_details = {}
     
     for entry in entries:
         day = entry.start_time.day
-        if day not in entries_by_date:
-            entries_by_date[day] = []
-            daily_details[day] = {
-                'total_hours': 0,
-                'entries_count': 0,
-                'earliest_start': None,
-                'latest_end': None,
-                'descriptions': []
-            }
-        
-        entries_by_date[day].append(entry)
-        daily_details[day]['total_hours'] += entry.duration_hours()
-        daily_details[day]['entries_count'] += 1
-        
-        # Track earliest start and latest end
-        if daily_details[day]['earliest_start'] is None or entry.start_time.time() < daily_details[day]['earliest_start']:
-            daily_details[day]['earliest_start'] = entry.start_time.time()
-        
-        if entry.end_time and (daily_details[day]['latest_end'] is None or entry.end_time.time() > daily_details[day]['latest_end']):
-            daily_details[day]['latest_end'] = entry.end_time.time()
+        entries_by_date.setdefault(day, []).append(entry)
         
         # Collect unique descriptions
-        if entry.description and entry.description not in daily_details[day]['descriptions']:
-            daily_details[day]['descriptions'].append(entry.description)
+        details = daily_details.get(day)
+        if details and entry.description and entry.description not in details['descriptions']:
+            details['descriptions'].append(entry.description)
     
     # Generate calendar with weeks starting on Monday
     cal = calendar.monthcalendar(year, month)
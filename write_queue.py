@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Group-commit write queue for the web app (TIMESHEET_WRITE_QUEUE=1).
+
+Request threads hand their writes to one writer thread instead of each
+running its own BEGIN IMMEDIATE ... COMMIT. The writer takes whatever has
+queued up while it committed the previous batch, optionally waits up to
+window seconds for more, and applies the batch in a single transaction
+with a savepoint per write: a write that fails (an OverlapError, say) is
+rolled back on its own and only its caller sees the exception. Every
+caller's Future resolves once the whole batch has been committed, so a
+request never reports a write that could still be rolled back. Whether
+a commit also survives a power failure depends on PRAGMA synchronous,
+as it does without the queue.
+
+Bursts of writes then cost one commit and one lock acquisition per batch
+instead of per request, and requests no longer queue up in SQLite's busy
+handler, whose sleeps are what make the slowest ones slow. A window only
+pays off when commits are expensive (synchronous = FULL, slow disks): it
+delays every lone write by that much.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict
+
+# How long the writer waits for more writes after the first one of a batch
+DEFAULT_WINDOW = 0.0
+
+# Most writes committed together
+MAX_BATCH = 256
+
+class WriteQueue:
+    """Single writer thread committing queued writes in batches"""
+
+    def __init__(self, connections, window: float = DEFAULT_WINDOW, max_batch: int = MAX_BATCH):
+        self.connections = connections
+        self.window = window
+        self.max_batch = max_batch
+        self.writes = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='timesheet-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs); the Future holds its result once committed"""
+        if self._closed:
+            raise RuntimeError('write queue is closed')
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run fn through the queue and wait for it, raising what it raised"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def close(self):
+        """Commit everything already queued and stop the writer"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def stats(self) -> Dict:
+        return {
+            'writes': self.writes,
+            'batches': self.batches,
+            'average_batch': self.writes / self.batches if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'window_ms': self.window * 1000,
+        }
+
+    def _next_batch(self) -> list:
+        """Block for one write, then gather more until the window closes"""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Put the stop marker back for after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._commit(batch)
+
+    def _commit(self, batch: list):
+        results = []
+        try:
+            with self.connections.transaction():
+                for future, fn, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        # A savepoint of the batch, undone alone if fn fails
+                        with self.connections.transaction():
+                            results.append((future, fn(*args, **kwargs), None))
+                    except Exception as e:
+                        results.append((future, None, e))
+        except Exception as e:
+            # BEGIN or COMMIT failed: nothing in the batch was written
+            for future, _, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Writes invalidate their months before the batch commits, when other
+        # threads can still read and cache the old rows; drop those too
+        self.connections.month_cache.clear()
+        self.writes += len(results)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(results))
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)